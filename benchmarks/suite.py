@@ -0,0 +1,352 @@
+# benchmarks/suite.py
+
+from __future__ import annotations
+
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.research.path_a.build_dataset import build_panel_df
+
+# -----------------------------
+# Config
+# -----------------------------
+BASE = {"n_regions": 10, "periods": 104}   # 1x = 10 regions x 26 years
+SCALES = (1, 10, 100)
+REPO_ROOT = Path(__file__).resolve().parents[1]
+BASELINE_DIR = REPO_ROOT / "benchmarks" / "baselines"
+
+Z_INPUTS = ["dti", "pti", "rent_burden", "supply_pressure", "migration_pressure"]
+Z_COLS = [f"{c}_z" for c in Z_INPUTS]
+
+
+# -----------------------------
+# Cases
+# -----------------------------
+# Each case is setup(scale) -> (fn, n_rows). setup is not timed; fn() is.
+_PANELS: dict[int, pd.DataFrame] = {}
+
+
+def synthetic_panel(scale: int) -> pd.DataFrame:
+    """
+    build_panel_df at `scale` x BASE regions (cached per scale), with the
+    signal, forward return and regime columns already attached.
+    """
+    if scale not in _PANELS:
+        from src.evaluation.backtest import compute_forward_return
+        from src.evaluation.regime import assign_regime
+        from src.signals.affordability_signal import build_affordability_signal
+
+        df = build_panel_df(n_regions=BASE["n_regions"] * scale, periods=BASE["periods"])
+        df = build_affordability_signal(df)
+        df = assign_regime(compute_forward_return(df, horizon=4))
+        df["region"] = df["region"].astype("category")
+        _PANELS[scale] = df
+    return _PANELS[scale]
+
+
+def _signal_build(scale):
+    from src.signals.affordability_signal import build_affordability_signal
+    df = synthetic_panel(scale)[["date", "region"] + Z_INPUTS]
+    return (lambda: build_affordability_signal(df)), len(df)
+
+
+def _forward_returns(scale):
+    from src.evaluation.backtest import forward_return_block
+    df = synthetic_panel(scale)[["date", "region", "price"]]
+    return (lambda: forward_return_block(df, (1, 4, 12, 20))), len(df)
+
+
+def _regime_ic(scale):
+    from src.evaluation.ic import grouped_ic
+    df = synthetic_panel(scale)
+    return (lambda: grouped_ic(df, ["score_xs"] + Z_COLS, ["fwd_return"], by="regime")), len(df)
+
+
+def _cs_ols(scale):
+    from src.models.ols import run_cross_sectional_ols
+    df = synthetic_panel(scale)
+    return (lambda: run_cross_sectional_ols(df, "fwd_return", Z_COLS)), len(df)
+
+
+def _correction_labels(scale):
+    from src.research.path_a.label_correction import correction_labels
+    df = synthetic_panel(scale)[["date", "region", "real_price_index"]]
+    return (lambda: correction_labels(df, horizons=(4, 8, 20), thresholds=(0.9, 0.95))), len(df)
+
+
+def _phase2_gate(scale):
+    from src.phase2_supply.gate import rolling_quantiles
+    df = synthetic_panel(scale)[["date", "region", "regime", "permits"]]
+    return (lambda: rolling_quantiles(
+        df, ["permits"], [0.8, 0.9], group_cols=("region", "regime"), window=40, lag=1,
+    )), len(df)
+
+
+def _composite_scores(scale):
+    # 100 weight sets over the five z factors; the factor matrix is cached
+    # in the builder, so this times the scoring matmul itself
+    from src.core.composite_score import score_weight_sets
+    from src.core.factor_builder import FactorBuilder
+    from src.signals.composite_signal import load_signal_modules
+
+    load_signal_modules()
+    fb = FactorBuilder(synthetic_panel(scale)[["date", "region"] + Z_INPUTS])
+    rng = np.random.default_rng(0)
+    sets = [dict(zip(Z_COLS, rng.normal(size=len(Z_COLS)))) for _ in range(100)]
+    score_weight_sets(fb, sets)
+    return (lambda: score_weight_sets(fb, sets)), len(fb.df)
+
+
+def _tail_metrics(scale):
+    # bootstrap-path style input: 1000 * scale variants x 104 quarters
+    from src.evaluation.tail_risk import tail_metrics
+    rng = np.random.default_rng(0)
+    R = rng.standard_t(4, size=(1000 * scale, BASE["periods"])) * 0.03
+    return (lambda: tail_metrics(R)), R.size
+
+
+def _phase4_grid(scale):
+    # Phase 4 runs on one national series, so scale the spec grid instead
+    # of the panel: `scale` x as many k / b values.
+    from src.phase4.grid import FIRST_TESTS, ROLL_WINS, expand_specs, run_grid
+
+    df = build_panel_df(n_regions=1, periods=BASE["periods"])
+    df["invested_p2"] = np.nan
+    grid = {
+        "linear": {"k": np.linspace(0.05, 1.0, 20 * scale).tolist()},
+        "logistic": {"a": [-0.5, 0.0, 0.5], "b": np.linspace(0.2, 3.0, 15 * scale).tolist()},
+        "clip_min": [0.0],
+        "clip_max": [1.0],
+    }
+    specs = expand_specs(grid)
+    return (lambda: run_grid(df, specs, ROLL_WINS, FIRST_TESTS, workers=1)), len(df) * len(specs)
+
+
+CASES: dict[str, Callable] = {
+    "signal_build": _signal_build,
+    "forward_returns": _forward_returns,
+    "regime_ic": _regime_ic,
+    "cs_ols": _cs_ols,
+    "correction_labels": _correction_labels,
+    "phase2_gate": _phase2_gate,
+    "composite_scores": _composite_scores,
+    "tail_metrics": _tail_metrics,
+    "phase4_grid": _phase4_grid,
+}
+
+
+# -----------------------------
+# Measurement
+# -----------------------------
+def measure(fn: Callable, *, repeat: int = 5, memory: bool = True) -> dict:
+    """
+    Time fn() `repeat` times (after one warm-up call) and, in one extra
+    traced call, record the tracemalloc peak. Timings are in seconds.
+    """
+    fn()
+
+    wall, cpu = [], []
+    for _ in range(repeat):
+        t0, c0 = time.perf_counter(), time.process_time()
+        fn()
+        wall.append(time.perf_counter() - t0)
+        cpu.append(time.process_time() - c0)
+
+    out = {
+        "wall_min": min(wall),
+        "wall_median": float(np.median(wall)),
+        "cpu_median": float(np.median(cpu)),
+        "repeat": repeat,
+    }
+
+    if memory:
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn()
+        out["peak_mb"] = (tracemalloc.get_traced_memory()[1] - base) / 1e6
+        if started:
+            tracemalloc.stop()
+    return out
+
+
+def run_suite(
+    *,
+    scales: Sequence[int] = SCALES,
+    cases: Optional[Sequence[str]] = None,
+    repeat: int = 5,
+    memory: bool = True,
+    verbose: bool = True,
+) -> pd.DataFrame:
+    """
+    Run every case at every scale. One row per (case, scale) with n_rows,
+    wall_min / wall_median / cpu_median (s), peak_mb and rows_per_s.
+    """
+    names = list(CASES) if cases is None else list(cases)
+    unknown = set(names) - set(CASES)
+    if unknown:
+        raise ValueError(f"Unknown cases: {sorted(unknown)}")
+
+    rows = []
+    for scale in scales:
+        for name in names:
+            fn, n_rows = CASES[name](scale)
+            # fewer repeats at large scale; the min is stable there anyway
+            rep = max(1, repeat // scale) if scale > 1 else repeat
+            m = measure(fn, repeat=rep, memory=memory)
+            rows.append({"case": name, "scale": scale, "n_rows": n_rows, **m,
+                         "rows_per_s": n_rows / m["wall_min"] if m["wall_min"] > 0 else np.nan})
+            if verbose:
+                print(f"[bench] {name:<18} x{scale:<4} {m['wall_min'] * 1e3:10.2f} ms"
+                      f"  {m.get('peak_mb', np.nan):9.2f} MB")
+        _PANELS.pop(scale, None)
+    return pd.DataFrame(rows)
+
+
+# -----------------------------
+# Startup budget
+# -----------------------------
+# (python code, modules that must stay unimported, budget in seconds over a
+# bare interpreter). The CLI must parse arguments without touching pandas;
+# importing a model module must not drag statsmodels in.
+STARTUP_CHECKS = {
+    "cli_help": (
+        "import runpy, sys\n"
+        "sys.argv = ['src', 'run', '--help']\n"
+        "try:\n    runpy.run_module('src', run_name='__main__')\nexcept SystemExit:\n    pass",
+        ("pandas", "numpy", "statsmodels"),
+        0.15,
+    ),
+    "import_ols": ("import src.models.ols", ("statsmodels",), 1.0),
+    "import_fit_logit": ("import src.research.path_a.fit_logit", ("statsmodels",), 1.0),
+    "import_pipeline": ("import src.pipeline", ("pandas", "statsmodels"), 0.15),
+    "import_walk_forward": ("import src.evaluation.walk_forward", ("statsmodels",), 1.0),
+}
+
+
+def _time_python(code: str, repeat: int) -> tuple[float, list[str]]:
+    probe = code + "\nimport json, sys\nprint('__MODULES__' + json.dumps(sorted(sys.modules)))"
+    walls, modules = [], []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        res = subprocess.run(
+            [sys.executable, "-c", probe],
+            capture_output=True, text=True, check=True, cwd=REPO_ROOT,
+        )
+        walls.append(time.perf_counter() - t0)
+        line = [l for l in res.stdout.splitlines() if l.startswith("__MODULES__")][-1]
+        modules = json.loads(line[len("__MODULES__"):])
+    return float(np.median(walls)), modules
+
+
+def startup_check(name: str, *, repeat: int = 5, bare: Optional[float] = None) -> dict:
+    """
+    One STARTUP_CHECKS entry: median wall time in a fresh interpreter, net
+    of a bare `python -c pass` (measured unless given), against its budget;
+    `leaked` lists the deferred modules that were imported anyway. ok =
+    within budget and nothing leaked.
+    """
+    code, lazy, budget = STARTUP_CHECKS[name]
+    if bare is None:
+        bare, _ = _time_python("pass", repeat)
+    wall, modules = _time_python(code, repeat)
+    leaked = [m for m in lazy if m in modules]
+    net = wall - bare
+    return {
+        "check": name,
+        "net_s": net,
+        "budget_s": budget,
+        "leaked": ",".join(leaked),
+        "ok": net <= budget and not leaked,
+    }
+
+
+def measure_startup(*, repeat: int = 5, verbose: bool = True) -> pd.DataFrame:
+    """
+    startup_check for every STARTUP_CHECKS entry (one shared bare baseline).
+    """
+    bare, _ = _time_python("pass", repeat)
+    rows = []
+    for name in STARTUP_CHECKS:
+        row = startup_check(name, repeat=repeat, bare=bare)
+        rows.append(row)
+        if verbose:
+            flag = "ok" if row["ok"] else "OVER"
+            print(f"[startup] {name:<20} {row['net_s'] * 1e3:8.1f} ms / {row['budget_s'] * 1e3:6.0f} ms"
+                  f"  {flag} {row['leaked']}")
+    return pd.DataFrame(rows)
+
+
+# -----------------------------
+# Baselines
+# -----------------------------
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=REPO_ROOT,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "system": platform.system(),
+    }
+
+
+def save_baseline(results: pd.DataFrame, path: Optional[Path] = None) -> Path:
+    """
+    Write results as JSON ({"env": ..., "results": [...]}). Default path is
+    benchmarks/baselines/<commit>.json.
+    """
+    env = environment()
+    if path is None:
+        path = BASELINE_DIR / f"{env['commit'] or 'local'}.json"
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"env": env, "results": results.to_dict(orient="records")}, f, indent=2)
+    return path
+
+
+def load_baseline(path) -> pd.DataFrame:
+    with open(path) as f:
+        return pd.DataFrame(json.load(f)["results"])
+
+
+def compare(
+    current: pd.DataFrame,
+    baseline: pd.DataFrame,
+    *,
+    metric: str = "wall_min",
+    tolerance: float = 0.25,
+) -> pd.DataFrame:
+    """
+    Join on (case, scale) and flag rows where current / baseline - 1 exceeds
+    tolerance for `metric` (and for peak_mb when both sides have it).
+    """
+    keys = ["case", "scale"]
+    cols = [c for c in (metric, "peak_mb") if c in current.columns and c in baseline.columns]
+    out = current[keys + cols].merge(baseline[keys + cols], on=keys, suffixes=("", "_base"))
+    flags = []
+    for c in cols:
+        out[f"{c}_ratio"] = out[c] / out[f"{c}_base"]
+        flags.append(out[f"{c}_ratio"] > 1.0 + tolerance)
+    out["regression"] = np.logical_or.reduce(flags) if flags else False
+    return out
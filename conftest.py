@@ -0,0 +1,2 @@
+# conftest.py
+# Keeps the repo root on sys.path so tests import `src.*` from any cwd.
@@ -0,0 +1,33 @@
+import argparse
+
+from benchmarks.suite import CASES, SCALES, compare, load_baseline, measure_startup, run_suite, save_baseline
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Time / memory-profile the hot paths on synthetic panels.")
+    ap.add_argument("--scales", type=int, nargs="+", default=list(SCALES))
+    ap.add_argument("--cases", nargs="+", choices=list(CASES), default=None)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    ap.add_argument("--out", default=None, help="baseline JSON to write (default: benchmarks/baselines/<commit>.json)")
+    ap.add_argument("--compare", default=None, help="baseline JSON to diff against")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    ap.add_argument("--startup", action="store_true", help="only run the startup-time budget check")
+    args = ap.parse_args(argv)
+
+    if args.startup:
+        res = measure_startup(repeat=args.repeat)
+        return 0 if res["ok"].all() else 1
+
+    res = run_suite(scales=args.scales, cases=args.cases, repeat=args.repeat, memory=not args.no_memory)
+    print("wrote:", save_baseline(res, args.out))
+
+    if args.compare:
+        diff = compare(res, load_baseline(args.compare), tolerance=args.tolerance)
+        print(diff.to_string(index=False))
+        if diff["regression"].any():
+            print(f"\n{int(diff['regression'].sum())} regression(s) over {args.tolerance:.0%}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,8 +1,9 @@
-import pandas as pd
+from src.evaluation.backtest import compute_forward_return
+from src.loaders.housing_loader import load_housing_data
 
 def run_pipeline(region="austin"):
-    df = pd.read_csv("example/example_data.csv")
-    df["forward_return"] = df["price"].pct_change(4)
+    df = load_housing_data(region)
+    df["forward_return"] = compute_forward_return(df, horizon=4)["fwd_return"]
     df["regime"] = df["income"] < 72
     return df
 
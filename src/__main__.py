@@ -0,0 +1,142 @@
+# src/__main__.py
+"""
+Unified entry point:
+
+    python -m src run --phase 2 --config configs/phase2.yaml [--incremental]
+    python -m src run --phase 3
+    python -m src run --phase 4 [--incremental]
+    python -m src run --phase grid [--workers N]
+    python -m src run --phase core --region austin [--region ...] [--workers N]
+    python -m src study configs/study.yaml [--workers N] [--dry-run]
+
+Only argparse is imported up front; each phase's modules (and pandas,
+NumPy, statsmodels behind them) load inside its handler, so `--help` and
+argument errors return immediately and workers don't pay for phases they
+never run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+PHASES = ("2", "3", "4", "grid", "core")
+
+
+def load_config(path: str | Path) -> dict:
+    """
+    Phase config from JSON or YAML (PyYAML is only imported for YAML).
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(path)
+    if path.suffix in (".yml", ".yaml"):
+        import yaml
+
+        return yaml.safe_load(path.read_text())
+    return json.loads(path.read_text())
+
+
+def _run_phase2(args):
+    from src.phase2_supply.pipeline import run, run_incremental
+
+    if args.config is None:
+        raise SystemExit("phase 2 needs --config")
+    cfg = load_config(args.config)
+    fn = run_incremental if args.incremental else run
+    fn(cfg, Path(args.root), profile=args.profile)
+
+
+def _run_phase3(args):
+    from src.phase3.run_phase3 import main
+
+    main()
+
+
+def _run_phase4(args):
+    from src.phase4 import run_phase4
+
+    if args.incremental:
+        run_phase4.run_incremental(profile=args.profile, root=Path(args.root))
+    else:
+        run_phase4.main(profile=args.profile, root=Path(args.root))
+
+
+def _run_grid(args):
+    from src.phase4.grid import main
+
+    main(workers=args.workers, profile=args.profile, root=Path(args.root))
+
+
+def _run_core(args):
+    from src.core.pipeline import run_pipeline, run_pipeline_many
+
+    regions = args.region or ["austin"]
+    if len(regions) == 1:
+        df = run_pipeline(regions[0], horizon=args.horizon, use_cache=not args.no_cache, verbose=True)
+    else:
+        df = run_pipeline_many(regions, workers=args.workers, horizon=args.horizon, use_cache=not args.no_cache)
+    print(df.head())
+
+
+def _run_study(args):
+    from src.core.run_spec import compile_plan, run_study
+
+    spec = load_config(args.spec)
+    if args.dry_run:
+        plan = compile_plan(spec, root=args.root)
+        print(plan.describe().to_string(index=False))
+        return
+    _, summary = run_study(spec, root=args.root, workers=args.workers, profile=args.profile)
+    if not summary.empty:
+        print("\nOOS summary:\n", summary.sort_values(["run", "p05"]).to_string(index=False))
+
+
+HANDLERS = {
+    "2": _run_phase2,
+    "3": _run_phase3,
+    "4": _run_phase4,
+    "grid": _run_grid,
+    "core": _run_core,
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="python -m src", description="Leviathan research pipeline runner.")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run one phase")
+    run.add_argument("--phase", required=True, choices=PHASES)
+    run.add_argument("--config", default=None, help="phase 2 config (JSON / YAML)")
+    run.add_argument("--root", default=".", help="project root that phase 2 / 4 inputs and outputs resolve against")
+    run.add_argument("--incremental", action="store_true", help="append new quarters only (phases 2 and 4)")
+    run.add_argument("--profile", action="store_true", default=None,
+                     help="dump cProfile stats of the slowest stage next to the run log")
+    run.add_argument("--workers", type=int, default=None)
+    run.add_argument("--region", action="append", default=None, help="core pipeline region (repeatable)")
+    run.add_argument("--horizon", type=int, default=12, help="core pipeline forward-return horizon")
+    run.add_argument("--no-cache", action="store_true", help="core pipeline: ignore the stage cache")
+
+    study = sub.add_parser("study", help="run a multi-config study spec (phases 2 -> 3 -> 4)")
+    study.add_argument("spec", help="study spec (JSON / YAML)")
+    study.add_argument("--root", default=None, help="resolve input paths against this (default: the spec's root)")
+    study.add_argument("--workers", type=int, default=None, help="concurrent branches (default: the spec's workers)")
+    study.add_argument("--profile", action="store_true", default=None,
+                       help="dump cProfile stats of the slowest level next to the run log")
+    study.add_argument("--dry-run", action="store_true", help="validate and print the plan without running it")
+    return ap
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "run":
+        HANDLERS[args.phase](args)
+    elif args.command == "study":
+        _run_study(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
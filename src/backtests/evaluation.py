@@ -0,0 +1,59 @@
+# src/backtests/evaluation.py
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+def summarize_backtest(
+    result: dict[str, np.ndarray],
+    periods_per_year: int = 4,
+) -> dict[str, np.ndarray]:
+    """
+    Summary stats for every variant of a run_backtest result.
+
+    Returns a dict of (...,) arrays:
+        - mean_return
+        - vol
+        - annualized_return
+        - annualized_vol
+        - sharpe
+        - hit_ratio
+        - max_drawdown
+        - avg_turnover
+        - total_cost
+        - num_periods
+    """
+    r = result["net"]
+    T = r.shape[-1]
+
+    mean_ret = r.mean(axis=-1)
+    vol = r.std(axis=-1, ddof=1) if T > 1 else np.full(r.shape[:-1], np.nan)
+    ann_ret = mean_ret * periods_per_year
+    ann_vol = vol * np.sqrt(periods_per_year)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sharpe = np.where(ann_vol > 0, ann_ret / ann_vol, np.nan)
+
+    return {
+        "mean_return": mean_ret,
+        "vol": vol,
+        "annualized_return": ann_ret,
+        "annualized_vol": ann_vol,
+        "sharpe": sharpe,
+        "hit_ratio": (r > 0).mean(axis=-1),
+        "max_drawdown": result["max_drawdown"],
+        "avg_turnover": result["turnover"].mean(axis=-1),
+        "total_cost": result["cost"].sum(axis=-1),
+        "num_periods": np.full(r.shape[:-1], T),
+    }
+
+
+def summary_frame(summary: dict[str, np.ndarray], variants=None) -> pd.DataFrame:
+    """
+    One row per variant (leading batch dims flattened).
+    """
+    out = pd.DataFrame({k: np.ravel(v) for k, v in summary.items()})
+    if variants is not None:
+        out.insert(0, "variant", list(variants))
+    return out
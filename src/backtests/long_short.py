@@ -0,0 +1,67 @@
+# src/backtests/long_short.py
+
+from __future__ import annotations
+
+import numpy as np
+
+
+def row_quantile(x: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """
+    Linear-interpolated NaN-aware quantile along the last axis, with a
+    different q allowed for every leading index (q broadcastable to
+    x.shape[:-1]). Matches Series.quantile's default interpolation.
+    """
+    srt = np.sort(x, axis=-1)  # NaNs sort last
+    cnt = np.sum(~np.isnan(x), axis=-1)
+    pos = np.maximum(cnt - 1, 0) * np.broadcast_to(q, cnt.shape)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.minimum(lo + 1, np.maximum(cnt - 1, 0))
+    a = np.take_along_axis(srt, lo[..., None], axis=-1)[..., 0]
+    b = np.take_along_axis(srt, hi[..., None], axis=-1)[..., 0]
+    out = a + (b - a) * (pos - lo)
+    return np.where(cnt > 0, out, np.nan)
+
+
+def long_short_weights(
+    signal: np.ndarray,
+    *,
+    top_q: float | np.ndarray = 0.2,
+    bottom_q: float | np.ndarray = 0.2,
+) -> np.ndarray:
+    """
+    Cross-sectional long/short weights for the backtest engine.
+
+    Each period:
+        - Long the bottom_q quantile of the signal (cheap / attractive)
+        - Short the top_q quantile of the signal (expensive / vulnerable)
+
+    Each leg is equal-weighted to +1 / -1 (dollar neutral). Periods where a
+    leg is empty get zero weight. NaN signals are never held.
+
+    signal : (..., T, N)
+    top_q, bottom_q : scalars or arrays broadcastable to the batch shape
+        (...,), so a grid of quantile pairs runs as one batch.
+
+    Returns (..., T, N) weights.
+    """
+    s = np.asarray(signal, dtype=float)
+    top_q = np.asarray(top_q, dtype=float)
+    bottom_q = np.asarray(bottom_q, dtype=float)
+
+    batch = np.broadcast_shapes(s.shape[:-2], top_q.shape, bottom_q.shape)
+    s = np.broadcast_to(s, batch + s.shape[-2:])
+
+    lo_th = row_quantile(s, bottom_q[..., None])
+    hi_th = row_quantile(s, 1.0 - top_q[..., None])
+
+    valid = ~np.isnan(s)
+    long_m = valid & (s <= lo_th[..., None])
+    short_m = valid & (s >= hi_th[..., None])
+
+    n_long = long_m.sum(axis=-1, keepdims=True)
+    n_short = short_m.sum(axis=-1, keepdims=True)
+    live = (n_long > 0) & (n_short > 0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        w = long_m / n_long - short_m / n_short
+    return np.where(live, w, 0.0)
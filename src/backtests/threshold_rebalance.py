@@ -0,0 +1,41 @@
+# src/backtests/threshold_rebalance.py
+
+from __future__ import annotations
+
+import numpy as np
+
+
+def threshold_rebalance_weights(
+    target: np.ndarray,
+    *,
+    band: float | np.ndarray = 0.05,
+) -> np.ndarray:
+    """
+    Hold weights until the target moves more than `band` away from them.
+
+    At each period a region's held weight is reset to the target when
+    |target - held| > band, otherwise the previous weight is kept. Held
+    weights start at 0. NaN targets keep the previous weight.
+
+    target : (..., T, N)
+    band   : scalar or array broadcastable to the batch shape (...,), so a
+             grid of bands runs as one batch.
+
+    The rule is path dependent, so this steps through time once, but each
+    step updates every variant and region in one array operation.
+    """
+    tgt = np.asarray(target, dtype=float)
+    band = np.asarray(band, dtype=float)
+    batch = np.broadcast_shapes(tgt.shape[:-2], band.shape)
+    tgt = np.broadcast_to(tgt, batch + tgt.shape[-2:])
+    band = band[..., None]
+
+    T = tgt.shape[-2]
+    held = np.zeros(batch + tgt.shape[-1:])
+    out = np.empty(tgt.shape)
+    for t in range(T):
+        x = tgt[..., t, :]
+        move = ~np.isnan(x) & (np.abs(x - held) > band)
+        held = np.where(move, x, held)
+        out[..., t, :] = held
+    return out
@@ -0,0 +1,62 @@
+# src/backtests/timing_model.py
+
+from __future__ import annotations
+
+import numpy as np
+
+
+def linear_exposure(
+    score: np.ndarray,
+    k: float | np.ndarray,
+    *,
+    clip_min: float = 0.0,
+    clip_max: float = 1.0,
+) -> np.ndarray:
+    """
+    Exposure = clip(1 - k * score). Higher score = more fragile.
+
+    score : (T,) or (T, N); k : scalar or (V,) -> (V, T[, N]) weights.
+    """
+    score = np.asarray(score, dtype=float)
+    k = np.asarray(k, dtype=float)
+    k = k.reshape(k.shape + (1,) * score.ndim)
+    return np.clip(1.0 - k * score, clip_min, clip_max)
+
+
+def logistic_exposure(
+    score: np.ndarray,
+    a: float | np.ndarray,
+    b: float | np.ndarray,
+    *,
+    clip_min: float = 0.0,
+    clip_max: float = 1.0,
+) -> np.ndarray:
+    """
+    Exposure = clip(1 / (1 + exp(a + b * score))).
+
+    a and b broadcast against each other into the variant axis.
+    """
+    score = np.asarray(score, dtype=float)
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    a = a.reshape(a.shape + (1,) * score.ndim)
+    b = b.reshape(b.shape + (1,) * score.ndim)
+    return np.clip(1.0 / (1.0 + np.exp(a + b * score)), clip_min, clip_max)
+
+
+def regime_gated_weights(
+    weights: np.ndarray,
+    active: np.ndarray,
+) -> np.ndarray:
+    """
+    Zero out weights outside the active regime (same rule as
+    evaluation.decision.apply_regime_filter). active broadcasts against
+    weights, e.g. (T, 1) for a market-wide gate.
+    """
+    return np.asarray(weights, dtype=float) * np.asarray(active, dtype=float)
+
+
+def as_single_asset(exposure: np.ndarray) -> np.ndarray:
+    """
+    (..., T) exposure series -> (..., T, 1) weights for run_backtest.
+    """
+    return np.asarray(exposure, dtype=float)[..., None]
@@ -0,0 +1,91 @@
+# src/core/backtest_engine.py
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+def run_backtest(
+    weights: np.ndarray,
+    returns: np.ndarray,
+    *,
+    cost_bps: float | np.ndarray = 0.0,
+    initial_weights: Optional[np.ndarray] = None,
+) -> dict[str, np.ndarray]:
+    """
+    Vectorized portfolio backtest over a (time x region) grid.
+
+    weights : (..., T, N) weights decided at t, any number of leading batch
+              dims (strategy variants, bootstrap paths, ...)
+    returns : (T, N) or (..., T, N) forward returns from t to t+1
+              (e.g. ret_1q_fwd); NaN returns contribute nothing
+    cost_bps : transaction cost per unit of turnover, scalar or broadcastable
+               to the batch shape (...,)
+    initial_weights : (..., N) holdings before the first period (default 0)
+
+    Every quantity is computed with array ops along the time axis; there is
+    no Python loop over dates or variants.
+
+    Returns
+    -------
+    dict
+        gross, turnover, cost, net, equity, drawdown : (..., T)
+        max_drawdown : (...,)
+    """
+    w = np.asarray(weights, dtype=float)
+    R = np.asarray(returns, dtype=float)
+
+    w = np.where(np.isnan(w), 0.0, w)
+    gross = np.sum(w * np.where(np.isnan(R), 0.0, R), axis=-1)
+
+    if initial_weights is None:
+        prev0 = np.zeros(w.shape[:-2] + w.shape[-1:])
+    else:
+        prev0 = np.broadcast_to(initial_weights, w.shape[:-2] + w.shape[-1:])
+    prev = np.concatenate([prev0[..., None, :], w[..., :-1, :]], axis=-2)
+    turnover = np.sum(np.abs(w - prev), axis=-1)
+
+    cost = turnover * (np.asarray(cost_bps, dtype=float)[..., None] / 1e4)
+    net = gross - cost
+
+    equity = np.cumprod(1.0 + net, axis=-1)
+    peak = np.maximum.accumulate(np.maximum(equity, 1.0), axis=-1)
+    drawdown = equity / peak - 1.0
+
+    return {
+        "gross": gross,
+        "turnover": turnover,
+        "cost": cost,
+        "net": net,
+        "equity": equity,
+        "drawdown": drawdown,
+        "max_drawdown": drawdown.min(axis=-1) if drawdown.shape[-1] else np.zeros(drawdown.shape[:-1]),
+    }
+
+
+def backtest_to_frame(
+    result: dict[str, np.ndarray],
+    dates,
+    variants: Optional[list] = None,
+) -> pd.DataFrame:
+    """
+    Long (variant, date) frame of the per-period series in a run_backtest
+    result. Leading batch dims are flattened into one variant axis.
+    """
+    series = ["gross", "turnover", "cost", "net", "equity", "drawdown"]
+    T = result["net"].shape[-1]
+    flat = {k: result[k].reshape(-1, T) for k in series}
+    V = flat["net"].shape[0]
+    if variants is None:
+        variants = list(range(V))
+
+    out = pd.DataFrame({
+        "variant": np.repeat(variants, T),
+        "date": np.tile(np.asarray(dates), V),
+    })
+    for k in series:
+        out[k] = flat[k].ravel()
+    return out
@@ -0,0 +1,93 @@
+# src/core/composite_score.py
+
+from __future__ import annotations
+
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.core.factor_builder import FactorBuilder
+
+
+def _named_sets(weight_sets) -> dict[str, dict]:
+    # one {factor: w} dict, a list of them, or {set name: {factor: w}}
+    if isinstance(weight_sets, Mapping):
+        if weight_sets and all(isinstance(v, Mapping) for v in weight_sets.values()):
+            return {str(k): dict(v) for k, v in weight_sets.items()}
+        return {"score": dict(weight_sets)}
+    return {f"w{i}": dict(w) for i, w in enumerate(weight_sets)}
+
+
+def weight_matrix(
+    weight_sets,
+    factors: Optional[Sequence[str]] = None,
+    *,
+    dtype=np.float32,
+) -> tuple[np.ndarray, list[str], list[str]]:
+    """
+    Stack weight sets into a (factors x sets) matrix.
+
+    Parameters
+    ----------
+    weight_sets : dict | list[dict] | dict[str, dict]
+        One {factor: weight} dict, a list of them (named w0, w1, ...), or
+        named sets.
+    factors : list[str], optional
+        Row order. Default: every factor used by any set, first-seen order.
+        Factors a set does not mention get weight 0.
+
+    Returns
+    -------
+    (W, factors, set_names)
+    """
+    sets = _named_sets(weight_sets)
+    if factors is None:
+        factors = list(dict.fromkeys(k for w in sets.values() for k in w))
+    factors = list(factors)
+    unknown = {k for w in sets.values() for k in w} - set(factors)
+    if unknown:
+        raise KeyError(f"Missing required columns: {sorted(unknown)}")
+
+    row = {f: i for i, f in enumerate(factors)}
+    W = np.zeros((len(factors), len(sets)), dtype=dtype)
+    for j, w in enumerate(sets.values()):
+        for k, v in w.items():
+            W[row[k], j] = v
+    return W, factors, list(sets)
+
+
+def composite_scores(F: np.ndarray, W: np.ndarray) -> np.ndarray:
+    """
+    All composite scores at once: (rows x factors) @ (factors x sets).
+
+    A NaN factor value makes a row's score NaN only for sets that put a
+    non-zero weight on that factor (as a per-set weighted sum would), not
+    for every set.
+    """
+    F = np.asarray(F)
+    W = np.asarray(W, dtype=F.dtype)
+    nan = np.isnan(F)
+    if not nan.any():
+        return F @ W
+    S = np.where(nan, 0, F) @ W
+    hit = nan.astype(F.dtype) @ (W != 0).astype(F.dtype)
+    S[hit > 0] = np.nan
+    return S
+
+
+def score_weight_sets(
+    data: pd.DataFrame | FactorBuilder,
+    weight_sets,
+    *,
+    factors: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """
+    Composite scores for every weight set, one column per set, indexed like
+    the frame. data is a frame (factors registered in FACTORS are built from
+    it) or a FactorBuilder, whose cache is reused across calls.
+    """
+    builder = data if isinstance(data, FactorBuilder) else FactorBuilder(data)
+    W, factors, names = weight_matrix(weight_sets, factors, dtype=builder.dtype)
+    S = composite_scores(builder.matrix(factors), W)
+    return pd.DataFrame(S, index=builder.df.index, columns=names)
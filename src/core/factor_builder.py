@@ -0,0 +1,270 @@
+# src/core/factor_builder.py
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Callable, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.signals.normalization import zscore_panel
+
+
+# -----------------------------
+# Registry
+# -----------------------------
+class Factor:
+    """
+    One registered factor.
+
+    kernel is called as kernel(df, *dep_values, **params) and returns an
+    (n_rows,) array aligned with df. `inputs` are the df columns it reads
+    (fingerprinted for caching); `deps` are other factors whose values are
+    passed positionally, in order.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kernel: Callable,
+        *,
+        inputs: Sequence[str] = (),
+        deps: Sequence[str] = (),
+        params: Optional[dict] = None,
+        version: str = "1",
+    ):
+        self.name = name
+        self.kernel = kernel
+        self.inputs = tuple(inputs)
+        self.deps = tuple(deps)
+        self.params = dict(params or {})
+        self.version = version
+
+    def __repr__(self) -> str:
+        return f"Factor({self.name!r}, inputs={list(self.inputs)}, deps={list(self.deps)})"
+
+
+FACTORS: dict[str, Factor] = {}
+
+
+def register_factor(
+    name: str,
+    *,
+    inputs: Sequence[str] = (),
+    deps: Sequence[str] = (),
+    params: Optional[dict] = None,
+    version: str = "1",
+):
+    """
+    Decorator registering kernel as factor `name` in FACTORS. Registering
+    a different kernel under a taken name is an error (re-importing the
+    same module is not).
+    """
+    def deco(kernel):
+        prev = FACTORS.get(name)
+        if prev is not None and (prev.kernel.__module__, prev.kernel.__qualname__) != (
+            kernel.__module__, kernel.__qualname__,
+        ):
+            raise ValueError(f"Factor '{name}' already registered by {prev.kernel.__module__}")
+        FACTORS[name] = Factor(name, kernel, inputs=inputs, deps=deps, params=params, version=version)
+        return kernel
+    return deco
+
+
+def get_factor(name: str, registry: Optional[dict] = None) -> Factor:
+    registry = FACTORS if registry is None else registry
+    if name not in registry:
+        raise ValueError(f"Unknown factor: {name}")
+    return registry[name]
+
+
+def resolve_order(names: Iterable[str], registry: Optional[dict] = None) -> list[str]:
+    """
+    names plus everything they depend on, dependencies first.
+    """
+    order: list[str] = []
+    state: dict[str, int] = {}   # 1 = visiting, 2 = done
+
+    def visit(name: str, path: tuple):
+        if state.get(name) == 2:
+            return
+        if state.get(name) == 1:
+            raise ValueError(f"Factor dependency cycle: {' -> '.join(path + (name,))}")
+        state[name] = 1
+        for d in get_factor(name, registry).deps:
+            visit(d, path + (name,))
+        state[name] = 2
+        order.append(name)
+
+    for n in names:
+        visit(n, ())
+    return order
+
+
+# -----------------------------
+# Kernel helpers
+# -----------------------------
+def grouped_zscore(
+    df: pd.DataFrame,
+    x: np.ndarray,
+    *,
+    mode: str = "full",
+    window: Optional[int] = None,
+    group_col: str = "region",
+    time_col: str = "date",
+) -> np.ndarray:
+    # z-score an array aligned with df within each group (zscore_panel rules)
+    tmp = pd.DataFrame({"x": np.asarray(x, dtype=float)})
+    group = group_col if group_col in df.columns else None
+    if group is not None:
+        tmp[group] = df[group].to_numpy()
+    time = time_col if mode != "full" and time_col in df.columns else None
+    if time is not None:
+        tmp[time] = df[time].to_numpy()
+    return zscore_panel(tmp, ["x"], group_col=group, time_col=time, mode=mode, window=window)[:, 0]
+
+
+def grouped_shift(
+    df: pd.DataFrame,
+    x: np.ndarray,
+    periods: int,
+    *,
+    group_col: str = "region",
+    time_col: str = "date",
+) -> np.ndarray:
+    # x shifted by `periods` rows within each group, in time order
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    codes = pd.factorize(df[group_col])[0] if group_col in df.columns else np.zeros(n, dtype=np.int64)
+    order = np.lexsort((df[time_col].to_numpy(), codes)) if time_col in df.columns else np.argsort(codes, kind="stable")
+
+    xs, cs = x[order], codes[order]
+    out = np.full(n, np.nan)
+    if 0 < abs(periods) < n:
+        if periods > 0:
+            same = cs[periods:] == cs[:-periods]
+            out[periods:] = np.where(same, xs[:-periods], np.nan)
+        else:
+            same = cs[:periods] == cs[-periods:]
+            out[:periods] = np.where(same, xs[-periods:], np.nan)
+
+    res = np.empty(n)
+    res[order] = out
+    return res
+
+
+# -----------------------------
+# Builder
+# -----------------------------
+class FactorBuilder:
+    """
+    Factor values for one frame, computed into a single (rows x factors)
+    matrix.
+
+    Every factor value is cached under a key that hashes its name, version,
+    effective params, the digests of its input columns and the keys of its
+    dependencies. Changing one factor's params (set_params) or swapping in
+    a frame where only some columns changed (set_data) therefore recomputes
+    just the affected factors and whatever depends on them; everything else
+    is served from the cache. Weight searches over a fixed factor set never
+    recompute anything.
+
+    The frame is treated as immutable: after editing columns in place, call
+    set_data(df) so their digests are refreshed.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        *,
+        params: Optional[dict[str, dict]] = None,
+        dtype=np.float32,
+        registry: Optional[dict] = None,
+    ):
+        self.registry = FACTORS if registry is None else registry
+        self.dtype = dtype
+        self.params: dict[str, dict] = {k: dict(v) for k, v in (params or {}).items()}
+        self._values: dict[str, np.ndarray] = {}
+        self.n_computed = 0
+        self.set_data(df)
+
+    # -----------------------------
+    # inputs
+    # -----------------------------
+    def set_data(self, df: pd.DataFrame) -> "FactorBuilder":
+        self.df = df
+        self._digests: dict[str, str] = {}
+        return self
+
+    def set_params(self, name: str, **params) -> "FactorBuilder":
+        get_factor(name, self.registry)
+        self.params.setdefault(name, {}).update(params)
+        return self
+
+    def params_of(self, name: str) -> dict:
+        return {**get_factor(name, self.registry).params, **self.params.get(name, {})}
+
+    def _digest(self, col: str) -> str:
+        if col not in self._digests:
+            if col not in self.df.columns:
+                raise KeyError(f"Missing required columns: {[col]}")
+            h = pd.util.hash_pandas_object(self.df[col], index=False).to_numpy()
+            self._digests[col] = hashlib.sha256(h.tobytes()).hexdigest()[:16]
+        return self._digests[col]
+
+    # -----------------------------
+    # keys / values
+    # -----------------------------
+    def key(self, name: str, _memo: Optional[dict] = None) -> str:
+        memo = {} if _memo is None else _memo
+        if name not in memo:
+            f = get_factor(name, self.registry)
+            payload = json.dumps(
+                {
+                    "name": name,
+                    "version": f.version,
+                    "params": self.params_of(name),
+                    "inputs": {c: self._digest(c) for c in f.inputs},
+                    "deps": [self.key(d, memo) for d in f.deps],
+                    "n": len(self.df),
+                },
+                sort_keys=True,
+                default=repr,
+            )
+            memo[name] = hashlib.sha256(payload.encode()).hexdigest()[:24]
+        return memo[name]
+
+    def values(self, name: str) -> np.ndarray:
+        """
+        Float64 values of one factor (computing its dependencies first).
+        """
+        memo: dict[str, str] = {}
+        for n in resolve_order([name], self.registry):
+            k = self.key(n, memo)
+            if k in self._values:
+                continue
+            f = get_factor(n, self.registry)
+            deps = [self._values[self.key(d, memo)] for d in f.deps]
+            out = np.asarray(f.kernel(self.df, *deps, **self.params_of(n)), dtype=float)
+            if out.shape != (len(self.df),):
+                raise ValueError(f"Factor '{n}' returned shape {out.shape}, expected ({len(self.df)},)")
+            self._values[k] = out
+            self.n_computed += 1
+        return self._values[self.key(name, memo)]
+
+    def matrix(self, names: Sequence[str]) -> np.ndarray:
+        """
+        (n_rows, len(names)) matrix in self.dtype, columns in names order.
+        """
+        F = np.empty((len(self.df), len(names)), dtype=self.dtype)
+        for j, n in enumerate(names):
+            F[:, j] = self.values(n)
+        return F
+
+    def frame(self, names: Sequence[str]) -> pd.DataFrame:
+        return pd.DataFrame(self.matrix(names), index=self.df.index, columns=list(names))
+
+    def clear(self) -> None:
+        self._values.clear()
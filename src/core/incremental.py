@@ -0,0 +1,221 @@
+# src/core/incremental.py
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.evaluation.backtest import block_rows, forward_return_block
+from src.loaders.housing_loader import _has_pyarrow
+from src.research.path_a.label_correction import correction_labels
+
+
+# -----------------------------
+# State
+# -----------------------------
+def load_state(path: Path | str) -> Optional[dict]:
+    """
+    Persisted incremental state, or None when there is none yet.
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def save_state(path: Path | str, state: dict) -> Path:
+    # write-then-rename so an interrupted refresh never leaves half a state
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(state, default=str))
+    tmp.replace(path)
+    return path
+
+
+def check_state_config(state: dict, config: dict, path: Path | str) -> None:
+    """
+    Raise when the persisted state was built under a different config than
+    the current one (or recorded none): appending to it would mix
+    partitions computed with the old settings.
+    """
+    config = json.loads(json.dumps(config, default=str))
+    saved = state.get("config")
+    if saved == config:
+        return
+    if saved is None:
+        why = "the state records no config"
+    else:
+        keys = sorted(k for k in set(saved) | set(config) if saved.get(k) != config.get(k))
+        why = "changed: " + ", ".join(keys)
+    raise ValueError(
+        f"Incremental state {path} was built with a different config ({why}); "
+        f"remove {Path(path).parent} to rebuild from scratch"
+    )
+
+
+def _json_value(v):
+    if v is None or (isinstance(v, float) and np.isnan(v)) or v is pd.NaT or v is pd.NA:
+        return None
+    if isinstance(v, pd.Timestamp):
+        return v.isoformat()
+    return v.item() if hasattr(v, "item") else v
+
+
+def frame_to_records(df: pd.DataFrame) -> dict:
+    # small frames (tails) stored inside the JSON state; floats keep their
+    # full repr so restored rows are bit-identical
+    return {
+        "columns": list(df.columns),
+        "data": [[_json_value(v) for v in row] for row in df.itertuples(index=False, name=None)],
+    }
+
+
+def frame_from_records(d: dict, *, date_col: str = "date") -> pd.DataFrame:
+    df = pd.DataFrame(d["data"], columns=d["columns"])
+    if date_col in df.columns:
+        df[date_col] = pd.to_datetime(df[date_col])
+    return df
+
+
+# -----------------------------
+# Partitioned outputs
+# -----------------------------
+def append_partition(out_dir: Path | str, df: pd.DataFrame, *, tag: Optional[str] = None) -> Path:
+    """
+    Write df as the next numbered partition (part-00000[-tag].parquet, ...)
+    under out_dir; existing partitions are never rewritten. Falls back to
+    CSV partitions when pyarrow is not installed.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    n = len(_parts(out_dir))
+    path = out_dir / (f"part-{n:05d}" + (f"-{tag}" if tag else ""))
+    if _has_pyarrow():
+        path = path.with_suffix(".parquet")
+        df.to_parquet(path, index=False, compression="zstd")
+    else:
+        path = path.with_suffix(".csv")
+        df.to_csv(path, index=False)
+    return path
+
+
+def _parts(out_dir: Path) -> list[Path]:
+    return sorted(p for p in Path(out_dir).glob("part-*") if p.suffix in (".parquet", ".csv"))
+
+
+def _read_part(path: Path, usecols: Optional[list[str]]) -> pd.DataFrame:
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path, columns=usecols)
+    return pd.read_csv(path, usecols=usecols)
+
+
+def read_partitions(
+    out_dir: Path | str,
+    *,
+    key: Optional[Sequence[str]] = None,
+    columns: Optional[list[str]] = None,
+    date_col: str = "date",
+) -> pd.DataFrame:
+    """
+    Concatenate partitions in write order. With key, later rows win, so a
+    partition that re-emits a row (e.g. a forward return that was NaN and
+    is now known) supersedes the earlier version.
+    """
+    parts = _parts(out_dir)
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    usecols = None
+    if columns is not None:
+        usecols = list(dict.fromkeys(list(key or []) + list(columns)))
+    df = pd.concat([_read_part(p, usecols) for p in parts], ignore_index=True)
+    if date_col in df.columns:
+        df[date_col] = pd.to_datetime(df[date_col])
+    if key is not None:
+        df = df.drop_duplicates(subset=list(key), keep="last")
+        df = df.sort_values(list(key)).reset_index(drop=True)
+    return df if columns is None else df[columns]
+
+
+# -----------------------------
+# Forward-looking tails
+# -----------------------------
+def split_tail(
+    df: pd.DataFrame,
+    horizon: int,
+    *,
+    group_col: Optional[str] = "region",
+    date_col: str = "date",
+) -> pd.DataFrame:
+    """
+    Last `horizon` rows of every group: the rows whose forward returns /
+    labels are still incomplete and must be carried to the next refresh.
+    """
+    df = df.sort_values(date_col)
+    if group_col is None or group_col not in df.columns:
+        return df.tail(horizon)
+    return df.groupby(group_col, observed=True, sort=False).tail(horizon)
+
+
+def extend_forward(
+    tail: Optional[pd.DataFrame],
+    new: pd.DataFrame,
+    *,
+    price_col: str,
+    horizons: Sequence[int],
+    kind: str = "log",
+    thresholds: Sequence[float] = (),
+    group_col: Optional[str] = "region",
+    date_col: str = "date",
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Forward returns (and correction labels) for newly arrived rows.
+
+    Forward quantities at t only need prices t .. t + max(horizons), so
+    running the batch kernels over (tail + new) is exact for every row in
+    it. Returns (rows, next_tail):
+        rows      : tail + new rows, with fwd_{kind}_h{h} columns and, when
+                    thresholds are given, y_h{h}_t{thr} labels; tail rows
+                    carry the updated (previously NaN) values
+        next_tail : last max(horizons) rows per group of `rows`, to
+                    persist for the next refresh
+    """
+    if group_col is not None and group_col not in new.columns:
+        group_col = None
+    H = max(horizons)
+
+    ext = new if tail is None or tail.empty else pd.concat([tail, new], ignore_index=True)
+    keys = [c for c in (date_col, group_col) if c is not None]
+    ext = ext.sort_values(keys[::-1]).reset_index(drop=True)
+    stale = [c for c in ext.columns if c.startswith(f"fwd_{kind}_h") or c.startswith("y_h")]
+    ext = ext.drop(columns=stale)
+    if group_col is not None:
+        ext[group_col] = ext[group_col].astype(str)
+
+    blk = forward_return_block(
+        ext,
+        horizons,
+        price_col=price_col,
+        group_col=group_col,
+        time_col=date_col,
+        dtype=np.float64,
+    )
+    for i, h in enumerate(blk["horizons"]):
+        ext[f"fwd_{kind}_h{h}"] = block_rows(blk, kind, i)
+
+    if thresholds:
+        labels = correction_labels(
+            ext,
+            price_col=price_col,
+            horizons=horizons,
+            thresholds=thresholds,
+            group_col=group_col,
+            date_col=date_col,
+        )
+        ext = ext.join(labels.drop(columns=keys))
+
+    return ext, split_tail(ext, H, group_col=group_col, date_col=date_col)
@@ -1,29 +1,214 @@
 # src/core/pipeline.py
 
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
 import pandas as pd
 from src.evaluation.regime import assign_regime
 
-from src.loaders.housing_loader import load_housing_data
-from src.features.affordability import attach_affordability_features
-from src.signals.affordability_signal import build_affordability_signal
+from src.core.stage_cache import Stage, StageCache, run_stages
+from src.loaders.housing_loader import DEFAULT_SOURCE, load_housing_data, source_digest
+from src.signals.affordability_signal import Z_COLS, build_affordability_signal
 from src.evaluation.backtest import compute_forward_return
 
 
-def run_pipeline(region: str) -> pd.DataFrame:
-    # 1. load base data
-    df = load_housing_data(region)
-
-    # 2. feature engineering
-    df = attach_affordability_features(df)
+def _attach_features(df: pd.DataFrame) -> pd.DataFrame:
+    # panels that already carry the signal inputs need no feature step;
+    # the feature module is only imported for raw price / rent / income data
+    if set(Z_COLS) <= set(df.columns):
+        return df
+    from src.features.affordability import attach_affordability_features
 
-    # 3. signal
-    df = build_affordability_signal(df)
+    return attach_affordability_features(df)
 
-    # 4. forward return（必须最后）
-    df = compute_forward_return(df, horizon=12)
 
+def _attach_regime(df: pd.DataFrame) -> pd.DataFrame:
     df = assign_regime(df)
     df["affordability_active"] = df["regime"] == "down"
+    return df
 
 
-    return df
+def build_stages(
+    region: str,
+    *,
+    weights: dict | None = None,
+    horizon: int = 12,
+    src: Path | str = DEFAULT_SOURCE,
+) -> list[Stage]:
+    return [
+        # 1. load base data
+        Stage(
+            "load",
+            load_housing_data,
+            params={"region": region, "src": str(src)},
+            fingerprint=lambda: source_digest(src),
+        ),
+        # 2. feature engineering
+        Stage("features", _attach_features, inputs=("load",)),
+        # 3. signal (the runner owns the frame, so no defensive copy)
+        Stage(
+            "signal",
+            build_affordability_signal,
+            inputs=("features",),
+            params={"weights": weights, "copy": False},
+        ),
+        # 4. forward return（必须最后）
+        Stage("fwd_return", compute_forward_return, inputs=("signal",), params={"horizon": horizon}),
+        Stage("regime", _attach_regime, inputs=("fwd_return",)),
+    ]
+
+
+def run_pipeline(
+    region: str,
+    *,
+    weights: dict | None = None,
+    horizon: int = 12,
+    src: Path | str = DEFAULT_SOURCE,
+    cache: StageCache | None = None,
+    use_cache: bool = True,
+    verbose: bool = False,
+) -> pd.DataFrame:
+    """
+    data -> features -> signal -> forward return -> regime.
+
+    Each stage is keyed on its parameters and upstream keys; unchanged
+    stages are served from the on-disk stage cache, so changing e.g. only
+    `horizon` reruns just the forward-return and regime stages.
+
+    src is the source CSV (project-relative unless absolute). The feature
+    step is skipped when it already has the signal inputs (dti, pti, ...).
+    """
+    if use_cache and cache is None:
+        cache = StageCache()
+
+    outputs, report = run_stages(
+        build_stages(region, weights=weights, horizon=horizon, src=src),
+        cache if use_cache else None,
+    )
+
+    if verbose:
+        print(f"[pipeline] {region}")
+        print(report.to_string(index=False))
+
+    return outputs["regime"]
+
+
+def _run_region_to_ipc(runner, region: str, path: str, kwargs: dict):
+    """
+    Worker body: run one region and hand the frame back through an Arrow
+    IPC file (memory-mapped by the parent) instead of pickling it. Falls
+    back to returning the frame when pyarrow is unavailable. Exceptions are
+    returned, not raised, so one bad region can't take down the batch; an
+    empty result (e.g. a region the source doesn't have) counts as one.
+    """
+    import traceback
+
+    try:
+        df = runner(region, **kwargs)
+    except Exception:
+        return region, None, traceback.format_exc()
+    if df is None or df.empty:
+        return region, None, f"ValueError: region '{region}' produced no rows (unknown region?)"
+
+    if path is None:
+        return region, df, None
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return region, df, None
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return region, path, None
+
+
+def _read_ipc(path: str) -> pd.DataFrame:
+    import pyarrow as pa
+
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+
+def run_pipeline_many(
+    regions: list[str],
+    *,
+    workers: int | None = None,
+    runner=None,
+    errors: str = "collect",
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Run independent regions across a process pool and stack the results.
+
+    Parameters
+    ----------
+    regions : list[str]
+        Regions to run.
+    workers : int, optional
+        Max concurrent processes (default: min(len(regions), cpu_count)).
+        workers=1 runs in-process (no IPC round trip).
+    runner : callable, optional
+        Module-level function runner(region, **kwargs) -> DataFrame
+        (default: run_pipeline).
+    errors : str
+        "collect" (default) skips failed regions and records their
+        tracebacks in out.attrs["failures"]; "raise" re-raises the first.
+        A region whose run returns no rows counts as failed.
+    **kwargs
+        Passed through to runner.
+
+    Returns
+    -------
+    pd.DataFrame
+        One panel with a categorical 'region' column (successful regions,
+        in the order given).
+    """
+    if errors not in ("collect", "raise"):
+        raise ValueError(f"Unknown errors mode: {errors}")
+
+    runner = runner or run_pipeline
+    workers = workers or min(len(regions), os.cpu_count() or 1)
+
+    frames: dict[str, pd.DataFrame] = {}
+    failures: dict[str, str] = {}
+
+    with tempfile.TemporaryDirectory(prefix="leviathan_ipc_") as out_dir:
+        paths = [os.path.join(out_dir, f"{i:05d}.arrow") for i in range(len(regions))]
+        if workers <= 1:
+            results = [_run_region_to_ipc(runner, r, None, kwargs) for r in regions]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                futs = [
+                    ex.submit(_run_region_to_ipc, runner, r, paths[i], kwargs)
+                    for i, r in enumerate(regions)
+                ]
+                results = []
+                for r, fut in zip(regions, futs):
+                    try:
+                        results.append(fut.result())
+                    except Exception as e:  # worker crashed (e.g. killed)
+                        results.append((r, None, repr(e)))
+
+        for region, payload, err in results:
+            if err is not None:
+                if errors == "raise":
+                    raise RuntimeError(f"region '{region}' failed:\n{err}")
+                failures[region] = err
+                print(f"[pipeline] {region} failed: {err.strip().splitlines()[-1]}")
+                continue
+            frames[region] = _read_ipc(payload) if isinstance(payload, str) else payload
+
+    if frames:
+        out = pd.concat([frames[r] for r in regions if r in frames], ignore_index=True)
+    else:
+        out = pd.DataFrame()
+    if "region" in out.columns:
+        out["region"] = pd.Categorical(
+            out["region"].astype(str),
+            categories=[r for r in regions if r in frames],
+        )
+    out.attrs["failures"] = failures
+    return out
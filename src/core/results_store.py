@@ -0,0 +1,202 @@
+# src/core/results_store.py
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Optional
+
+import pandas as pd
+
+from src.loaders.housing_loader import _has_pyarrow
+from src.utils.logging import current_run
+
+
+STORE_ROOT = Path("outputs/store")
+COMPRESSION = "zstd"
+
+
+def _write_text_atomic(path: Path, text: str) -> None:
+    # per-process tmp file + rename, so readers never see a half-written file
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+def store_available() -> bool:
+    """
+    The store writes Parquet, so it needs pyarrow; callers keep their CSV
+    outputs when it is missing.
+    """
+    return _has_pyarrow()
+
+
+class ResultsStore:
+    """
+    Typed, compressed Parquet results keyed by phase / table / run / region.
+
+    Layout:
+        <root>/<phase>/<table>/run=<run_id>/[region=<r>/]part-*.parquet
+        <root>/<phase>/<table>/run=<run_id>/_run.json   run metadata
+        <root>/<phase>/<table>/_latest                  id of the newest run
+
+    Readers select columns (and regions) so only those column chunks are
+    read, with the files memory-mapped; downstream phases never re-parse a
+    whole CSV to get two columns. The run id defaults to the active RunLog's
+    run id, so store entries line up with the JSON-lines run logs.
+    """
+
+    def __init__(self, root: Path | str = STORE_ROOT):
+        self.root = Path(root)
+
+    # -----------------------------
+    # paths / metadata
+    # -----------------------------
+    def _table_dir(self, phase: str, table: str) -> Path:
+        return self.root / phase / table
+
+    def _run_dir(self, phase: str, table: str, run_id: str) -> Path:
+        return self._table_dir(phase, table) / f"run={run_id}"
+
+    def exists(self, phase: str, table: str) -> bool:
+        return (self._table_dir(phase, table) / "_latest").exists()
+
+    def has_run(self, phase: str, table: str, run: str) -> bool:
+        return (self._run_dir(phase, table, run) / "_run.json").exists()
+
+    def latest_run(self, phase: str, table: str) -> Optional[str]:
+        p = self._table_dir(phase, table) / "_latest"
+        return p.read_text().strip() if p.exists() else None
+
+    def runs(self, phase: str, table: str) -> pd.DataFrame:
+        """
+        Metadata of every stored run of a table, oldest first.
+        """
+        metas = [
+            json.loads(p.read_text())
+            for p in self._table_dir(phase, table).glob("run=*/_run.json")
+        ]
+        if not metas:
+            return pd.DataFrame()
+        return pd.DataFrame(metas).sort_values("created").reset_index(drop=True)
+
+    def columns(self, phase: str, table: str, *, run: Optional[str] = None) -> list[str]:
+        run = run or self.latest_run(phase, table)
+        meta = json.loads((self._run_dir(phase, table, run) / "_run.json").read_text())
+        return list(meta["schema"])
+
+    # -----------------------------
+    # write
+    # -----------------------------
+    def write(
+        self,
+        phase: str,
+        table: str,
+        df: pd.DataFrame,
+        *,
+        run_id: Optional[str] = None,
+        partition_cols: Optional[Iterable[str]] = ("region",),
+        meta: Optional[dict] = None,
+        append: bool = False,
+    ) -> str:
+        """
+        Store df as (a new part of) one run of phase/table and mark that run
+        as the latest. partition_cols that df doesn't have are ignored.
+        append=True adds parts to an existing run (e.g. incremental
+        refreshes) instead of refusing to overwrite it.
+
+        Returns the run id.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if run_id is None:
+            log = current_run()
+            run_id = log.run_id if log is not None else (
+                datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+            )
+
+        run_dir = self._run_dir(phase, table, run_id)
+        meta_path = run_dir / "_run.json"
+        if meta_path.exists() and not append:
+            raise FileExistsError(f"{phase}/{table} run '{run_id}' already exists")
+        run_dir.mkdir(parents=True, exist_ok=True)
+
+        parts = [c for c in (partition_cols or ()) if c in df.columns]
+        tbl = pa.Table.from_pandas(df, preserve_index=False)
+        stem = f"part-{datetime.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:6]}"
+        if parts:
+            pq.write_to_dataset(
+                tbl,
+                root_path=run_dir,
+                partition_cols=parts,
+                compression=COMPRESSION,
+                basename_template=stem + "-{i}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+            )
+        else:
+            pq.write_table(tbl, run_dir / f"{stem}.parquet", compression=COMPRESSION)
+
+        prev = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        _write_text_atomic(meta_path, json.dumps({
+            "phase": phase,
+            "table": table,
+            "run_id": run_id,
+            "created": prev.get("created", now),
+            "updated": now,
+            "rows": prev.get("rows", 0) + len(df),
+            "n_parts": prev.get("n_parts", 0) + 1,
+            "partition_cols": parts,
+            "schema": {c: str(t) for c, t in df.dtypes.items()},
+            "python": platform.python_version(),
+            "meta": {**prev.get("meta", {}), **(meta or {})},
+        }, indent=2, default=str))
+        _write_text_atomic(self._table_dir(phase, table) / "_latest", run_id)
+        return run_id
+
+    # -----------------------------
+    # read
+    # -----------------------------
+    def read(
+        self,
+        phase: str,
+        table: str,
+        *,
+        run: Optional[str] = None,
+        columns: Optional[list[str]] = None,
+        regions: Optional[Iterable[str]] = None,
+        memory_map: bool = True,
+    ) -> pd.DataFrame:
+        """
+        Read one run (default: latest) of phase/table. Only `columns` are
+        read (partition columns such as region included when asked for);
+        regions filters on the region partition without opening the other
+        directories.
+        """
+        import pyarrow.parquet as pq
+
+        run = run or self.latest_run(phase, table)
+        if run is None:
+            raise FileNotFoundError(f"no stored runs for {phase}/{table}")
+        run_dir = self._run_dir(phase, table, run)
+        if not run_dir.exists():
+            raise FileNotFoundError(run_dir)
+
+        filters = None
+        if regions is not None:
+            filters = [("region", "in", [str(r) for r in regions])]
+
+        tbl = pq.read_table(
+            run_dir,
+            columns=columns,
+            filters=filters,
+            memory_map=memory_map,
+            partitioning="hive",
+        )
+        df = tbl.to_pandas()
+        return df if columns is None else df[columns]
@@ -0,0 +1,541 @@
+# src/core/run_spec.py
+"""
+Declarative study specs: many phase 2 / 3 / 4 configs in one file, compiled
+into a DAG that loads every input once and runs independent branches
+concurrently.
+
+    study: supply_sweep
+    workers: 4
+    inputs:
+      master: data/processed/master.csv
+      supply: data/processed/supply.csv
+      panel:  data/processed/phase3_panel_wret_regime_alt.csv
+    runs:
+      - {name: gate80, phase: 2, master: master, supply: supply,
+         supply_candidates: [permits], gate: {method: rolling_percentile, threshold: 0.8}}
+      - {name: p3, phase: 3, panel: panel}
+      - {name: w20, phase: 4, panel: p3, phase2: gate80, roll_win: 20}
+      - {name: w40, phase: 4, panel: p3, phase2: gate80, roll_win: 40}
+
+References are by name: phase 2 `master` / `supply` and phase 3 `panel`
+name inputs; phase 4 `panel` names a phase 3 run or an input, and its
+optional `phase2` names a phase 2 run or an input holding a strategy
+series (date, invested_p2, strat_p2). Phase 4 keys left out fall back to
+the run_phase4 module constants.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence
+
+import pandas as pd
+
+from src.core.results_store import STORE_ROOT, ResultsStore, store_available
+from src.utils.logging import RunLog, stage
+
+
+TOP_KEYS = {"study", "root", "workers", "inputs", "runs"}
+RUN_KEYS = {
+    "2": {"required": {"master", "supply_candidates", "gate"}, "optional": {"supply"}},
+    "3": {"required": {"panel"}, "optional": set()},
+    "4": {"required": {"panel"}, "optional": {"phase2", "roll_win", "first_test", "specs"}},
+}
+GATE_METHODS = ("percentile", "rolling_percentile")
+SPEC_PARAMS = {"linear": ("k",), "logistic": ("a", "b")}
+
+# names end up in run ids and output paths
+_NAME_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+
+# -----------------------------
+# Validation
+# -----------------------------
+def _is_num(v) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _is_int(v) -> bool:
+    return isinstance(v, int) and not isinstance(v, bool)
+
+
+def _check_gate(gate, where: str) -> list[str]:
+    if not isinstance(gate, dict):
+        return [f"{where}.gate: must be a mapping"]
+    errs = []
+    method = str(gate.get("method", "percentile"))
+    if method not in GATE_METHODS:
+        errs.append(f"{where}.gate.method: unknown method '{method}' (expected one of {list(GATE_METHODS)})")
+    thr = gate.get("threshold")
+    if not _is_num(thr) or not 0.0 < thr < 1.0:
+        errs.append(f"{where}.gate.threshold: must be a number in (0, 1), got {thr!r}")
+    if "window" in gate and (not _is_int(gate["window"]) or gate["window"] < 1):
+        errs.append(f"{where}.gate.window: must be a positive integer")
+    if "lag" in gate and (not _is_int(gate["lag"]) or gate["lag"] < 0):
+        errs.append(f"{where}.gate.lag: must be a non-negative integer")
+    return errs
+
+
+def _check_specs(specs, where: str) -> list[str]:
+    if not isinstance(specs, list) or not specs:
+        return [f"{where}.specs: must be a non-empty list"]
+    errs = []
+    seen = set()
+    for j, sp in enumerate(specs):
+        at = f"{where}.specs[{j}]"
+        if not isinstance(sp, dict):
+            errs.append(f"{at}: must be a mapping")
+            continue
+        name = sp.get("name")
+        if not isinstance(name, str) or not name:
+            errs.append(f"{at}.name: required")
+        elif name in seen:
+            errs.append(f"{at}.name: duplicate exposure spec '{name}'")
+        seen.add(name)
+        kind = sp.get("kind")
+        if kind not in SPEC_PARAMS:
+            errs.append(f"{at}.kind: unknown kind {kind!r} (expected one of {list(SPEC_PARAMS)})")
+            continue
+        for key in SPEC_PARAMS[kind] + ("clip_min", "clip_max"):
+            if not _is_num(sp.get(key)):
+                errs.append(f"{at}.{key}: required number for kind '{kind}'")
+        if _is_num(sp.get("clip_min")) and _is_num(sp.get("clip_max")) and sp["clip_min"] > sp["clip_max"]:
+            errs.append(f"{at}: clip_min > clip_max")
+    return errs
+
+
+def spec_errors(spec: Any) -> list[str]:
+    """
+    Every problem with a study spec, each prefixed by where it is
+    (e.g. "runs[2] (w20).phase2: ..."). Empty when the spec is valid.
+    """
+    if not isinstance(spec, dict):
+        return ["spec: must be a mapping"]
+    errs = []
+
+    unknown = sorted(set(spec) - TOP_KEYS)
+    if unknown:
+        errs.append(f"spec: unknown keys {unknown}")
+    study = spec.get("study")
+    if not isinstance(study, str) or not _NAME_RE.match(study):
+        errs.append(f"study: required name of letters, digits, '_', '-', '.', got {study!r}")
+    if "workers" in spec and (not _is_int(spec["workers"]) or spec["workers"] < 1):
+        errs.append("workers: must be a positive integer")
+
+    inputs = spec.get("inputs", {})
+    if not isinstance(inputs, dict):
+        errs.append("inputs: must be a mapping of name -> path")
+        inputs = {}
+    for k, v in inputs.items():
+        if not isinstance(v, str) or not v:
+            errs.append(f"inputs.{k}: must be a path string")
+
+    runs = spec.get("runs")
+    if not isinstance(runs, list) or not runs:
+        errs.append("runs: must be a non-empty list")
+        return errs
+
+    # first pass: names and phases, so references can be checked in any order
+    phases: dict[str, str] = {}
+    for i, run in enumerate(runs):
+        if not isinstance(run, dict):
+            continue
+        name, phase = run.get("name"), str(run.get("phase"))
+        if isinstance(name, str) and name not in phases:
+            phases[name] = phase
+
+    seen = set()
+    for i, run in enumerate(runs):
+        where = f"runs[{i}]"
+        if not isinstance(run, dict):
+            errs.append(f"{where}: must be a mapping")
+            continue
+        name = run.get("name")
+        if isinstance(name, str):
+            where = f"runs[{i}] ({name})"
+        if not isinstance(name, str) or not _NAME_RE.match(name):
+            errs.append(f"{where}.name: required name of letters, digits, '_', '-', '.'")
+        elif name in seen:
+            errs.append(f"{where}.name: duplicate run name '{name}'")
+        elif name in inputs:
+            errs.append(f"{where}.name: '{name}' is also an input name")
+        seen.add(name)
+
+        phase = str(run.get("phase"))
+        if phase not in RUN_KEYS:
+            errs.append(f"{where}.phase: must be one of {list(RUN_KEYS)}, got {run.get('phase')!r}")
+            continue
+        keys = RUN_KEYS[phase]
+        present = set(run) - {"name", "phase"}
+        for k in sorted(keys["required"] - present):
+            errs.append(f"{where}.{k}: required for phase {phase}")
+        for k in sorted(present - keys["required"] - keys["optional"]):
+            errs.append(f"{where}.{k}: unknown key for phase {phase}")
+
+        def ref(key: str, run_phase: Optional[str]):
+            v = run.get(key)
+            if v is None:
+                return
+            if v in inputs:
+                return
+            if run_phase is not None and phases.get(v) == run_phase:
+                return
+            allowed = "an input" + (f" or a phase {run_phase} run" if run_phase else "")
+            errs.append(f"{where}.{key}: '{v}' is not {allowed}")
+
+        if phase == "2":
+            ref("master", None)
+            ref("supply", None)
+            cands = run.get("supply_candidates")
+            if cands is not None and (
+                not isinstance(cands, list) or not cands or not all(isinstance(c, str) for c in cands)
+            ):
+                errs.append(f"{where}.supply_candidates: must be a non-empty list of column names")
+            if "gate" in run:
+                errs += _check_gate(run["gate"], where)
+        elif phase == "3":
+            ref("panel", None)
+        else:
+            ref("panel", "3")
+            ref("phase2", "2")
+            if "roll_win" in run and (not _is_int(run["roll_win"]) or run["roll_win"] < 2):
+                errs.append(f"{where}.roll_win: must be an integer >= 2")
+            if "first_test" in run:
+                try:
+                    pd.Timestamp(str(run["first_test"]))
+                except ValueError:
+                    errs.append(f"{where}.first_test: not a date: {run['first_test']!r}")
+            if "specs" in run:
+                errs += _check_specs(run["specs"], where)
+    return errs
+
+
+def validate_spec(spec: Any) -> dict:
+    """
+    Raise ValueError listing every problem in the spec; returns it unchanged
+    when valid.
+    """
+    errs = spec_errors(spec)
+    if errs:
+        raise ValueError("Invalid study spec:\n  " + "\n  ".join(errs))
+    return spec
+
+
+# -----------------------------
+# Plan
+# -----------------------------
+class PlanNode:
+    """
+    One unit of work: fn(*results of deps). `runs` lists the spec runs whose
+    result this node is (several when runs share it).
+    """
+
+    def __init__(self, key: str, fn: Callable, deps: Sequence[str] = (), runs: Sequence[str] = ()):
+        self.key = key
+        self.fn = fn
+        self.deps = list(deps)
+        self.runs = list(runs)
+
+    @property
+    def kind(self) -> str:
+        return self.key.split(":", 1)[0]
+
+    def __repr__(self) -> str:
+        return f"PlanNode({self.key!r}, deps={self.deps}, runs={self.runs})"
+
+
+class StudyPlan:
+    """
+    Compiled study: nodes keyed by what they compute, so shared inputs
+    (same file, same master / supply merge, same prepared panel) are one
+    node however many runs use them.
+    """
+
+    def __init__(self, study: str, root: Path, workers: int):
+        self.study = study
+        self.root = root
+        self.workers = workers
+        self.nodes: dict[str, PlanNode] = {}
+        self.run_nodes: dict[str, str] = {}
+
+    def add(self, key: str, fn: Callable, deps: Sequence[str] = (), run: Optional[str] = None) -> str:
+        node = self.nodes.get(key)
+        if node is None:
+            node = self.nodes[key] = PlanNode(key, fn, deps)
+        if run is not None:
+            node.runs.append(run)
+            self.run_nodes[run] = key
+        return key
+
+    def levels(self) -> list[list[str]]:
+        """
+        Nodes grouped so every node's deps are in earlier groups; nodes
+        within a group are independent.
+        """
+        depth: dict[str, int] = {}
+
+        def visit(key: str) -> int:
+            if key not in depth:
+                deps = self.nodes[key].deps
+                depth[key] = 1 + max((visit(d) for d in deps), default=-1)
+            return depth[key]
+
+        for key in self.nodes:
+            visit(key)
+        out: list[list[str]] = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+        for key in self.nodes:
+            out[depth[key]].append(key)
+        return out
+
+    def describe(self) -> pd.DataFrame:
+        rows = []
+        for lvl, keys in enumerate(self.levels()):
+            for key in keys:
+                n = self.nodes[key]
+                rows.append({"level": lvl, "node": key, "kind": n.kind,
+                             "deps": ", ".join(n.deps), "runs": ", ".join(n.runs)})
+        return pd.DataFrame(rows)
+
+
+def _load_frame(path: Path) -> Callable[[], pd.DataFrame]:
+    def fn():
+        from src.loaders.housing_loader import read_panel
+
+        return read_panel(path, float_dtype="float64").sort_values("date")
+    return fn
+
+
+def _load_p2(path: Path) -> Callable[[], pd.DataFrame]:
+    def fn():
+        from src.phase4.run_phase4 import P2_COLS
+
+        p2 = pd.read_csv(path, usecols=P2_COLS)
+        p2["date"] = pd.to_datetime(p2["date"])
+        return p2
+    return fn
+
+
+def _merge_supply(master: pd.DataFrame, supply: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    # same as phase 2 _load: supply is optional
+    if supply is None:
+        return master.copy()
+    return master.merge(supply, on="date", how="left")
+
+
+def compile_plan(spec: dict, *, root: Optional[Path | str] = None) -> StudyPlan:
+    """
+    Validate spec and build its DAG. Input paths resolve against root (the
+    spec's `root`, else the working directory); missing required inputs
+    are reported together, a missing phase 2 supply file is allowed (as in
+    a plain phase 2 run).
+    """
+    validate_spec(spec)
+    root = Path(root if root is not None else spec.get("root", "."))
+    workers = int(spec.get("workers", min(4, os.cpu_count() or 1)))
+    plan = StudyPlan(spec["study"], root, workers)
+    inputs = spec.get("inputs", {})
+    runs = spec["runs"]
+
+    def path_of(name: str) -> Path:
+        return (root / inputs[name]).resolve()
+
+    missing = set()
+
+    def load(name: str, *, required: bool = True) -> Optional[str]:
+        p = path_of(name)
+        if not p.exists():
+            if required:
+                missing.add(f"inputs.{name}: {p} does not exist")
+            return None
+        return plan.add(f"load:{p}", _load_frame(p))
+
+    def panel(name: str) -> str:
+        # a prepared phase 3 panel, shared by every run naming the same file
+        p = path_of(name)
+        src = load(name)
+
+        def fn(df):
+            from src.phase4.run_phase4 import prepare_panel
+
+            return prepare_panel(df)
+        return plan.add(f"panel:{p}", fn, [src] if src else [])
+
+    phase_of = {r["name"]: str(r["phase"]) for r in runs}
+
+    for r in (r for r in runs if str(r["phase"]) in ("2", "3")):
+        if str(r["phase"]) == "3":
+            key = panel(r["panel"])
+            plan.add(key, None, run=r["name"])
+            continue
+
+        master = load(r["master"])
+        supply = load(r["supply"], required=False) if r.get("supply") else None
+        merged = plan.add(
+            f"merge:{path_of(r['master'])}|{path_of(r['supply']) if supply else ''}",
+            _merge_supply,
+            [k for k in (master, supply) if k],
+        )
+        cfg = {"supply_candidates": r["supply_candidates"], "gate": r["gate"]}
+
+        def p2(df, cfg=cfg):
+            from src.phase2_supply.pipeline import build_sanity, strategy_series
+
+            sanity = build_sanity(df.copy(), cfg)
+            return {"sanity": sanity, "strategy_series": strategy_series(sanity)}
+        plan.add(f"phase2:{r['name']}", p2, [merged], run=r["name"])
+
+    for r in (r for r in runs if str(r["phase"]) == "4"):
+        src = r["panel"]
+        deps = [plan.run_nodes[src] if phase_of.get(src) == "3" else panel(src)]
+        ref = r.get("phase2")
+        if ref is not None:
+            if phase_of.get(ref) == "2":
+                deps.append(plan.run_nodes[ref])
+            elif path_of(ref).exists():
+                deps.append(plan.add(f"load_p2:{path_of(ref)}", _load_p2(path_of(ref))))
+            else:
+                missing.add(f"inputs.{ref}: {path_of(ref)} does not exist")
+
+        cfg = {k: r[k] for k in ("roll_win", "first_test", "specs") if k in r}
+        if "first_test" in cfg:
+            cfg["first_test"] = str(cfg["first_test"])
+
+        def p4(df, p2=None, cfg=cfg):
+            from src.phase4.run_phase4 import evaluate_specs, merge_phase2_reference
+
+            if isinstance(p2, dict):
+                p2 = p2["strategy_series"]
+            df = merge_phase2_reference(df.copy(), p2)
+            _, series, summary, specs = evaluate_specs(df, **cfg)
+            return {"oos_series": series, "oos_summary": summary, "exposure_specs": specs}
+        plan.add(f"phase4:{r['name']}", p4, deps, run=r["name"])
+
+    if missing:
+        raise ValueError("Invalid study spec:\n  " + "\n  ".join(sorted(missing)))
+    return plan
+
+
+# -----------------------------
+# Execution
+# -----------------------------
+def _write_tables(plan: StudyPlan, run_id: str, name: str, phase: str, tables: dict) -> list[str]:
+    # results store when pyarrow is available, CSVs under outputs/study otherwise
+    out = []
+    for table, df in tables.items():
+        if store_available():
+            store = ResultsStore(plan.root / STORE_ROOT)
+            rid = store.write(phase, table, df, run_id=f"{run_id}.{name}",
+                              meta={"study": plan.study, "run": name})
+            out.append(f"{store.root}/{phase}/{table} (run {rid})")
+        else:
+            p = plan.root / "outputs" / "study" / plan.study / run_id / name / f"{table}.csv"
+            p.parent.mkdir(parents=True, exist_ok=True)
+            df.to_csv(p, index=False)
+            out.append(str(p))
+    return out
+
+
+def execute_plan(
+    plan: StudyPlan,
+    *,
+    workers: Optional[int] = None,
+    run_id: str = "local",
+    write: bool = True,
+) -> dict[str, Any]:
+    """
+    Run plan level by level; nodes within a level run on a thread pool
+    (reads and the NumPy / pandas kernels release the GIL for most of their
+    time). Only the node functions run on the pool: a level's tables are
+    written (and reported) by the calling thread once the level is done,
+    in plan order, so results-store runs and their _latest pointers are
+    deterministic. Intermediate results are dropped once their last
+    consumer is done. Returns {run name: result}: phase 2 -> {"sanity",
+    "strategy_series"}, phase 3 -> prepared panel, phase 4 ->
+    {"oos_series", "oos_summary", "exposure_specs"}.
+    """
+    workers = plan.workers if workers is None else workers
+    writes = {key for key, node in plan.nodes.items() if node.kind in ("phase2", "phase4")}
+
+    consumers = {key: 0 for key in plan.nodes}
+    for node in plan.nodes.values():
+        for d in node.deps:
+            consumers[d] += 1
+
+    cache: dict[str, Any] = {}
+    results: dict[str, Any] = {}
+
+    def call(key: str) -> tuple[Any, float]:
+        node = plan.nodes[key]
+        t0 = time.perf_counter()
+        out = node.fn(*[cache[d] for d in node.deps])
+        return out, time.perf_counter() - t0
+
+    for lvl, keys in enumerate(plan.levels()):
+        with stage(f"level{lvl}", n_nodes=len(keys)) as st:
+            if workers > 1 and len(keys) > 1:
+                with ThreadPoolExecutor(max_workers=min(workers, len(keys))) as ex:
+                    outs = list(ex.map(call, keys))
+            else:
+                outs = [call(k) for k in keys]
+            st["nodes"] = {k: round(t, 6) for k, (_, t) in zip(keys, outs)}
+
+        for key, (out, _) in zip(keys, outs):
+            cache[key] = out
+            node = plan.nodes[key]
+            for name in node.runs:
+                results[name] = out
+                if write and key in writes:
+                    for line in _write_tables(plan, run_id, name, node.kind, out):
+                        print(f"[study] {name}: wrote {line}")
+            for d in plan.nodes[key].deps:
+                consumers[d] -= 1
+                if consumers[d] == 0:
+                    cache.pop(d, None)
+    return results
+
+
+def study_summary(plan: StudyPlan, results: dict[str, Any]) -> pd.DataFrame:
+    """
+    Every phase 4 run's OOS summary stacked, with a `run` column.
+    """
+    frames = [
+        results[name]["oos_summary"].assign(run=name)
+        for name, key in plan.run_nodes.items()
+        if plan.nodes[key].kind == "phase4"
+    ]
+    if not frames:
+        return pd.DataFrame()
+    out = pd.concat(frames, ignore_index=True)
+    return out[["run"] + [c for c in out.columns if c != "run"]]
+
+
+def run_study(
+    spec: dict,
+    *,
+    root: Optional[Path | str] = None,
+    workers: Optional[int] = None,
+    profile: Optional[bool] = None,
+    write: bool = True,
+) -> tuple[dict[str, Any], pd.DataFrame]:
+    """
+    Compile and run a study under one RunLog (outputs/study/logs/). Each run's
+    tables go to the results store as phase2 / phase4 runs with id
+    <study run id>.<run name>; the stacked phase 4 summary is stored as
+    study/summary. Returns (results, summary).
+    """
+    plan = compile_plan(spec, root=root)
+    log_dir = plan.root / "outputs" / "study" / "logs"
+    with RunLog("study", log_dir=log_dir, profile=profile,
+                meta={"study": plan.study, "n_runs": len(plan.run_nodes), "n_nodes": len(plan.nodes)}) as log:
+        run_id = f"{plan.study}-{log.run_id}"
+        results = execute_plan(plan, workers=workers, run_id=run_id, write=write)
+        summary = study_summary(plan, results)
+        if write and not summary.empty:
+            for line in _write_tables(plan, run_id, "all", "study", {"summary": summary}):
+                print(f"[study] wrote {line}")
+    print(f"[study] run log: {log.path}")
+    return results, summary
@@ -0,0 +1,243 @@
+# src/core/stage_cache.py
+
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sys
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Optional
+
+import pandas as pd
+
+from src.utils.project_root import get_project_root
+
+
+CACHE_DIR = Path("data/cache/stages")
+MAX_BYTES = 2 * 1024 ** 3
+
+
+_DIGESTS: dict[str, tuple[tuple[int, int], str]] = {}
+
+
+def _module_digest(mod: ModuleType) -> str:
+    # sha256 of a module's source file, memoized on (mtime, size)
+    path = getattr(mod, "__file__", None)
+    if not path or not os.path.exists(path):
+        return "builtin"
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    hit = _DIGESTS.get(path)
+    if hit is None or hit[0] != stamp:
+        with open(path, "rb") as f:
+            hit = (stamp, hashlib.sha256(f.read()).hexdigest()[:16])
+        _DIGESTS[path] = hit
+    return hit[1]
+
+
+def code_dependencies(func: Callable) -> dict[str, str]:
+    """
+    {module: source digest} for the module defining func and every module
+    of the same top-level package it reaches through module globals
+    (imported modules, functions and classes), transitively. Editing a
+    helper a stage calls, such as a signal or normalization kernel,
+    therefore changes the stage's key.
+    """
+    root = getattr(func, "__module__", None)
+    if root is None or root not in sys.modules:
+        return {}
+    pkg = root.split(".")[0]
+
+    def _ours(name) -> bool:
+        return isinstance(name, str) and (name == pkg or name.startswith(pkg + ".")) and name in sys.modules
+
+    seen = {root}
+    todo = [root]
+    while todo:
+        mod = sys.modules[todo.pop()]
+        for v in list(vars(mod).values()):
+            name = v.__name__ if isinstance(v, ModuleType) else getattr(v, "__module__", None)
+            if _ours(name) and name not in seen:
+                seen.add(name)
+                todo.append(name)
+    return {m: _module_digest(sys.modules[m]) for m in sorted(seen)}
+
+
+class Stage:
+    """
+    One pipeline step.
+
+    func is called as func(*upstream_outputs, **params). The stage's cache
+    key hashes its name, version, params, the source of func, the source
+    digests of the modules it depends on (code_dependencies), any extra
+    fingerprint tokens (e.g. a source-file digest) and the keys of its
+    inputs, so a change anywhere upstream invalidates everything below it.
+    Bump version to invalidate a stage whose behaviour depends on anything
+    else (data files it reads itself, third-party library versions).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable,
+        *,
+        inputs: tuple[str, ...] = (),
+        params: Optional[dict] = None,
+        fingerprint: Optional[Callable[[], str]] = None,
+        version: str = "1",
+        cache: bool = True,
+    ):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.params = dict(params or {})
+        self.fingerprint = fingerprint
+        self.version = version
+        self.cache = cache
+
+    def key(self, input_keys: list[str]) -> str:
+        try:
+            code = inspect.getsource(self.func)
+        except (OSError, TypeError):
+            code = getattr(self.func, "__qualname__", repr(self.func))
+
+        payload = json.dumps(
+            {
+                "name": self.name,
+                "version": self.version,
+                "params": self.params,
+                "code": hashlib.sha256(code.encode()).hexdigest(),
+                "modules": code_dependencies(self.func),
+                "fingerprint": self.fingerprint() if self.fingerprint else None,
+                "inputs": input_keys,
+            },
+            sort_keys=True,
+            default=repr,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+class StageCache:
+    """
+    Content-addressed on-disk store of stage outputs with size-bounded LRU
+    eviction (file mtime is bumped on every hit).
+    """
+
+    def __init__(self, root: Optional[Path] = None, *, max_bytes: int = MAX_BYTES):
+        self.root = Path(root) if root is not None else get_project_root() / CACHE_DIR
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    def _path(self, name: str, key: str) -> Path:
+        return self.root / f"{name}.{key}.pkl"
+
+    def get(self, name: str, key: str) -> tuple[bool, Any]:
+        p = self._path(name, key)
+        try:
+            with open(p, "rb") as f:
+                value = pickle.load(f)
+            os.utime(p)
+        except FileNotFoundError:
+            # absent, or evicted by another process sharing the cache
+            return False, None
+        return True, value
+
+    def put(self, name: str, key: str, value: Any) -> None:
+        p = self._path(name, key)
+        tmp = p.with_suffix(f".{os.getpid()}.tmp")   # per-process: writers may race on one key
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(p)
+        self.evict()
+
+    def evict(self) -> None:
+        # several processes may share the cache, so files can vanish
+        # between glob, stat and unlink; missing files are simply skipped
+        entries = []
+        for p in self.root.glob("*.pkl"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        entries.sort(key=lambda e: e[0])
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in entries:
+            if total <= self.max_bytes:
+                break
+            total -= size
+            p.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        for p in self.root.glob("*.pkl"):
+            p.unlink(missing_ok=True)
+
+
+def run_stages(
+    stages: list[Stage],
+    cache: Optional[StageCache] = None,
+    *,
+    targets: Optional[list[str]] = None,
+) -> tuple[dict[str, Any], pd.DataFrame]:
+    """
+    Run the stages needed for `targets` (default: the last stage), reusing
+    cached outputs whose keys are unchanged.
+
+    Keys are computed for every stage first. A cached stage is loaded
+    without touching its inputs, so upstream stages are only read back when
+    a downstream stage actually has to rerun.
+
+    Returns (outputs by stage name, report) where report has one row per
+    stage: stage, key, status ("hit", "miss" or "skipped"), seconds.
+    """
+    by_name = {st.name: st for st in stages}
+    keys: dict[str, str] = {}
+    for st in stages:
+        missing = [i for i in st.inputs if i not in keys]
+        if missing:
+            raise KeyError(f"Stage '{st.name}' depends on unknown stages: {missing}")
+        keys[st.name] = st.key([keys[i] for i in st.inputs])
+
+    outputs: dict[str, Any] = {}
+    status = {st.name: "skipped" for st in stages}
+    seconds = {st.name: 0.0 for st in stages}
+
+    def _resolve(name: str) -> Any:
+        if name in outputs:
+            return outputs[name]
+        st = by_name[name]
+
+        t0 = time.perf_counter()
+        hit, value = (False, None)
+        if cache is not None and st.cache:
+            hit, value = cache.get(name, keys[name])
+        seconds[name] += time.perf_counter() - t0
+
+        if not hit:
+            args = [_resolve(i) for i in st.inputs]
+            t0 = time.perf_counter()
+            value = st.func(*args, **st.params)
+            if cache is not None and st.cache:
+                cache.put(name, keys[name], value)
+            seconds[name] += time.perf_counter() - t0
+
+        status[name] = "hit" if hit else "miss"
+        outputs[name] = value
+        return value
+
+    for name in targets or [stages[-1].name]:
+        _resolve(name)
+
+    report = pd.DataFrame({
+        "stage": [st.name for st in stages],
+        "key": [keys[st.name] for st in stages],
+        "status": [status[st.name] for st in stages],
+        "seconds": [seconds[st.name] for st in stages],
+    })
+    return outputs, report
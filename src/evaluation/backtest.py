@@ -1,16 +1,176 @@
 # src/evaluation/backtest.py
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import numpy as np
 import pandas as pd
 
+from src.utils.panel_utils import Panel
+
+
 def compute_forward_return(
-    df: pd.DataFrame,
+    df: pd.DataFrame | Panel,
     horizon: int = 12,
     price_col: str = "price",
+    group_col: str = "region",
 ) -> pd.DataFrame:
     """
     Compute forward return used for IC / PnL proxy.
     NO side effects, pure function.
+
+    Follows the date-grid rule of forward_return_block: the return at t
+    is taken h steps along the panel's date axis within the same region
+    (group_col, when present), never h rows down. A region with no row at
+    t + h gets NaN rather than a return over a longer span, and rows
+    with a missing date or region get NaN.
+
+    A Panel gets a 'fwd_return' field in place (shifted along its time
+    axis, so never across regions) and is returned.
     """
+    if isinstance(df, Panel):
+        P = df.field(price_col).astype(float)
+        fwd = np.full_like(P, np.nan)
+        if horizon < len(P):
+            with np.errstate(invalid="ignore", divide="ignore"):
+                fwd[:len(P) - horizon] = P[horizon:] / P[:len(P) - horizon] - 1.0
+        df.add_field("fwd_return", fwd)
+        return df
+
+    blk = forward_return_block(
+        df,
+        [horizon],
+        price_col=price_col,
+        group_col=group_col if group_col in df.columns else None,
+        dtype=np.float64,
+    )
     out = df.copy()
-    out["fwd_return"] = out[price_col].pct_change(horizon).shift(-horizon)
+    out["fwd_return"] = block_rows(blk, "simple")
     return out
 
+
+def forward_return_block(
+    df: pd.DataFrame | Panel,
+    horizons: Sequence[int] = (1, 4, 12),
+    *,
+    price_col: str = "price",
+    group_col: Optional[str] = "region",
+    time_col: str = "date",
+    dtype=np.float32,
+) -> dict:
+    """
+    Forward simple/log returns, forward min and forward max drawdown for
+    several horizons, per region, in one pass.
+
+    Prices are scattered onto a dense (time x region) grid (only the key
+    and price columns are read), so shifting along the time axis can never
+    cross a region boundary. One sweep over k = 1..max(horizons) carries a
+    running min, running peak and running drawdown, and records them at
+    each requested horizon.
+
+    Date-grid rule: the grid's time axis is the sorted set of dates seen
+    in the frame, and horizon h means h steps along that axis within one
+    region. A region with no row at some date has a NaN cell there, so
+    any return that would span it is NaN instead of silently covering a
+    longer period. Rows whose date or region is missing are left off the
+    grid (t_idx / r_idx = -1); read values back with block_rows, which
+    gives those rows NaN. Duplicate (date, region) keys raise, since h
+    steps ahead is then ambiguous.
+
+    For horizon h at time t (NaN when t + h runs past the data):
+        simple  : P[t+h] / P[t] - 1
+        log     : log P[t+h] - log P[t]
+        fwd_min : min(P[t+1 .. t+h]) / P[t] - 1
+        fwd_mdd : worst peak-to-trough drawdown along P[t .. t+h] (<= 0)
+
+    Returns
+    -------
+    dict
+        dates, regions : grid axes
+        horizons       : list of horizons
+        t_idx, r_idx   : grid position of every input row (-1 for rows
+                         left off the grid); block_rows(block, kind, k)
+                         lines up with df
+        simple, log, fwd_min, fwd_mdd : (T, R, H) arrays of `dtype`
+
+    A Panel is read directly (its price field is already on the grid);
+    t_idx / r_idx then enumerate every grid cell in (time, region) order.
+    """
+    horizons = list(horizons)
+    if isinstance(df, Panel):
+        T, R, _ = df.shape
+        t_idx, r_idx = np.repeat(np.arange(T), R), np.tile(np.arange(R), T)
+        P = df.field(price_col).astype(float)
+        return _forward_block(P, horizons, dtype, df.dates, df.regions, t_idx, r_idx)
+
+    t_idx, dates = pd.factorize(df[time_col], sort=True)
+    if group_col is None:
+        r_idx, regions = np.zeros(len(df), dtype=np.int64), pd.Index([None])
+    else:
+        r_idx, regions = pd.factorize(df[group_col], sort=True)
+
+    off = (t_idx < 0) | (r_idx < 0)
+    if off.any():
+        t_idx, r_idx = t_idx.copy(), r_idx.copy()
+        t_idx[off] = r_idx[off] = -1
+    on = ~off
+
+    T, R = len(dates), len(regions)
+    flat = t_idx[on] * R + r_idx[on]
+    if len(np.unique(flat)) != len(flat):
+        raise ValueError(f"duplicate ({time_col}, {group_col}) rows")
+
+    P = np.full((T, R), np.nan)
+    P[t_idx[on], r_idx[on]] = df[price_col].to_numpy(dtype=float)[on]
+    return _forward_block(P, horizons, dtype, dates, regions, t_idx, r_idx)
+
+
+def block_rows(block: dict, kind: str, i: int = 0) -> np.ndarray:
+    """
+    Values of block[kind] for horizon position i, one per input row of
+    forward_return_block (NaN for rows left off the grid).
+    """
+    t_idx, r_idx = block["t_idx"], block["r_idx"]
+    vals = block[kind][t_idx, r_idx, i]
+    off = t_idx < 0
+    if off.any():
+        vals = vals.copy()
+        vals[off] = np.nan
+    return vals
+
+
+def _forward_block(P, horizons, dtype, dates, regions, t_idx, r_idx) -> dict:
+    T, R = P.shape
+    H = len(horizons)
+    out = {k: np.full((T, R, H), np.nan) for k in ("simple", "log", "fwd_min", "fwd_mdd")}
+    pos = {h: i for i, h in enumerate(horizons)}
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        logP = np.log(P)
+        run_min = np.full((T, R), np.inf)
+        peak = P.copy()
+        mdd = np.zeros((T, R))
+        for k in range(1, max(horizons) + 1 if horizons else 1):
+            if k >= T:
+                break
+            nxt = P[k:]
+            m = T - k
+            run_min[:m] = np.minimum(run_min[:m], nxt)
+            peak[:m] = np.maximum(peak[:m], nxt)
+            mdd[:m] = np.minimum(mdd[:m], nxt / peak[:m] - 1.0)
+            if k in pos:
+                i = pos[k]
+                out["simple"][:m, :, i] = nxt / P[:m] - 1.0
+                out["log"][:m, :, i] = logP[k:] - logP[:m]
+                out["fwd_min"][:m, :, i] = run_min[:m] / P[:m] - 1.0
+                out["fwd_mdd"][:m, :, i] = mdd[:m]
+
+    block = {k: v.astype(dtype, copy=False) for k, v in out.items()}
+    block.update({
+        "dates": dates,
+        "regions": regions,
+        "horizons": horizons,
+        "t_idx": t_idx,
+        "r_idx": r_idx,
+    })
+    return block
@@ -0,0 +1,352 @@
+# src/evaluation/ic.py
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+
+# sufficient statistics, in this order along axis 1 of every stats block
+STATS = ("n", "sx", "sy", "sxx", "syy", "sxy", "npos")
+
+
+def _as_list(x) -> list:
+    if x is None:
+        return []
+    if isinstance(x, str):
+        return [x]
+    return list(x)
+
+
+def _factorize_keys(frame: pd.DataFrame, keys: list[str]) -> tuple[np.ndarray, pd.DataFrame]:
+    """
+    Sorted group codes for `keys` (-1 where any key is missing) and a frame
+    with the key values of each code.
+    """
+    if not keys:
+        return np.zeros(len(frame), dtype=np.int64), pd.DataFrame({"_all": [None]})
+    g = frame.groupby(keys, sort=True, observed=True, dropna=True)
+    codes = g.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+    cells = g.size().index.to_frame(index=False)
+    return codes, cells
+
+
+def _cell_stats(
+    df: pd.DataFrame,
+    signal_cols: list[str],
+    return_cols: list[str],
+    keys: list[str],
+) -> tuple[pd.DataFrame, np.ndarray]:
+    """
+    Pairwise-complete sufficient statistics for every (signal, return) pair
+    within every cell of `keys`.
+
+    Columns are centered on their global mean first (correlation is shift
+    invariant, and it keeps the sums of squares well conditioned).
+
+    Returns (cells, S) where cells holds the key values of each cell and S
+    has shape (n_cells, len(STATS), n_signals, n_returns).
+    """
+    X = df[signal_cols].to_numpy(dtype=float)
+    Y = df[return_cols].to_numpy(dtype=float)
+    vx, vy = ~np.isnan(X), ~np.isnan(Y)
+    # signs for positive_ratio come from the raw values
+    px = np.where(vx, np.sign(X), 0.0)
+    py = np.where(vy, np.sign(Y), 0.0)
+    X = np.where(vx, X - np.nanmean(X, axis=0), 0.0)
+    Y = np.where(vy, Y - np.nanmean(Y, axis=0), 0.0)
+
+    codes, cells = _factorize_keys(df, keys)
+
+    keep = codes >= 0
+    order = np.argsort(codes[keep], kind="stable")
+    rows = np.flatnonzero(keep)[order]
+    sc = codes[rows]
+    ns, nr = X.shape[1], Y.shape[1]
+    S = np.zeros((len(cells), len(STATS), ns, nr))
+    if not len(sc):
+        return cells, S
+
+    # every statistic is a per-cell product L_i.T @ R_j of one block of
+    # L = [mask, x, x^2, sign^2, sign] with one block of the matching R
+    L = np.concatenate([vx, X, X * X, px * px, px], axis=1, dtype=float)
+    R = np.concatenate([vy, Y, Y * Y, py * py, py], axis=1, dtype=float)
+    pairs = ((0, 0), (1, 0), (0, 1), (2, 0), (0, 2), (1, 1))
+
+    starts = np.r_[0, np.flatnonzero(np.diff(sc)) + 1]
+    sizes = np.diff(np.r_[starts, len(sc)])
+    seg = np.repeat(np.arange(len(starts)), sizes)
+    pos = np.arange(len(sc)) - starts[seg]
+
+    # cells are grouped into power-of-two size classes, zero-padded to the
+    # largest cell of their class and multiplied as one batched matmul per
+    # class: BLAS products with no loop over cells, and at most 2x padding
+    # however unequal the cells are
+    size_class = np.ceil(np.log2(sizes)).astype(np.int64)
+    for c in np.unique(size_class):
+        segs = np.flatnonzero(size_class == c)
+        local = np.empty(len(starts), dtype=np.int64)
+        local[segs] = np.arange(len(segs))
+        r = np.flatnonzero(size_class[seg] == c)
+        m = int(sizes[segs].max())
+
+        Lp = np.zeros((len(segs), m, L.shape[1]))
+        Rp = np.zeros((len(segs), m, R.shape[1]))
+        Lp[local[seg[r]], pos[r]] = L[rows[r]]
+        Rp[local[seg[r]], pos[r]] = R[rows[r]]
+        P = Lp.transpose(0, 2, 1) @ Rp
+
+        def blk(i, j):
+            return P[:, i * ns:(i + 1) * ns, j * nr:(j + 1) * nr]
+
+        cell = sc[starts[segs]]
+        for k, (i, j) in enumerate(pairs):
+            S[cell, k] = blk(i, j)
+        S[cell, STATS.index("npos")] = (blk(3, 3) + blk(4, 4)) / 2.0
+
+    return cells, S
+
+
+def _corr_from_stats(S: np.ndarray) -> np.ndarray:
+    n, sx, sy, sxx, syy, sxy = (S[..., i, :, :] for i in range(6))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / n
+        vx = sxx - sx * sx / n
+        vy = syy - sy * sy / n
+        return cov / np.sqrt(vx * vy)
+
+
+def _to_long(
+    cells: pd.DataFrame,
+    values: dict[str, np.ndarray],
+    signal_cols: list[str],
+    return_cols: list[str],
+) -> pd.DataFrame:
+    C, Sn, Rn = next(iter(values.values())).shape
+    out = cells.loc[np.repeat(np.arange(C), Sn * Rn)].reset_index(drop=True)
+    out["signal"] = np.tile(np.repeat(signal_cols, Rn), C)
+    out["return"] = np.tile(return_cols, C * Sn)
+    for k, v in values.items():
+        out[k] = v.reshape(-1)
+    return out
+
+
+def grouped_ic(
+    df: pd.DataFrame,
+    signal_cols: Sequence[str],
+    return_cols: Sequence[str],
+    *,
+    by: str | Sequence[str] | None = "regime",
+    method: str = "pearson",
+    min_obs: int = 12,
+) -> pd.DataFrame:
+    """
+    IC of every signal against every return within every `by` cell, in one
+    pass over grouped sufficient statistics.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Long panel.
+    signal_cols, return_cols : list[str]
+        Signal and forward-return columns; all pairs are evaluated.
+    by : str | list[str], optional
+        Grouping keys, e.g. "regime", ["regime", "date"], ["regime", "region"].
+        None pools everything.
+    method : str
+        "pearson" or "spearman". Spearman ranks each column within each
+        cell over its own non-NaN values (average ties), which equals
+        pairwise Spearman when signal and return share a NaN mask.
+    min_obs : int
+        Minimum pairwise-complete observations per cell; smaller cells are
+        dropped.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns: <by...>, signal, return, ic, positive_ratio, n_obs
+    """
+    signal_cols, return_cols, keys = list(signal_cols), list(return_cols), _as_list(by)
+    if method not in ("pearson", "spearman"):
+        raise ValueError(f"Unknown method: {method}")
+
+    required = set(signal_cols) | set(return_cols) | set(keys)
+    missing = required - set(df.columns)
+    if missing:
+        raise KeyError(f"Missing required columns: {missing}")
+
+    cols = list(dict.fromkeys(signal_cols + return_cols))
+    d = df[keys + cols]
+    if method == "spearman":
+        ranked = d.groupby(keys, observed=True, sort=False)[cols].rank() if keys else d[cols].rank()
+        d = pd.concat([d[keys], ranked], axis=1)
+
+    cells, S = _cell_stats(d, signal_cols, return_cols, keys)
+
+    if method == "spearman":
+        # the sign test must use raw values, not ranks
+        _, S_raw = _cell_stats(df[keys + cols], signal_cols, return_cols, keys)
+        S[:, STATS.index("npos")] = S_raw[:, STATS.index("npos")]
+
+    n = S[:, 0]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = _to_long(
+            cells,
+            {
+                "ic": _corr_from_stats(S),
+                "positive_ratio": S[:, STATS.index("npos")] / n,
+                "n_obs": n.astype(np.int64),
+            },
+            signal_cols,
+            return_cols,
+        )
+    if not keys:
+        out = out.drop(columns=["_all"])
+    return out[out["n_obs"] >= min_obs].reset_index(drop=True)
+
+
+def rolling_ic(
+    df: pd.DataFrame,
+    signal_cols: Sequence[str],
+    return_cols: Sequence[str],
+    *,
+    window: int,
+    time_col: str = "date",
+    by: str | Sequence[str] | None = None,
+    min_obs: int = 12,
+) -> pd.DataFrame:
+    """
+    Pooled Pearson IC over a rolling window of `window` dates.
+
+    The window is measured on the panel's date axis (every distinct
+    time_col value in df): the window ending at t covers t and the
+    window - 1 dates before it, even where a by-cell has no rows on some
+    of them, so a sparse cell's window holds fewer observed dates rather
+    than reaching further back.
+
+    Per-date sufficient statistics are accumulated once and summed over the
+    window with a cumulative sum, so every window costs O(1). With `by`,
+    each by-cell gets its own rolling series.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns: <by...>, <time_col>, signal, return, ic, positive_ratio, n_obs
+    """
+    signal_cols, return_cols, keys = list(signal_cols), list(return_cols), _as_list(by)
+    cells, S = _cell_stats(df, signal_cols, return_cols, keys + [time_col])
+
+    # rows of `cells` are sorted by (by..., date); roll within each by-cell
+    # over date positions, so (by-cell, date) sorts as one increasing key
+    grp, _ = _factorize_keys(cells, keys)
+    t, dates = pd.factorize(cells[time_col], sort=True)
+    key = grp * (len(dates) + window) + t
+
+    cs = np.concatenate([np.zeros((1,) + S.shape[1:]), np.cumsum(S, axis=0)])
+    idx = np.arange(len(cells))
+    lo = np.searchsorted(key, key - window + 1, side="left")
+    W = cs[idx + 1] - cs[lo]
+
+    n = W[:, 0]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = _to_long(
+            cells,
+            {
+                "ic": _corr_from_stats(W),
+                "positive_ratio": W[:, STATS.index("npos")] / n,
+                "n_obs": n.astype(np.int64),
+            },
+            signal_cols,
+            return_cols,
+        )
+    return out[out["n_obs"] >= min_obs].reset_index(drop=True)
+
+
+def block_bootstrap_index(
+    n_periods: int,
+    *,
+    block: int,
+    n_boot: int,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Moving-block bootstrap of period indices: (n_boot, n_periods) array,
+    built from randomly started contiguous blocks of length `block`.
+    """
+    rng = np.random.default_rng(seed)
+    n_blocks = -(-n_periods // block)
+    starts = rng.integers(0, max(n_periods - block + 1, 1), size=(n_boot, n_blocks))
+    idx = (starts[..., None] + np.arange(block)).reshape(n_boot, -1)[:, :n_periods]
+    return np.minimum(idx, n_periods - 1)
+
+
+def bootstrap_ic(
+    df: pd.DataFrame,
+    signal_cols: Sequence[str],
+    return_cols: Sequence[str],
+    *,
+    by: str | Sequence[str] | None = "regime",
+    time_col: str = "date",
+    block: int = 4,
+    n_boot: int = 1000,
+    ci: tuple[float, float] = (0.05, 0.95),
+    seed: int = 0,
+    min_obs: int = 12,
+) -> pd.DataFrame:
+    """
+    Block-bootstrap confidence intervals for pooled Pearson IC by `by` cell.
+
+    Dates are resampled in blocks (preserving serial dependence of
+    overlapping forward returns). Per-(cell, date) sufficient statistics are
+    computed once; each replicate is a count-weighted sum of them, so all
+    replicates come out of one (n_boot x dates) @ (dates x stats) product.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns: <by...>, signal, return, ic, ic_lo, ic_hi, ic_se, n_obs
+    """
+    signal_cols, return_cols, keys = list(signal_cols), list(return_cols), _as_list(by)
+
+    dates, d_codes = np.unique(df[time_col].to_numpy(), return_inverse=True)
+    d = df.assign(_t=d_codes)
+    cells, S = _cell_stats(d, signal_cols, return_cols, keys + ["_t"])
+
+    g_codes, g_cells = _factorize_keys(cells, keys)
+    G = len(g_cells)
+
+    # dense (G, T, stats...) block
+    T = len(dates)
+    D = np.zeros((G, T) + S.shape[1:])
+    D[g_codes, cells["_t"].to_numpy()] = S
+
+    counts = np.zeros((n_boot, T))
+    idx = block_bootstrap_index(T, block=block, n_boot=n_boot, seed=seed)
+    np.add.at(counts, (np.arange(n_boot)[:, None], idx), 1.0)
+
+    flat = D.reshape(G, T, -1)
+    boot = np.einsum("bt,gtk->gbk", counts, flat).reshape((G, n_boot) + S.shape[1:])
+    point = flat.sum(axis=1).reshape((G,) + S.shape[1:])
+
+    r_boot = _corr_from_stats(boot)
+    with np.errstate(invalid="ignore"):
+        lo, hi = np.nanquantile(r_boot, ci, axis=1)
+        se = np.nanstd(r_boot, axis=1, ddof=1)
+
+    out = _to_long(
+        g_cells,
+        {
+            "ic": _corr_from_stats(point),
+            "ic_lo": lo,
+            "ic_hi": hi,
+            "ic_se": se,
+            "n_obs": point[:, 0].astype(np.int64),
+        },
+        signal_cols,
+        return_cols,
+    )
+    if not keys:
+        out = out.drop(columns=["_all"])
+    return out[out["n_obs"] >= min_obs].reset_index(drop=True)
@@ -1 +1,426 @@
-phase10_decision_surface.py
\ No newline at end of file
+# src/evaluation/phase10_decision_surface.py
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.research.path_a.fit_logit import TERMS, bootstrap_interaction_logit, fit_logit_batched
+from src.research.path_a.thresholds import dti_thresholds_array
+
+
+# terms are products of base variables joined by "_x_" ("const" = 1)
+BASE_VARS = ("dti", "supply", "regime")
+SURFACE_TERMS = ["const", "dti", "supply", "regime", "dti_x_supply", "dti_x_regime", "supply_x_regime"]
+
+QUANTILES = (0.05, 0.50, 0.95)
+MAX_MB = 64
+CACHE_DIR = Path("outputs/phase10/surfaces")
+
+
+# -----------------------------
+# Terms / design
+# -----------------------------
+def _check_terms(terms: Sequence[str]):
+    for t in terms:
+        if t == "const":
+            continue
+        parts = t.split("_x_")
+        if any(v not in BASE_VARS for v in parts) or len(set(parts)) < len(parts):
+            raise ValueError(f"Unknown term: {t}")
+
+
+def term_values(terms: Sequence[str], values: dict[str, np.ndarray]) -> np.ndarray:
+    """
+    (p, n) term rows for base variable arrays of a common shape (n,).
+    """
+    _check_terms(terms)
+    n = len(next(iter(values.values())))
+    T = np.empty((len(terms), n))
+    for k, t in enumerate(terms):
+        if t == "const":
+            T[k] = 1.0
+            continue
+        row = np.ones(n)
+        for v in t.split("_x_"):
+            row = row * values[v]
+        T[k] = row
+    return T
+
+
+def surface_design(
+    df: pd.DataFrame,
+    terms: Sequence[str] = SURFACE_TERMS,
+    *,
+    supply_col: str = "supply_pressure",
+) -> np.ndarray:
+    """
+    (n, p) design for the surface model; regime must be numeric (0/1).
+    """
+    values = {
+        "dti": df["dti"].to_numpy(dtype=float),
+        "regime": df["regime"].to_numpy(dtype=float),
+    }
+    if any("supply" in t for t in terms):
+        values["supply"] = df[supply_col].to_numpy(dtype=float)
+    return term_values(terms, values).T
+
+
+# -----------------------------
+# Bootstrap fits
+# -----------------------------
+def _boot_weights(m: int, n_boot: int, rng) -> np.ndarray:
+    # replicate 0 = the original sample, the rest multinomial count weights
+    w = np.empty((n_boot + 1, m))
+    w[0] = 1.0
+    w[1:] = rng.multinomial(m, np.full(m, 1.0 / m), size=n_boot)
+    return w
+
+
+def bootstrap_surface_models(
+    df: pd.DataFrame,
+    *,
+    terms: Sequence[str] = SURFACE_TERMS,
+    y_col: str = "y",
+    ret_col: Optional[str] = None,
+    supply_col: str = "supply_pressure",
+    n_boot: int = 500,
+    seed: int = 0,
+) -> dict:
+    """
+    Bootstrap the correction logit (and optionally a linear forward-return
+    model) on the same resamples.
+
+    With terms == fit_logit.TERMS and no ret_col this is
+    bootstrap_interaction_logit. Otherwise every replicate is a count-weight
+    vector over one shared design, solved together by fit_logit_batched;
+    the return model is weighted least squares on the same weights, with
+    its residual std per replicate.
+
+    Returns
+    -------
+    dict
+        terms, logit (B, p), converged (B,), and when ret_col is given
+        ret (B, p) and ret_sigma (B,). Row 0 is the original fit.
+    """
+    terms = list(terms)
+    _check_terms(terms)
+
+    if terms == TERMS and ret_col is None:
+        boot = bootstrap_interaction_logit(df.rename(columns={y_col: "y"}), n_boot=n_boot, seed=seed)
+        return {
+            "terms": terms,
+            "logit": boot[TERMS].to_numpy(),
+            "converged": boot["converged"].to_numpy(),
+        }
+
+    need = ["dti", "regime", y_col] + ([supply_col] if any("supply" in t for t in terms) else [])
+    if ret_col is not None:
+        need.append(ret_col)
+    missing = set(need) - set(df.columns)
+    if missing:
+        raise KeyError(f"Missing required columns: {missing}")
+
+    d = df.dropna(subset=need)
+    X = surface_design(d, terms, supply_col=supply_col)
+    w = _boot_weights(len(d), n_boot, np.random.default_rng(seed))
+
+    params, converged = fit_logit_batched(X, d[y_col].to_numpy(dtype=float), w)
+    out = {"terms": terms, "logit": params, "converged": converged}
+
+    if ret_col is not None:
+        y = d[ret_col].to_numpy(dtype=float)
+        p = X.shape[1]
+        XtWX = np.einsum("np,bn,nq->bpq", X, w, X) + np.eye(p) * 1e-12
+        XtWy = np.einsum("np,bn->bp", X, w * y)
+        beta = np.linalg.solve(XtWX, XtWy[..., None])[..., 0]
+        resid = y[None, :] - beta @ X.T
+        dof = np.maximum(w.sum(axis=1) - p, 1.0)
+        out["ret"] = beta
+        out["ret_sigma"] = np.sqrt((w * resid ** 2).sum(axis=1) / dof)
+    return out
+
+
+# -----------------------------
+# Surfaces
+# -----------------------------
+def surface_grid(
+    dti: Sequence[float],
+    supply: Sequence[float] = (0.0,),
+    regimes: Sequence[float] = (0, 1),
+) -> dict[str, np.ndarray]:
+    """
+    Grid axes. Cells are the (dti, supply, regime) meshgrid, indexing="ij".
+    """
+    return {
+        "dti": np.asarray(dti, dtype=float),
+        "supply": np.asarray(supply, dtype=float),
+        "regime": np.asarray(regimes, dtype=float),
+    }
+
+
+def _grid_terms(terms: Sequence[str], grid: dict, a: int, b: int) -> np.ndarray:
+    # (p, b - a) term rows for flat cells a:b of the "ij" meshgrid, built
+    # without materializing the full grid
+    axes = [grid[v] for v in BASE_VARS]
+    idx = np.unravel_index(np.arange(a, b), tuple(len(x) for x in axes))
+    return term_values(terms, {v: x[i] for v, x, i in zip(BASE_VARS, axes, idx)})
+
+
+def evaluate_surface(
+    params: np.ndarray,
+    terms: Sequence[str],
+    grid: dict,
+    *,
+    link: str = "logit",
+    sigma: Optional[np.ndarray] = None,
+    quantiles: Sequence[float] = QUANTILES,
+    max_mb: float = MAX_MB,
+    seed: int = 0,
+) -> dict[str, np.ndarray]:
+    """
+    Broadcast B coefficient vectors over every grid cell.
+
+    Parameters
+    ----------
+    params : np.ndarray
+        (B, p) coefficients; row 0 is the point estimate, rows 1.. the
+        bootstrap replicates (use only converged ones).
+    terms : list[str]
+        Term names of the params columns.
+    grid : dict
+        surface_grid() axes.
+    link : str
+        "logit" -> probabilities, "identity" -> linear predictions.
+    sigma : np.ndarray, optional
+        (B,) residual std per replicate. When given, one N(0, sigma_b)
+        draw is added per replicate and cell, so quantiles describe the
+        predictive outcome distribution rather than the fitted mean alone.
+    quantiles : tuple
+        Quantiles across replicates, per cell.
+    max_mb : float
+        Cells are evaluated in chunks (terms included) so the per-chunk
+        working arrays stay under about this size.
+
+    Returns
+    -------
+    dict
+        point, mean : (D, S, G) arrays; q : (len(quantiles), D, S, G).
+    """
+    if link not in ("logit", "identity"):
+        raise ValueError(f"Unknown link: {link}")
+    params = np.atleast_2d(np.asarray(params, dtype=float))
+    _check_terms(terms)
+    shape = (len(grid["dti"]), len(grid["supply"]), len(grid["regime"]))
+    n_cells = int(np.prod(shape))
+    B, p = params.shape
+
+    point = np.empty(n_cells)
+    mean = np.empty(n_cells)
+    q = np.empty((len(quantiles), n_cells))
+
+    # eta, outcome and np.quantile's sorted copy: ~3 (B, chunk) float64
+    # arrays, plus the (p, chunk) terms
+    chunk = max(1, int(max_mb * 1e6 // (8 * (3 * B + p))))
+    rng = np.random.default_rng(seed)
+    for a in range(0, n_cells, chunk):
+        b = min(a + chunk, n_cells)
+        T = _grid_terms(terms, grid, a, b)
+        eta = params @ T
+        if link == "logit":
+            out = 1.0 / (1.0 + np.exp(-eta))
+        else:
+            out = eta
+            if sigma is not None:
+                out = out + np.asarray(sigma, dtype=float)[:, None] * rng.standard_normal(out.shape)
+        point[a:b] = eta[0] if link == "identity" else out[0]
+        body = out[1:] if B > 1 else out
+        mean[a:b] = body.mean(axis=0)
+        q[:, a:b] = np.quantile(body, quantiles, axis=0)
+
+    return {
+        "point": point.reshape(shape),
+        "mean": mean.reshape(shape),
+        "q": q.reshape((len(quantiles),) + shape),
+    }
+
+
+def threshold_curves(
+    params: np.ndarray,
+    terms: Sequence[str],
+    supply: Sequence[float],
+    *,
+    probs: Sequence[float] = (0.10, 0.20),
+    regimes: Sequence[float] = (0, 1),
+) -> np.ndarray:
+    """
+    DTI at which P(correction) = prob, for every supply level and regime:
+    (B, len(supply), len(regimes), len(probs)). The logit is linear in DTI
+    at fixed (supply, regime), so this is the surface's contour in closed
+    form; supply-free TERMS models go through dti_thresholds_array.
+    """
+    params = np.atleast_2d(np.asarray(params, dtype=float))
+    terms = list(terms)
+    supply = np.asarray(supply, dtype=float)
+    if terms == TERMS:
+        star = dti_thresholds_array(params, probs=probs, regimes=regimes)
+        return np.broadcast_to(star[:, None], (params.shape[0], len(supply)) + star.shape[1:]).copy()
+
+    _check_terms(terms)
+    S, R = np.meshgrid(supply, np.asarray(regimes, dtype=float), indexing="ij")
+    s, r = S.ravel(), R.ravel()
+    # eta = a(s, r) + slope(s, r) * dti
+    a = term_values(terms, {"dti": np.zeros_like(s), "supply": s, "regime": r})
+    one = term_values(terms, {"dti": np.ones_like(s), "supply": s, "regime": r})
+    A = params @ a
+    slope = params @ (one - a)
+
+    p = np.asarray(probs, dtype=float)
+    logit = np.log(p / (1 - p))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        star = (logit[None, None, :] - A[..., None]) / slope[..., None]
+    return star.reshape(params.shape[0], len(supply), len(regimes), len(p))
+
+
+def surface_frame(surface: dict, grid: dict, *, quantiles: Sequence[float] = QUANTILES) -> pd.DataFrame:
+    """
+    Long (dti, supply, regime, point, mean, q...) frame for plotting.
+    """
+    mesh = np.meshgrid(grid["dti"], grid["supply"], grid["regime"], indexing="ij")
+    out = pd.DataFrame({v: m.ravel() for v, m in zip(BASE_VARS, mesh)})
+    out["point"] = surface["point"].ravel()
+    out["mean"] = surface["mean"].ravel()
+    for k, qq in enumerate(quantiles):
+        out[f"q{qq:g}"] = surface["q"][k].ravel()
+    return out
+
+
+# -----------------------------
+# Cache
+# -----------------------------
+def model_fingerprint(params: np.ndarray, terms: Sequence[str], **extra) -> str:
+    """
+    Hash of the coefficients (exact bytes), term names and any evaluation
+    settings (grid, quantiles, link, ...).
+    """
+    h = hashlib.sha256(np.ascontiguousarray(params, dtype=float).tobytes())
+    h.update(json.dumps({"terms": list(terms), **extra}, sort_keys=True, default=_jsonable).encode())
+    return h.hexdigest()[:24]
+
+
+def _jsonable(v):
+    if isinstance(v, np.ndarray):
+        return v.tolist()
+    if isinstance(v, np.generic):
+        return v.item()
+    return repr(v)
+
+
+class SurfaceCache:
+    """
+    Evaluated surfaces keyed by model fingerprint: in memory for the
+    session and as .npz files under root, so re-rendering a surface (new
+    plot, different slice) never re-evaluates the grid.
+    """
+
+    def __init__(self, root: Optional[Path | str] = CACHE_DIR):
+        self.root = Path(root) if root is not None else None
+        self._mem: dict[str, dict] = {}
+
+    def _path(self, key: str) -> Optional[Path]:
+        return None if self.root is None else self.root / f"{key}.npz"
+
+    def get(self, key: str) -> Optional[dict]:
+        if key in self._mem:
+            return self._mem[key]
+        p = self._path(key)
+        if p is not None and p.exists():
+            with np.load(p) as z:
+                self._mem[key] = {k: z[k] for k in z.files}
+            return self._mem[key]
+        return None
+
+    def put(self, key: str, surface: dict) -> dict:
+        self._mem[key] = surface
+        p = self._path(key)
+        if p is not None:
+            p.parent.mkdir(parents=True, exist_ok=True)
+            tmp = p.with_suffix(".tmp.npz")
+            np.savez_compressed(tmp, **surface)
+            tmp.replace(p)
+        return surface
+
+
+def cached_surface(
+    params: np.ndarray,
+    terms: Sequence[str],
+    grid: dict,
+    *,
+    cache: Optional[SurfaceCache] = None,
+    link: str = "logit",
+    sigma: Optional[np.ndarray] = None,
+    quantiles: Sequence[float] = QUANTILES,
+    seed: int = 0,
+    max_mb: float = MAX_MB,
+) -> dict[str, np.ndarray]:
+    """
+    evaluate_surface through a SurfaceCache (default: the on-disk cache
+    under outputs/phase10/surfaces).
+    """
+    cache = SurfaceCache() if cache is None else cache
+    key = model_fingerprint(
+        params, terms,
+        grid=grid, link=link, quantiles=list(quantiles), seed=seed,
+        sigma=None if sigma is None else hashlib.sha256(np.asarray(sigma, dtype=float).tobytes()).hexdigest(),
+        # predictive draws are taken per chunk, so the chunking is part of the result
+        max_mb=None if sigma is None else max_mb,
+    )
+    hit = cache.get(key)
+    if hit is not None:
+        return hit
+    surface = evaluate_surface(
+        params, terms, grid, link=link, sigma=sigma, quantiles=quantiles, seed=seed, max_mb=max_mb,
+    )
+    return cache.put(key, surface)
+
+
+def decision_surfaces(
+    df: pd.DataFrame,
+    grid: dict,
+    *,
+    terms: Sequence[str] = SURFACE_TERMS,
+    y_col: str = "y",
+    ret_col: Optional[str] = None,
+    supply_col: str = "supply_pressure",
+    n_boot: int = 500,
+    quantiles: Sequence[float] = QUANTILES,
+    seed: int = 0,
+    cache: Optional[SurfaceCache] = None,
+) -> dict[str, dict]:
+    """
+    Fit (bootstrap_surface_models) and evaluate both surfaces over grid.
+
+    Returns {"prob": correction-probability surface, "ret": predictive
+    forward-return surface (when ret_col is given), "models": the fits}.
+    Non-converged logit replicates are dropped before evaluation.
+    """
+    models = bootstrap_surface_models(
+        df, terms=terms, y_col=y_col, ret_col=ret_col, supply_col=supply_col, n_boot=n_boot, seed=seed,
+    )
+    ok = models["converged"].copy()
+    ok[0] = True
+    out = {
+        "models": models,
+        "prob": cached_surface(models["logit"][ok], terms, grid, cache=cache, quantiles=quantiles, seed=seed),
+    }
+    if ret_col is not None:
+        out["ret"] = cached_surface(
+            models["ret"], terms, grid,
+            cache=cache, link="identity", sigma=models["ret_sigma"], quantiles=quantiles, seed=seed,
+        )
+    return out
@@ -1,11 +1,16 @@
 # src/evaluation/regime.py
 
+from __future__ import annotations
+
 import numpy as np
 import pandas as pd
 
+from src.evaluation.ic import grouped_ic
+from src.utils.panel_utils import Panel
+
 
 def assign_regime(
-    df: pd.DataFrame,
+    df: pd.DataFrame | Panel,
     *,
     return_col: str = "fwd_return",
     up_label: str = "up",
@@ -20,8 +25,9 @@ def assign_regime(
 
     Parameters
     ----------
-    df : pd.DataFrame
-        Must contain a forward return column.
+    df : pd.DataFrame or Panel
+        Must contain a forward return column. A Panel gets a coded
+        'regime' field in place (labels in panel.categories["regime"]).
     return_col : str
         Column name used to define regime.
     up_label : str
@@ -35,6 +41,13 @@ def assign_regime(
         Original DataFrame with an additional 'regime' column.
     """
 
+    if isinstance(df, Panel):
+        if return_col not in df:
+            raise KeyError(f"'{return_col}' not found in Panel")
+        codes = np.where(df.field(return_col) >= 0, 0, 1)
+        df.add_field("regime", codes, categories=[up_label, down_label])
+        return df
+
     if return_col not in df.columns:
         raise KeyError(f"'{return_col}' not found in DataFrame")
 
@@ -48,8 +61,9 @@ def assign_regime(
 
     return out
 
+
 def ic_by_regime(
-    df: pd.DataFrame,
+    df: pd.DataFrame | Panel,
     *,
     signal_col: str,
     return_col: str = "fwd_return",
@@ -58,6 +72,9 @@ def ic_by_regime(
     """
     Compute time-series IC by regime for a given signal.
 
+    Thin wrapper over src.evaluation.ic.grouped_ic for one signal/return
+    pair; use that directly for many signals, horizons or extra keys.
+
     Parameters
     ----------
     df : pd.DataFrame
@@ -82,28 +99,23 @@ def ic_by_regime(
             - n_obs
     """
 
+    if isinstance(df, Panel):
+        df = df.to_long([signal_col, return_col, "regime"])
+
     required = {signal_col, return_col, "regime"}
     missing = required - set(df.columns)
     if missing:
         raise KeyError(f"Missing required columns: {missing}")
 
-    d = df[[signal_col, return_col, "regime"]].dropna()
-
-    rows = []
-    for regime, g in d.groupby("regime"):
-        if len(g) < min_obs:
-            continue
-
-        ic = g[signal_col].corr(g[return_col])
-
-        rows.append({
-            "regime": regime,
-            "ic": ic,
-            "positive_ratio": (g[signal_col] * g[return_col] > 0).mean(),
-            "n_obs": len(g),
-        })
+    out = grouped_ic(
+        df,
+        [signal_col],
+        [return_col],
+        by="regime",
+        min_obs=min_obs,
+    )
 
-    if not rows:
+    if out.empty:
         return pd.DataFrame()
 
-    return pd.DataFrame(rows).set_index("regime")
+    return out.set_index("regime")[["ic", "positive_ratio", "n_obs"]]
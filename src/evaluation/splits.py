@@ -1,10 +1,130 @@
+from __future__ import annotations
+
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+
 def split_train_test(df, train_end="2018-12-31"):
     """
     Split dataframe into train/test by date.
     All rows with date <= train_end go to train.
     """
-    df = df.copy()
+    # boolean indexing already returns new frames, no defensive copy needed
     train = df[df["date"] <= train_end]
     test  = df[df["date"] > train_end]
     return train, test
 
+
+def _period_layout(dates) -> tuple[np.ndarray, np.ndarray, pd.Index]:
+    """
+    Rows grouped by period: (order, bounds, periods) where rows of period p
+    are order[bounds[p]:bounds[p + 1]].
+    """
+    codes, periods = pd.factorize(pd.Series(dates), sort=True)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(periods) + 1))
+    return order, bounds, periods
+
+
+def walk_forward_splits(
+    dates,
+    *,
+    scheme: str = "expanding",
+    test_size: int = 4,
+    step: Optional[int] = None,
+    train_size: Optional[int] = None,
+    min_train: int = 20,
+    purge: int = 0,
+    embargo: int = 0,
+    first_test=None,
+    n_folds: int = 5,
+) -> Iterator[dict]:
+    """
+    Time-ordered train/test folds over quarterly (or any) periods.
+
+    Parameters
+    ----------
+    dates : array-like
+        Period of every row (a panel may repeat dates across regions).
+    scheme : str
+        "expanding"    : train on all periods before the test block.
+        "rolling"      : train on the last `train_size` periods.
+        "purged_kfold" : `n_folds` contiguous test blocks; train on every
+                         other period minus purge/embargo gaps.
+    test_size : int
+        Periods per test block (walk-forward schemes).
+    step : int, optional
+        Periods between successive test starts (default test_size).
+    train_size : int, optional
+        Rolling window length in periods (required for scheme="rolling").
+    min_train : int
+        Minimum training periods for the first walk-forward fold.
+    purge : int
+        Periods dropped from the end of train before each test block. Set
+        it to the label horizon (e.g. 12 for 12-quarter forward returns) so
+        no training label overlaps the test window.
+    embargo : int
+        Periods dropped from train right after each test block
+        (purged_kfold only; walk-forward train never follows test).
+    first_test : optional
+        First test period for walk-forward schemes (e.g. "2011-03-31");
+        overrides min_train.
+
+    Yields
+    ------
+    dict
+        fold, train, test, train_start, train_end, test_start, test_end.
+        train/test are int64 row positions. In the walk-forward schemes
+        train is a contiguous slice of one shared row ordering (a view,
+        not a copy).
+    """
+    order, bounds, periods = _period_layout(dates)
+    P = len(periods)
+
+    def _rows(a: int, b: int) -> np.ndarray:
+        return order[bounds[a]:bounds[b]]
+
+    def _fold(i, train, test, tr_span, te_span):
+        return {
+            "fold": i,
+            "train": train,
+            "test": test,
+            "train_start": periods[tr_span[0]] if tr_span else None,
+            "train_end": periods[tr_span[1] - 1] if tr_span else None,
+            "test_start": periods[te_span[0]],
+            "test_end": periods[te_span[1] - 1],
+        }
+
+    if scheme in ("expanding", "rolling"):
+        if scheme == "rolling" and not train_size:
+            raise ValueError("scheme='rolling' requires train_size")
+        step = step or test_size
+        if first_test is not None:
+            start = int(pd.Index(periods).searchsorted(first_test))
+        else:
+            start = min_train + purge
+
+        i = 0
+        for t0 in range(start, P, step):
+            t1 = min(t0 + test_size, P)
+            tr_end = t0 - purge
+            tr_start = 0 if scheme == "expanding" else max(0, tr_end - train_size)
+            if tr_end - tr_start <= 0:
+                continue
+            yield _fold(i, _rows(tr_start, tr_end), _rows(t0, t1), (tr_start, tr_end), (t0, t1))
+            i += 1
+        return
+
+    if scheme == "purged_kfold":
+        edges = np.linspace(0, P, n_folds + 1).astype(int)
+        for i in range(n_folds):
+            t0, t1 = edges[i], edges[i + 1]
+            left = (0, max(t0 - purge, 0))
+            right = (min(t1 + embargo, P), P)
+            train = np.concatenate([_rows(*left), _rows(*right)])
+            yield _fold(i, train, _rows(t0, t1), None, (t0, t1))
+        return
+
+    raise ValueError(f"Unknown scheme: {scheme}")
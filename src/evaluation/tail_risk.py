@@ -0,0 +1,397 @@
+# src/evaluation/tail_risk.py
+
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+QUANTILES = (0.01, 0.05, 0.10, 0.50)
+ALPHAS = (0.05, 0.10)
+
+# above this many distinct partition points a full sort is cheaper
+_MAX_KTH = 64
+
+
+def _qname(q: float) -> str:
+    return f"q{q * 100:g}"
+
+
+def _cvar_name(a: float) -> str:
+    return f"cvar{a * 100:g}"
+
+
+# -----------------------------
+# Exact metrics
+# -----------------------------
+def _drawdown(R: np.ndarray, compound: bool) -> np.ndarray:
+    # NaN periods are flat (no position / no data)
+    r = np.where(np.isnan(R), 0.0, R)
+    if compound:
+        equity = np.cumprod(1.0 + r, axis=-1)
+        peak = np.maximum.accumulate(np.maximum(equity, 1.0), axis=-1)
+        dd = equity / peak - 1.0
+    else:
+        cum = np.cumsum(r, axis=-1)
+        dd = cum - np.maximum.accumulate(np.maximum(cum, 0.0), axis=-1)
+    return dd.min(axis=-1) if dd.shape[-1] else np.zeros(dd.shape[:-1])
+
+
+def tail_metrics(
+    R: np.ndarray,
+    *,
+    quantiles: Sequence[float] = QUANTILES,
+    alphas: Sequence[float] = ALPHAS,
+    mar: float = 0.0,
+    compound: bool = True,
+) -> dict[str, np.ndarray]:
+    """
+    Distributional / tail-risk metrics for every variant at once.
+
+    Parameters
+    ----------
+    R : np.ndarray
+        (..., T) per-period returns; leading dims are variants (strategies,
+        bootstrap paths, ...). NaN = missing.
+    quantiles : tuple
+        Lower-tail (or any) quantiles, linear interpolation as np.nanquantile.
+    alphas : tuple
+        CVaR levels: mean of the ceil(alpha * n) worst returns.
+    mar : float
+        Minimum acceptable return for the downside deviation.
+    compound : bool
+        Drawdowns on compounded (True) or summed returns.
+
+    All order statistics come from one np.partition over the needed ranks
+    (a full sort only when rows have many different lengths), drawdowns
+    from a cumulative max along time.
+
+    Returns
+    -------
+    dict of (...,) arrays
+        n, mean, vol (ddof=1), min, q<..> per quantile, cvar<..> per alpha,
+        downside_dev, max_drawdown. All but n are NaN for variants without
+        observations.
+    """
+    R = np.asarray(R, dtype=float)
+    lead, T = R.shape[:-1], R.shape[-1]
+    X = R.reshape(int(np.prod(lead)), T)
+    V = X.shape[0]
+
+    valid = ~np.isnan(X)
+    n = valid.sum(axis=1)
+    has = n > 0
+    nf = np.where(has, n, 1).astype(float)
+
+    out: dict[str, np.ndarray] = {"n": n}
+    z = np.where(valid, X, 0.0)
+    mean = z.sum(axis=1) / nf
+    dev = np.where(valid, X - mean[:, None], 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out["mean"] = np.where(has, mean, np.nan)
+        out["vol"] = np.where(n > 1, np.sqrt((dev ** 2).sum(axis=1) / (n - 1)), np.nan)
+
+    # NaN -> +inf so missing values sort after every observation
+    S = np.where(valid, X, np.inf)
+    qs = np.asarray(quantiles, dtype=float)
+    pos = qs[None, :] * (n[:, None] - 1).clip(min=0)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.minimum(lo + 1, (n[:, None] - 1).clip(min=0))
+    ks = {a: np.maximum(np.ceil(a * n).astype(np.int64), 1) for a in alphas}
+
+    kth = np.unique(np.concatenate(
+        [lo.ravel(), hi.ravel(), [0]] + [np.minimum(k, T) - 1 for k in ks.values()]
+    )) if T else np.array([], dtype=np.int64)
+    if T == 0:
+        P = S
+    elif len(kth) <= _MAX_KTH:
+        P = np.partition(S, kth, axis=1)
+    else:
+        P = np.sort(S, axis=1)
+
+    out["min"] = np.where(has, P[:, 0], np.nan) if T else np.full(V, np.nan)
+    for j, q in enumerate(qs):
+        if T:
+            a = np.take_along_axis(P, lo[:, j:j + 1], axis=1)[:, 0]
+            b = np.take_along_axis(P, hi[:, j:j + 1], axis=1)[:, 0]
+            frac = pos[:, j] - lo[:, j]
+            with np.errstate(invalid="ignore"):
+                val = np.where(frac > 0, a + (b - a) * frac, a)
+        else:
+            val = np.full(V, np.nan)
+        out[_qname(q)] = np.where(has, val, np.nan)
+
+    idx = np.arange(T)[None, :]
+    for a, k in ks.items():
+        # after partitioning at k - 1, the first k entries are the k smallest
+        tail = np.where(idx < k[:, None], P, 0.0) if T else np.zeros((V, 0))
+        with np.errstate(invalid="ignore"):
+            out[_cvar_name(a)] = np.where(has, tail.sum(axis=1) / k, np.nan)
+
+    short = np.where(valid, np.minimum(X - mar, 0.0), 0.0)
+    out["downside_dev"] = np.where(has, np.sqrt((short ** 2).sum(axis=1) / nf), np.nan)
+    out["max_drawdown"] = np.where(has, _drawdown(X, compound), np.nan)
+
+    return {k: v.reshape(lead) for k, v in out.items()}
+
+
+def regime_tail_metrics(
+    R: np.ndarray,
+    regimes: Sequence,
+    *,
+    quantiles: Sequence[float] = QUANTILES,
+    alphas: Sequence[float] = ALPHAS,
+    mar: float = 0.0,
+    compound: bool = True,
+) -> tuple[dict[str, np.ndarray], list]:
+    """
+    tail_metrics conditional on a (T,) regime label per period.
+
+    Every regime's periods are kept (others set to NaN) and all regimes
+    are evaluated in one stacked tail_metrics call; conditional drawdowns
+    are those of holding the variant only in that regime. Periods with a
+    missing label are dropped.
+
+    Returns (metrics, labels) where each metric is (..., n_regimes).
+    """
+    R = np.asarray(R, dtype=float)
+    codes, labels = pd.factorize(pd.Series(regimes), sort=True)
+    if len(codes) != R.shape[-1]:
+        raise ValueError(f"regimes has {len(codes)} periods, R has {R.shape[-1]}")
+    G = len(labels)
+    masks = codes[None, :] == np.arange(G)[:, None]                  # (G, T)
+    stacked = np.where(masks.reshape((G,) + (1,) * (R.ndim - 1) + (-1,)), R[None], np.nan)
+    m = tail_metrics(stacked, quantiles=quantiles, alphas=alphas, mar=mar, compound=compound)
+    return {k: np.moveaxis(v, 0, -1) for k, v in m.items()}, list(labels)
+
+
+def metrics_frame(
+    metrics: dict[str, np.ndarray],
+    variants=None,
+    regimes: Optional[list] = None,
+) -> pd.DataFrame:
+    """
+    One row per variant (per (variant, regime) for regime_tail_metrics
+    output; leading dims flattened).
+    """
+    if regimes is None:
+        out = pd.DataFrame({k: np.ravel(v) for k, v in metrics.items()})
+        if variants is not None:
+            out.insert(0, "variant", list(variants))
+        return out
+    G = len(regimes)
+    out = pd.DataFrame({k: np.reshape(v, (-1, G)).ravel() for k, v in metrics.items()})
+    V = len(out) // G
+    out.insert(0, "regime", np.tile(regimes, V))
+    out.insert(0, "variant", np.repeat(list(variants) if variants is not None else np.arange(V), G))
+    return out
+
+
+# -----------------------------
+# Mergeable sketches
+# -----------------------------
+class QuantileSketch:
+    """
+    Mergeable quantile sketch for many variants (DDSketch-style log bins).
+
+    Values are bucketed on a log scale with relative accuracy rel_acc
+    (|x| in [min_value, max_value]; smaller |x| go to a zero bucket, larger
+    are clamped), separately for positive and negative values, as one
+    (variants x bins) count matrix. Counts, n, sum, sum of squares,
+    downside sum of squares and exact min / max are all additive, so
+    sketches built by different workers, time chunks or regions merge by
+    addition and answer quantile / CVaR queries without the raw series.
+    Order statistics are within rel_acc (relative) of the exact ones, or
+    within min_value absolute near zero.
+    """
+
+    def __init__(
+        self,
+        n_variants: int,
+        *,
+        rel_acc: float = 0.01,
+        min_value: float = 1e-4,
+        max_value: float = 10.0,
+        mar: float = 0.0,
+    ):
+        if not 0.0 < rel_acc < 1.0:
+            raise ValueError(f"rel_acc must be in (0, 1), got {rel_acc}")
+        self.rel_acc = rel_acc
+        self.min_value = min_value
+        self.max_value = max_value
+        self.mar = mar
+        self.gamma = (1.0 + rel_acc) / (1.0 - rel_acc)
+        self._lg = np.log(self.gamma)
+        self._k0 = int(np.ceil(np.log(min_value) / self._lg))
+        self.K = int(np.ceil(np.log(max_value) / self._lg)) - self._k0 + 1
+
+        V = int(n_variants)
+        self.counts = np.zeros((V, 2 * self.K + 1))
+        self.n = np.zeros(V)
+        self.s1 = np.zeros(V)
+        self.s2 = np.zeros(V)
+        self.down2 = np.zeros(V)
+        self.mn = np.full(V, np.inf)
+        self.mx = np.full(V, -np.inf)
+
+    @classmethod
+    def from_array(cls, R: np.ndarray, **kwargs) -> "QuantileSketch":
+        R = np.atleast_2d(np.asarray(R, dtype=float))
+        return cls(R.shape[0], **kwargs).update(R)
+
+    # bin layout: [negative, largest |x| first] [zero] [positive, ascending]
+    def _bins(self, x: np.ndarray) -> np.ndarray:
+        a = np.abs(x)
+        with np.errstate(divide="ignore"):
+            k = np.ceil(np.log(np.maximum(a, self.min_value)) / self._lg).astype(np.int64) - self._k0
+        k = np.clip(k, 0, self.K - 1)
+        b = np.where(x > 0, self.K + 1 + k, self.K - 1 - k)
+        return np.where(a < self.min_value, self.K, b)
+
+    def _values(self) -> np.ndarray:
+        # representative value of every bin (relative error <= rel_acc)
+        k = np.arange(self.K) + self._k0
+        v = 2.0 * self.gamma ** k / (self.gamma + 1.0)
+        return np.concatenate([-v[::-1], [0.0], v])
+
+    def update(self, R: np.ndarray) -> "QuantileSketch":
+        """
+        Add (variants x T) observations (NaN ignored).
+        """
+        R = np.atleast_2d(np.asarray(R, dtype=float))
+        V, nb = self.counts.shape
+        if R.shape[0] != V:
+            raise ValueError(f"expected {V} variants, got {R.shape[0]}")
+        valid = ~np.isnan(R)
+        rows = np.broadcast_to(np.arange(V)[:, None], R.shape)[valid]
+        x = R[valid]
+        self.counts += np.bincount(rows * nb + self._bins(x), minlength=V * nb).reshape(V, nb)
+
+        z = np.where(valid, R, 0.0)
+        self.n += valid.sum(axis=1)
+        self.s1 += z.sum(axis=1)
+        self.s2 += (z ** 2).sum(axis=1)
+        self.down2 += (np.where(valid, np.minimum(R - self.mar, 0.0), 0.0) ** 2).sum(axis=1)
+        self.mn = np.minimum(self.mn, np.where(valid, R, np.inf).min(axis=1, initial=np.inf))
+        self.mx = np.maximum(self.mx, np.where(valid, R, -np.inf).max(axis=1, initial=-np.inf))
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """
+        Add another sketch of the same variants (in place); order-free.
+        """
+        same = (self.rel_acc, self.min_value, self.max_value, self.mar, self.counts.shape) == (
+            other.rel_acc, other.min_value, other.max_value, other.mar, other.counts.shape,
+        )
+        if not same:
+            raise ValueError("cannot merge sketches with different parameters / variants")
+        self.counts += other.counts
+        self.n += other.n
+        self.s1 += other.s1
+        self.s2 += other.s2
+        self.down2 += other.down2
+        self.mn = np.minimum(self.mn, other.mn)
+        self.mx = np.maximum(self.mx, other.mx)
+        return self
+
+    def _order_stat(self, cum: np.ndarray, rank: np.ndarray) -> np.ndarray:
+        # value of the rank-th smallest observation: first bin whose
+        # cumulative count exceeds the rank
+        idx = (cum[:, None, :] <= rank[:, :, None]).sum(axis=2)
+        idx = np.minimum(idx, self.counts.shape[1] - 1)
+        return np.clip(self._values()[idx], self.mn[:, None], self.mx[:, None])
+
+    def quantile(self, qs: Sequence[float]) -> np.ndarray:
+        """
+        (variants, len(qs)) quantiles, interpolated between neighbouring
+        order statistics like np.quantile and clamped to the exact min / max.
+        """
+        qs = np.asarray(qs, dtype=float)
+        cum = np.cumsum(self.counts, axis=1)
+        last = np.maximum(self.n - 1, 0)[:, None]
+        pos = qs[None, :] * last
+        lo = np.floor(pos)
+        a = self._order_stat(cum, lo)
+        b = self._order_stat(cum, np.minimum(lo + 1, last))
+        # empty variants have a = b = +/-inf; their NaN is masked below
+        with np.errstate(invalid="ignore"):
+            out = a + (b - a) * (pos - lo)
+        return np.where(self.n[:, None] > 0, out, np.nan)
+
+    def cvar(self, alpha: float) -> np.ndarray:
+        """
+        Mean of the ceil(alpha * n) smallest values, from bin representatives.
+        """
+        k = np.maximum(np.ceil(alpha * self.n), 1.0)
+        cum = np.cumsum(self.counts, axis=1)
+        prev = cum - self.counts
+        take = np.clip(k[:, None] - prev, 0.0, self.counts)     # count used from each bin
+        vals = np.clip(self._values()[None, :], self.mn[:, None], self.mx[:, None])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.n > 0, (take * vals).sum(axis=1) / k, np.nan)
+
+    def metrics(
+        self,
+        *,
+        quantiles: Sequence[float] = QUANTILES,
+        alphas: Sequence[float] = ALPHAS,
+    ) -> dict[str, np.ndarray]:
+        """
+        tail_metrics keys except max_drawdown (which needs the time order;
+        see drawdown_state / chain_drawdown).
+        """
+        has = self.n > 0
+        nf = np.where(has, self.n, 1.0)
+        mean = self.s1 / nf
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = (self.s2 - self.n * mean ** 2) / (self.n - 1)
+            out = {
+                "n": self.n.astype(np.int64),
+                "mean": np.where(has, mean, np.nan),
+                "vol": np.where(self.n > 1, np.sqrt(np.maximum(var, 0.0)), np.nan),
+                "min": np.where(has, self.mn, np.nan),
+            }
+        Q = self.quantile(quantiles)
+        for j, q in enumerate(quantiles):
+            out[_qname(q)] = Q[:, j]
+        for a in alphas:
+            out[_cvar_name(a)] = self.cvar(a)
+        out["downside_dev"] = np.where(has, np.sqrt(self.down2 / nf), np.nan)
+        return out
+
+
+def drawdown_state(R: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Compounded-drawdown summary of a time chunk per variant: growth
+    (end equity), peak (max equity incl. the start, 1.0), trough (min
+    equity) and max_drawdown. Chunks combine with chain_drawdown.
+    """
+    r = np.where(np.isnan(R), 0.0, np.atleast_2d(np.asarray(R, dtype=float)))
+    equity = np.cumprod(1.0 + r, axis=-1)
+    T = r.shape[-1]
+    ones = np.ones(r.shape[:-1])
+    return {
+        "growth": equity[..., -1] if T else ones,
+        "peak": np.maximum(equity.max(axis=-1, initial=1.0), 1.0),
+        "trough": np.minimum(equity.min(axis=-1, initial=1.0), 1.0),
+        "max_drawdown": _drawdown(r, True),
+    }
+
+
+def chain_drawdown(first: dict, then: dict) -> dict[str, np.ndarray]:
+    """
+    drawdown_state of `first` followed in time by `then`. The cross term
+    (a peak in `first`, a trough in `then`) is growth_1 * trough_2 / peak_1;
+    troughs after a higher peak inside `then` are already in its own
+    max_drawdown.
+    """
+    g1 = first["growth"]
+    cross = g1 * then["trough"] / first["peak"] - 1.0
+    return {
+        "growth": g1 * then["growth"],
+        "peak": np.maximum(first["peak"], g1 * then["peak"]),
+        "trough": np.minimum(first["trough"], g1 * then["trough"]),
+        "max_drawdown": np.minimum(np.minimum(first["max_drawdown"], then["max_drawdown"]), np.minimum(cross, 0.0)),
+    }
@@ -0,0 +1,243 @@
+# src/evaluation/walk_forward.py
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# -----------------------------
+# Model registry: name -> (fit(X, y, **params) -> model, predict(model, X))
+# X never includes the constant; models add their own intercept.
+# -----------------------------
+def _fit_ols(X: np.ndarray, y: np.ndarray) -> dict:
+    Xc = np.column_stack([np.ones(len(X)), X])
+    coef, *_ = np.linalg.lstsq(Xc, y, rcond=None)
+    return {"coef": coef}
+
+
+def _predict_linear(model: dict, X: np.ndarray) -> np.ndarray:
+    coef = model["coef"]
+    return coef[0] + X @ coef[1:]
+
+
+def _fit_logit(X: np.ndarray, y: np.ndarray) -> dict:
+    from src.research.path_a.fit_logit import fit_logit_batched
+
+    params, converged = fit_logit_batched(np.column_stack([np.ones(len(X)), X]), y)
+    return {"coef": params[0], "converged": bool(converged[0])}
+
+
+def _predict_logit(model: dict, X: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-_predict_linear(model, X)))
+
+
+def _fit_ridge(X: np.ndarray, y: np.ndarray, **params) -> dict:
+    from src.models.ridge import ridge_path
+
+    return ridge_path(X, y, **params)
+
+
+def _fit_lasso(X: np.ndarray, y: np.ndarray, **params) -> dict:
+    from src.models.lasso import lasso_path
+
+    return lasso_path(X, y, **params)
+
+
+def _predict_path(model: dict, X: np.ndarray) -> np.ndarray:
+    from src.models.ridge import predict_path
+
+    return predict_path(model, X)
+
+
+# path models predict (n, n_alphas); run_walk_forward gives every fold the
+# same alpha grid so folds can be compared / averaged by path position
+MODELS = {
+    "ols": (_fit_ols, _predict_linear),
+    "logit": (_fit_logit, _predict_logit),
+    "ridge": (_fit_ridge, _predict_path),
+    "lasso": (_fit_lasso, _predict_path),
+}
+
+
+# -----------------------------
+# Fold design cache
+# -----------------------------
+def _digest(*arrays: np.ndarray, extra: str = "") -> str:
+    h = hashlib.sha256(extra.encode())
+    for a in arrays:
+        h.update(np.ascontiguousarray(a).tobytes())
+    return h.hexdigest()[:20]
+
+
+def materialize_folds(
+    X: np.ndarray,
+    y: np.ndarray,
+    folds: Iterable[dict],
+    cache_dir: Path,
+) -> list[dict]:
+    """
+    Write each fold's train/test design as .npy files (once per content
+    key) and return per-fold path records. Files are reopened with
+    mmap_mode="r", so parallel workers share pages instead of receiving
+    pickled copies, and re-running with other models reuses them.
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    data_key = _digest(X, y)
+
+    out = []
+    for f in folds:
+        ok_tr = f["train"][~np.isnan(y[f["train"]]) & ~np.isnan(X[f["train"]]).any(axis=1)]
+        ok_te = f["test"][~np.isnan(X[f["test"]]).any(axis=1)]
+        key = _digest(ok_tr, ok_te, extra=data_key)
+        paths = {k: cache_dir / f"fold_{key}_{k}.npy" for k in ("X_train", "y_train", "X_test", "test_rows")}
+        if not all(p.exists() for p in paths.values()):
+            np.save(paths["X_train"], X[ok_tr])
+            np.save(paths["y_train"], y[ok_tr])
+            np.save(paths["X_test"], X[ok_te])
+            np.save(paths["test_rows"], ok_te)
+        out.append({
+            **{k: v for k, v in f.items() if k not in ("train", "test")},
+            "n_train": len(ok_tr),
+            "n_test": len(ok_te),
+            "paths": {k: str(p) for k, p in paths.items()},
+        })
+    return out
+
+
+def _shared_lasso_alphas(recs: list[dict], params: dict) -> np.ndarray:
+    # lasso's default grid starts at the data-dependent alpha_max; use the
+    # largest over folds so every fold's path starts from all-zero
+    from src.models.lasso import lasso_alpha_max, lasso_alphas
+
+    a_max = max(
+        (
+            lasso_alpha_max(
+                np.load(r["paths"]["X_train"], mmap_mode="r"),
+                np.load(r["paths"]["y_train"], mmap_mode="r"),
+                standardize=params.get("standardize", True),
+            )
+            for r in recs if r["n_train"]
+        ),
+        default=1.0,
+    )
+    return lasso_alphas(a_max, n_alphas=params.get("n_alphas", 50), eps=params.get("eps", 1e-3))
+
+
+def _run_fold(rec: dict, model: str, model_params: dict) -> tuple[dict, np.ndarray, np.ndarray]:
+    fit, predict = MODELS[model]
+    ld = {k: np.load(p, mmap_mode="r") for k, p in rec["paths"].items()}
+    m = fit(np.asarray(ld["X_train"]), np.asarray(ld["y_train"]), **model_params)
+    pred = predict(m, np.asarray(ld["X_test"])) if len(ld["X_test"]) else np.array([])
+    return m, np.asarray(ld["test_rows"]), pred
+
+
+def run_walk_forward(
+    df: pd.DataFrame,
+    folds: Iterable[dict],
+    *,
+    y_col: str,
+    x_cols: list[str],
+    model: str = "ols",
+    model_params: Optional[dict] = None,
+    workers: Optional[int] = None,
+    cache_dir: Optional[Path] = None,
+    return_models: bool = False,
+):
+    """
+    Fit `model` on every fold's train rows and predict its test rows.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Panel the folds index into (positions, see walk_forward_splits).
+    folds : iterable of dict
+        Output of walk_forward_splits.
+    model : str
+        Key of MODELS.
+    model_params : dict, optional
+        Passed to the model's fit. For lasso without `alphas`, one grid
+        (from the largest fold alpha_max) is computed up front and shared
+        by every fold.
+    workers : int, optional
+        Process-pool size for fold-parallel fitting (1 = in-process).
+    cache_dir : Path, optional
+        Where fold design matrices are cached. Defaults to a temporary
+        directory for the duration of the call.
+
+    return_models : bool
+        Also return the fitted model of every fold.
+
+    Returns
+    -------
+    (pred, summary[, models])
+        pred    : out-of-sample predictions on df.index (NaN outside tests);
+                  a DataFrame with one column per alpha for path models
+        summary : one row per fold (per fold and path position for path
+                  models) with periods, sizes, mse, ic and coef_*
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unknown model: {model}")
+    model_params = model_params or {}
+
+    X = df[x_cols].to_numpy(dtype=float)
+    y = df[y_col].to_numpy(dtype=float)
+
+    with tempfile.TemporaryDirectory(prefix="leviathan_folds_") as tmp:
+        recs = materialize_folds(X, y, folds, Path(cache_dir) if cache_dir else Path(tmp))
+        if model == "lasso" and model_params.get("alphas") is None:
+            model_params = {**model_params, "alphas": _shared_lasso_alphas(recs, model_params)}
+
+        workers = workers or min(len(recs), os.cpu_count() or 1)
+        if workers <= 1 or len(recs) <= 1:
+            results = [_run_fold(r, model, model_params) for r in recs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                results = list(ex.map(_run_fold, recs, [model] * len(recs), [model_params] * len(recs)))
+
+    n_paths = max((p.shape[1] for _, _, p in results if p.ndim == 2), default=0)
+    pred = np.full((len(df), n_paths) if n_paths else len(df), np.nan)
+    rows = []
+    names = ["const"] + list(x_cols)
+    for rec, (m, test_rows, p) in zip(recs, results):
+        if len(p):
+            pred[test_rows] = p
+        yt = y[test_rows]
+        ok = ~np.isnan(yt)
+        base = {k: v for k, v in rec.items() if k != "paths"}
+
+        P = p.reshape(len(test_rows), -1) if len(test_rows) else np.empty((0, max(n_paths, 1)))
+        for j in range(P.shape[1]):
+            row = dict(base)
+            if n_paths:
+                row["path"] = j
+                row["alpha"] = float(m["alphas"][j])
+            pj = P[:, j]
+            row["mse"] = float(np.mean((yt[ok] - pj[ok]) ** 2)) if ok.any() else np.nan
+            # constant predictions (e.g. an all-zero path point) have no ic
+            has_ic = ok.sum() > 2 and np.ptp(pj[ok]) > 0
+            row["ic"] = float(np.corrcoef(pj[ok], yt[ok])[0, 1]) if has_ic else np.nan
+            coef = np.asarray(m.get("coef", [])) if isinstance(m, dict) else np.array([])
+            if n_paths:
+                coef = np.r_[m["intercept"][j], m["coef"][j]]
+            if coef.ndim == 1 and len(coef) == len(names):
+                row.update({f"coef_{n}": c for n, c in zip(names, coef)})
+            rows.append(row)
+
+    if n_paths:
+        pred = pd.DataFrame(pred, index=df.index, columns=[f"pred_{model}_{j}" for j in range(n_paths)])
+    else:
+        pred = pd.Series(pred, index=df.index, name=f"pred_{model}")
+
+    out = (pred, pd.DataFrame(rows))
+    if return_models:
+        out += ([m for m, _, _ in results],)
+    return out
@@ -0,0 +1,267 @@
+# src/loaders/housing_loader.py
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Optional
+
+import pandas as pd
+
+from src.utils.project_root import get_project_root
+
+
+DEFAULT_SOURCE = Path("example/example_data.csv")
+CACHE_DIR = Path("data/cache/panels")
+
+DATE_COL = "date"
+REGION_COL = "region"
+
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _file_sha256(path: Path, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _tmp_path(path: Path) -> Path:
+    # per-process temp name next to the target, so concurrent writers
+    # never share one; it doesn't match the *.parquet / *.meta.json globs
+    return path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+
+def _cache_stem(src: Path) -> str:
+    # same-named files in different directories must not share cache entries
+    return f"{src.stem}-{hashlib.sha1(str(src).encode()).hexdigest()[:8]}"
+
+
+def _resolve(path: Path | str, root: Optional[Path]) -> Path:
+    p = Path(path)
+    if p.is_absolute():
+        return p
+    return (root or get_project_root()) / p
+
+
+def _parse_csv(src: Path) -> pd.DataFrame:
+    df = pd.read_csv(src)
+    if DATE_COL in df.columns:
+        df[DATE_COL] = pd.to_datetime(df[DATE_COL])
+    if REGION_COL in df.columns:
+        df[REGION_COL] = df[REGION_COL].astype("category")
+    sort_cols = [c for c in (REGION_COL, DATE_COL) if c in df.columns]
+    if sort_cols:
+        df = df.sort_values(sort_cols, kind="stable").reset_index(drop=True)
+    return df
+
+
+def source_digest(
+    src: Path | str,
+    *,
+    root: Optional[Path] = None,
+    cache_dir: Optional[Path] = None,
+) -> str:
+    """
+    sha256 of a source file, memoized in a sidecar JSON keyed on
+    (mtime, size) so repeated calls only stat the file.
+    """
+    src = _resolve(src, root)
+    if not src.exists():
+        raise FileNotFoundError(src)
+
+    cache_dir = _resolve(cache_dir or CACHE_DIR, root)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    meta_path = cache_dir / f"{_cache_stem(src)}.meta.json"
+
+    st = src.stat()
+    meta = {}
+    if meta_path.exists():
+        meta = json.loads(meta_path.read_text())
+
+    if meta.get("mtime_ns") == st.st_mtime_ns and meta.get("size") == st.st_size:
+        return meta["sha256"]
+
+    digest = _file_sha256(src)
+    # write-then-rename: parallel readers see the old meta or the new one
+    tmp = _tmp_path(meta_path)
+    tmp.write_text(json.dumps({
+        "source": str(src),
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha256": digest,
+    }))
+    os.replace(tmp, meta_path)
+    return digest
+
+
+def ensure_cached(
+    src: Path | str,
+    *,
+    root: Optional[Path] = None,
+    cache_dir: Optional[Path] = None,
+) -> Optional[Path]:
+    """
+    Convert a source CSV to a Parquet cache file once and return its path.
+
+    The cache is keyed on the file's content hash (see source_digest), so
+    warm runs only stat the source; the file is re-hashed only when its
+    mtime/size change, and re-converted only when the hash changes.
+
+    Returns None when pyarrow is not installed (callers fall back to CSV).
+    """
+    if not _has_pyarrow():
+        return None
+
+    src = _resolve(src, root)
+    cache_dir = _resolve(cache_dir or CACHE_DIR, root)
+    digest = source_digest(src, root=root, cache_dir=cache_dir)
+
+    pq_path = cache_dir / f"{_cache_stem(src)}.{digest[:16]}.parquet"
+    if not pq_path.exists():
+        df = _parse_csv(src)
+        # small row groups sorted by (region, date) keep filter pushdown
+        # useful; written aside and renamed so no reader sees half a file
+        tmp = _tmp_path(pq_path)
+        df.to_parquet(tmp, index=False, row_group_size=50_000)
+        os.replace(tmp, pq_path)
+        for stale in cache_dir.glob(f"{_cache_stem(src)}.*.parquet"):
+            if stale != pq_path:
+                stale.unlink(missing_ok=True)
+
+    return pq_path
+
+
+def _as_list(x: str | Iterable[str] | None) -> Optional[list[str]]:
+    if x is None:
+        return None
+    if isinstance(x, str):
+        return [x]
+    return list(x)
+
+
+def _apply_dtypes(df: pd.DataFrame, float_dtype: str) -> pd.DataFrame:
+    if REGION_COL in df.columns and not isinstance(df[REGION_COL].dtype, pd.CategoricalDtype):
+        df[REGION_COL] = df[REGION_COL].astype("category")
+    if float_dtype != "float64":
+        floats = df.select_dtypes(include="float64").columns
+        if len(floats):
+            df[floats] = df[floats].astype(float_dtype)
+    return df
+
+
+def read_panel(
+    src: Path | str,
+    *,
+    columns: Optional[list[str]] = None,
+    regions: str | Iterable[str] | None = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    float_dtype: str = "float32",
+    root: Optional[Path] = None,
+    cache_dir: Optional[Path] = None,
+    use_cache: bool = True,
+) -> pd.DataFrame:
+    """
+    Read a (date, region, ...) panel from a CSV through the columnar cache.
+
+    Parameters
+    ----------
+    src : Path | str
+        Source CSV, relative to the project root unless absolute.
+    columns : list[str], optional
+        Columns to load. date/region are always kept when present.
+    regions : str | list[str], optional
+        Only rows for these regions (pushed down into the Parquet scan).
+    start, end : str, optional
+        Inclusive date bounds (pushed down into the Parquet scan).
+    float_dtype : str
+        dtype for float columns ("float32" by default).
+    use_cache : bool
+        Set False to parse the CSV directly.
+
+    Returns
+    -------
+    pd.DataFrame
+        Sorted by (region, date), categorical region, downcast floats.
+    """
+    regions = _as_list(regions)
+    pq_path = ensure_cached(src, root=root, cache_dir=cache_dir) if use_cache else None
+
+    if pq_path is None:
+        df = _parse_csv(_resolve(src, root))
+        available = list(df.columns)
+    else:
+        import pyarrow.parquet as pq
+
+        available = pq.read_schema(pq_path).names
+
+    cols = None
+    if columns is not None:
+        missing = set(columns) - set(available)
+        if missing:
+            raise KeyError(f"Missing required columns: {missing}")
+        keys = [c for c in (DATE_COL, REGION_COL) if c in available]
+        cols = keys + [c for c in columns if c not in keys]
+
+    filters = []
+    if regions is not None and REGION_COL in available:
+        filters.append((REGION_COL, "in", regions))
+    if start is not None and DATE_COL in available:
+        filters.append((DATE_COL, ">=", pd.Timestamp(start)))
+    if end is not None and DATE_COL in available:
+        filters.append((DATE_COL, "<=", pd.Timestamp(end)))
+
+    if pq_path is not None:
+        df = pd.read_parquet(pq_path, columns=cols, filters=filters or None)
+    else:
+        if cols is not None:
+            df = df[cols]
+        mask = pd.Series(True, index=df.index)
+        for col, op, val in filters:
+            if op == "in":
+                mask &= df[col].isin(val)
+            elif op == ">=":
+                mask &= df[col] >= val
+            else:
+                mask &= df[col] <= val
+        df = df[mask].reset_index(drop=True)
+
+    if REGION_COL in df.columns and regions is not None:
+        df[REGION_COL] = df[REGION_COL].cat.remove_unused_categories()
+
+    return _apply_dtypes(df, float_dtype)
+
+
+def load_housing_data(
+    region: str | Iterable[str] | None = None,
+    *,
+    columns: Optional[list[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    src: Path | str = DEFAULT_SOURCE,
+    float_dtype: str = "float32",
+) -> pd.DataFrame:
+    """
+    Load the housing panel for one region, several regions, or all (None).
+
+    Thin wrapper over read_panel with the project's default source file.
+    """
+    return read_panel(
+        src,
+        columns=columns,
+        regions=region,
+        start=start,
+        end=end,
+        float_dtype=float_dtype,
+    )
@@ -0,0 +1,61 @@
+# src/models/ensemble.py
+
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def average_path_models(
+    models: Sequence[dict],
+    weights: Optional[Sequence[float]] = None,
+) -> dict:
+    """
+    Average fitted path models (e.g. one ridge/lasso path per walk-forward
+    fold) into a single path model, without refitting.
+
+    All models must share the same alpha grid (run_walk_forward gives its
+    folds one grid; when fitting paths yourself, pass the same `alphas` to
+    each). Because every member is linear, averaging coefficients equals
+    averaging predictions.
+    """
+    if not models:
+        raise ValueError("no models to average")
+    alphas = models[0]["alphas"]
+    for m in models[1:]:
+        if not np.allclose(m["alphas"], alphas):
+            raise ValueError("path models use different alpha grids; fit them with one shared `alphas`")
+
+    w = np.ones(len(models)) if weights is None else np.asarray(weights, dtype=float)
+    w = w / w.sum()
+
+    return {
+        "kind": "ensemble",
+        "alphas": alphas,
+        "coef": np.tensordot(w, np.stack([m["coef"] for m in models]), axes=1),
+        "intercept": w @ np.stack([m["intercept"] for m in models]),
+        "n_models": len(models),
+    }
+
+
+def select_path_index(summary: pd.DataFrame, metric: str = "mse") -> int:
+    """
+    Path position with the best mean fold score in a path walk-forward
+    summary (lowest mse, or highest ic).
+    """
+    score = summary.groupby("path")[metric].mean()
+    return int(score.idxmin() if metric == "mse" else score.idxmax())
+
+
+def at_path_index(model: dict, i: int) -> dict:
+    """
+    Single-alpha slice of a path model (still a valid path model).
+    """
+    return {
+        **model,
+        "alphas": model["alphas"][i:i + 1],
+        "coef": model["coef"][i:i + 1],
+        "intercept": model["intercept"][i:i + 1],
+    }
@@ -2,13 +2,17 @@
 
 import pandas as pd
 import numpy as np
-import statsmodels.api as sm
+
+# statsmodels is imported inside the two functions that still use it, so
+# importing this module (e.g. for the batched path) stays cheap.
 
 
 def run_cross_sectional_ols(
     df: pd.DataFrame,
     y_col: str,
     x_cols: list[str],
+    *,
+    engine: str = "batched",
 ):
     """
     For each date, run a cross-sectional regression:
@@ -24,8 +28,18 @@ def run_cross_sectional_ols(
     Notes:
         - Rows with NaNs in y or X are dropped per date.
         - If a date has too few observations, that date is skipped.
+        - engine="batched" solves all dates at once in NumPy
+          (see run_cross_sectional_ols_batched); engine="statsmodels"
+          runs the original per-date sm.OLS loop.
     """
 
+    if engine == "batched":
+        return run_cross_sectional_ols_batched(df, y_col, x_cols)
+    if engine != "statsmodels":
+        raise ValueError(f"Unknown engine: {engine}")
+
+    import statsmodels.api as sm
+
     results = []
 
     for dt, tmp in df.groupby("date"):
@@ -56,6 +70,207 @@ def run_cross_sectional_ols(
     return out
 
 
+def _stack_by_date(
+    df: pd.DataFrame,
+    cols: list[str],
+    time_col: str = "date",
+):
+    """
+    Stack a long panel into a dense (T, N, C) float64 block.
+
+    Rows are laid out by their position within each date, so no entity
+    column is needed. Missing slots are NaN. Rows with a missing date are
+    dropped (as groupby does in the statsmodels loop).
+
+    Returns (dates, block).
+    """
+    codes, dates = pd.factorize(df[time_col], sort=True)
+    # factorize codes NaT as -1, which would index the last date's slots
+    keep = codes >= 0
+    codes = codes[keep]
+    slot = pd.Series(codes).groupby(codes).cumcount().to_numpy()
+
+    T = len(dates)
+    N = int(slot.max()) + 1 if len(slot) else 0
+
+    block = np.full((T, N, len(cols)), np.nan)
+    block[codes, slot, :] = df[cols].to_numpy(dtype=float)[keep]
+    return dates, block
+
+
+def _batched_ols(Y: np.ndarray, X: np.ndarray, min_obs: int):
+    """
+    Solve T independent OLS problems with a shared NaN mask convention.
+
+    Y : (T, N)      dependent variable, NaN = missing
+    X : (T, N, K)   regressors *without* the constant, NaN = missing
+
+    Returns (ok, r2, params, tvalues) with params/tvalues of shape
+    (T, K + 1), constant first. Dates with fewer than min_obs valid rows
+    are flagged ok=False.
+    """
+    valid = ~np.isnan(Y) & ~np.isnan(X).any(axis=2)
+    w = valid.astype(float)
+    n = w.sum(axis=1)
+
+    T, N, K = X.shape
+    Xc = np.empty((T, N, K + 1))
+    Xc[..., 0] = 1.0
+    Xc[..., 1:] = np.where(valid[..., None], X, 0.0)
+    Xc *= w[..., None]
+    y = np.where(valid, Y, 0.0)
+
+    XtX = np.einsum("tnk,tnj->tkj", Xc, Xc)
+    Xty = np.einsum("tnk,tn->tk", Xc, y)
+
+    # pinv matches statsmodels' default solver for rank-deficient dates
+    XtX_inv = np.linalg.pinv(XtX, hermitian=True)
+    params = np.einsum("tkj,tj->tk", XtX_inv, Xty)
+
+    resid = (y - np.einsum("tnk,tk->tn", Xc, params)) * w
+    ssr = (resid ** 2).sum(axis=1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        y_mean = y.sum(axis=1) / n
+        tss = (((y - y_mean[:, None]) * w) ** 2).sum(axis=1)
+        r2 = 1.0 - ssr / tss
+
+        dof = n - (K + 1)
+        sigma2 = ssr / dof
+        bse = np.sqrt(np.diagonal(XtX_inv, axis1=1, axis2=2) * sigma2[:, None])
+        tvalues = params / bse
+
+    ok = n >= min_obs
+    return ok, r2, params, tvalues
+
+
+def run_cross_sectional_ols_batched(
+    df: pd.DataFrame,
+    y_col: str,
+    x_cols: list[str],
+    *,
+    time_col: str = "date",
+) -> pd.DataFrame:
+    """
+    Batched (Fama-MacBeth first pass) version of run_cross_sectional_ols.
+
+    All per-date normal equations are solved at once on a stacked
+    (date x row x regressor) array with a per-date NaN mask. Output has
+    the same layout as the statsmodels loop: date, r2, coef_*, tstat_*.
+    """
+    return fit_factor_sets(df, y_col, [x_cols], time_col=time_col)[0]
+
+
+def fit_factor_sets(
+    df: pd.DataFrame,
+    y_col: str,
+    x_col_sets: list[list[str]],
+    *,
+    time_col: str = "date",
+) -> list[pd.DataFrame]:
+    """
+    Fit many candidate x_cols combinations against the same y in one pass.
+
+    The panel is stacked once for the union of all regressors; each set is
+    then solved on a column slice of that block with its own NaN mask, so
+    per-set results equal separate run_cross_sectional_ols calls.
+
+    Returns one result frame per entry of x_col_sets (empty frame when no
+    date has enough observations).
+    """
+    union = list(dict.fromkeys(c for xs in x_col_sets for c in xs))
+    dates, block = _stack_by_date(df, [y_col] + union, time_col=time_col)
+    pos = {c: i + 1 for i, c in enumerate(union)}
+
+    Y = block[..., 0]
+    outs = []
+    for xs in x_col_sets:
+        X = block[..., [pos[c] for c in xs]]
+        ok, r2, params, tvalues = _batched_ols(Y, X, min_obs=len(xs) + 2)
+
+        if not ok.any():
+            outs.append(pd.DataFrame())
+            continue
+
+        names = ["const"] + list(xs)
+        out = pd.DataFrame({time_col: dates[ok], "r2": r2[ok]})
+        for j, name in enumerate(names):
+            out[f"coef_{name}"] = params[ok, j]
+        for j, name in enumerate(names):
+            out[f"tstat_{name}"] = tvalues[ok, j]
+        outs.append(out.reset_index(drop=True))
+
+    return outs
+
+
+def newey_west_se(x: np.ndarray, lags: int | None = None) -> float:
+    """
+    Newey-West (Bartlett kernel) standard error of the mean of x.
+
+    lags defaults to floor(4 * (T / 100) ** (2 / 9)).
+    """
+    x = np.asarray(x, dtype=float)
+    x = x[~np.isnan(x)]
+    T = len(x)
+    if T < 2:
+        return np.nan
+    if lags is None:
+        lags = int(np.floor(4 * (T / 100) ** (2 / 9)))
+    lags = min(lags, T - 1)
+
+    e = x - x.mean()
+    s = e @ e / T
+    for lag in range(1, lags + 1):
+        gamma = e[lag:] @ e[:-lag] / T
+        s += 2.0 * (1.0 - lag / (lags + 1)) * gamma
+    return float(np.sqrt(s / T))
+
+
+def fama_macbeth_summary(
+    res: pd.DataFrame,
+    *,
+    lags: int | None = None,
+) -> pd.DataFrame:
+    """
+    Time-series averages of the per-date coefficients with Newey-West
+    adjusted standard errors.
+
+    Parameters
+    ----------
+    res : pd.DataFrame
+        Output of run_cross_sectional_ols / fit_factor_sets.
+    lags : int, optional
+        Newey-West lag length; see newey_west_se.
+
+    Returns
+    -------
+    pd.DataFrame
+        Index: term
+        Columns:
+            - mean
+            - se_nw
+            - tstat_nw
+            - n_periods
+    """
+    if res.empty:
+        return pd.DataFrame()
+
+    rows = []
+    for col in [c for c in res.columns if c.startswith("coef_")]:
+        x = res[col].to_numpy(dtype=float)
+        mean = float(np.nanmean(x))
+        se = newey_west_se(x, lags=lags)
+        rows.append({
+            "term": col[len("coef_"):],
+            "mean": mean,
+            "se_nw": se,
+            "tstat_nw": mean / se if se > 0 else np.nan,
+            "n_periods": int((~np.isnan(x)).sum()),
+        })
+
+    return pd.DataFrame(rows).set_index("term")
+
+
 def run_panel_ols(
     df: pd.DataFrame,
     y_col: str,
@@ -71,6 +286,7 @@ def run_panel_ols(
     You can later replace this with a proper FE / RE model using
     linearmodels or a dedicated panel library.
     """
+    import statsmodels.api as sm
 
     tmp = df.dropna(subset=[y_col] + x_cols).copy()
 
@@ -0,0 +1,67 @@
+# src/models/ridge.py
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+
+
+def _standardize(X: np.ndarray, y: np.ndarray, standardize: bool):
+    x_mean = X.mean(axis=0)
+    x_scale = X.std(axis=0) if standardize else np.ones(X.shape[1])
+    x_scale = np.where(x_scale > 0, x_scale, 1.0)
+    y_mean = y.mean()
+    return (X - x_mean) / x_scale, y - y_mean, x_mean, x_scale, y_mean
+
+
+def default_alphas(n_alphas: int = 50, lo: float = 1e-4, hi: float = 1e4) -> np.ndarray:
+    return np.logspace(np.log10(hi), np.log10(lo), n_alphas)
+
+
+def ridge_path(
+    X: np.ndarray,
+    y: np.ndarray,
+    alphas: Optional[np.ndarray] = None,
+    *,
+    standardize: bool = True,
+) -> dict:
+    """
+    Ridge coefficients for every alpha from a single SVD.
+
+    Minimizes ||y - b0 - X b||^2 + alpha * n * ||b||^2 on standardized X
+    (alpha is per-observation, so paths are comparable across fold sizes).
+    With Xs = U S V^T, b(alpha) = V diag(s / (s^2 + n * alpha)) U^T y for all
+    alphas at once.
+
+    Returns a path model:
+        alphas    : (A,)
+        coef      : (A, p) on the original X scale
+        intercept : (A,)
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    alphas = default_alphas() if alphas is None else np.asarray(alphas, dtype=float)
+
+    Xs, yc, x_mean, x_scale, y_mean = _standardize(X, y, standardize)
+    U, s, Vt = np.linalg.svd(Xs, full_matrices=False)
+    Uty = U.T @ yc
+
+    d = s[None, :] / (s[None, :] ** 2 + len(y) * alphas[:, None])  # (A, k)
+    coef_s = (d * Uty[None, :]) @ Vt                                  # (A, p)
+
+    coef = coef_s / x_scale
+    return {
+        "kind": "ridge",
+        "alphas": alphas,
+        "coef": coef,
+        "intercept": y_mean - coef @ x_mean,
+    }
+
+
+def predict_path(model: dict, X: np.ndarray) -> np.ndarray:
+    """
+    (n, A) predictions of a path model (ridge, lasso or an ensemble of them).
+    """
+    X = np.asarray(X, dtype=float)
+    return model["intercept"][None, :] + X @ model["coef"].T
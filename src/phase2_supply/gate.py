@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import bisect
+from collections import deque
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _interp_sorted(srt: np.ndarray, cnt: np.ndarray, qs: np.ndarray) -> np.ndarray:
+    """
+    Linear-interpolated quantiles from windows sorted along the last axis
+    (NaNs last), same rule as pandas rolling().quantile().
+
+    srt : (..., w), cnt : (...,) non-NaN count, qs : (Q,)
+    Returns (..., Q).
+    """
+    c = np.maximum(cnt - 1, 0)[..., None]
+    pos = c * qs
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.minimum(lo + 1, c)
+    a = np.take_along_axis(srt, lo, axis=-1)
+    b = np.take_along_axis(srt, hi, axis=-1)
+    return a + (b - a) * (pos - lo)
+
+
+def rolling_quantiles(
+    df: pd.DataFrame,
+    metrics: Sequence[str],
+    thresholds: Sequence[float],
+    *,
+    group_cols: Sequence[str] = ("regime",),
+    time_col: str = "date",
+    window: int = 40,
+    lag: int = 1,
+    min_periods: Optional[int] = None,
+    dtype=np.float32,
+    chunk_rows: int = 50_000,
+) -> np.ndarray:
+    """
+    Lagged rolling quantiles of several metrics at several thresholds,
+    within every group_cols cell, in one pass.
+
+    For each cell the rows are taken in time order and, per metric,
+    q[t] = quantile(x[t-lag-window+1 .. t-lag], thr) over the cell's own
+    subsequence — the same as
+        s[mask].rolling(window, min_periods).quantile(thr).shift(lag)
+    in the original per-regime loop. Each window is sorted once and every
+    threshold is read off the same sorted block. Windows are read through
+    a strided sliding view of the time-ordered values (no index gather),
+    and only the rows near a cell's start are masked.
+
+    Parameters
+    ----------
+    min_periods : int, optional
+        Minimum non-NaN observations per window
+        (default max(8, window // 4), as in phase 2).
+    dtype :
+        Output dtype (float32 by default to keep the block compact).
+    chunk_rows : int
+        Rows per vectorized chunk; bounds memory at
+        chunk_rows * window * len(metrics) floats.
+
+    Returns
+    -------
+    np.ndarray
+        (n_rows, len(metrics), len(thresholds)) in the original row order;
+        NaN where the window is too short or the group key is missing.
+    """
+    if min_periods is None:
+        min_periods = max(8, window // 4)
+    group_cols = list(group_cols)
+    qs = np.asarray(thresholds, dtype=float)
+
+    n = len(df)
+    if group_cols:
+        codes = df.groupby(group_cols, sort=False, observed=True, dropna=True).ngroup()
+        codes = codes.fillna(-1).to_numpy(dtype=np.int64)
+    else:
+        codes = np.zeros(n, dtype=np.int64)
+
+    order = np.lexsort((df[time_col].to_numpy(), codes))
+    sc = codes[order]
+    starts = np.r_[0, np.flatnonzero(np.diff(sc)) + 1] if n else np.array([], dtype=np.int64)
+    seg_start = np.repeat(starts, np.diff(np.r_[starts, n]))
+
+    V = df[list(metrics)].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)[order]
+
+    # window ending at row i (before the lag is applied): row i of the
+    # view is V[i - window + 1 .. i], NaN-padded before the first row
+    res = np.full((n, len(metrics), len(qs)), np.nan)
+    pad = np.vstack([np.full((window, V.shape[1]), np.nan), V])
+    view = sliding_window_view(pad, window, axis=0)[1:]                    # (n, M, w)
+    offs = np.arange(-window + 1, 1)
+    for a in range(0, n, chunk_rows):
+        rows = np.arange(a, min(a + chunk_rows, n))
+        win = view[rows[0]:rows[-1] + 1].copy()                            # (r, M, w)
+        # only windows reaching back past their cell's first row need masking
+        short = np.flatnonzero(rows - seg_start[rows] < window - 1)
+        if len(short):
+            outside = rows[short, None] + offs[None, :] < seg_start[rows[short], None]
+            win[short] = np.where(outside[:, None, :], np.nan, win[short])
+        win.sort(axis=-1)
+        cnt = np.sum(~np.isnan(win), axis=-1)
+        q = _interp_sorted(win, cnt, qs)
+        q[cnt < min_periods] = np.nan
+        res[rows] = q
+
+    # shift by `lag` rows within each cell
+    out = np.full_like(res, np.nan)
+    src = np.arange(n) - lag
+    ok = src >= seg_start
+    out[ok] = res[src[ok]]
+    out[sc < 0] = np.nan
+
+    final = np.empty((n, len(metrics), len(qs)), dtype=dtype)
+    final[order] = out
+    return final
+
+
+class SortedWindow:
+    """
+    Order-statistic window for incremental (one row at a time) gating.
+
+    Keeps the last `window` values in arrival order and in sorted order
+    (NaNs are held for arrival order but not in the sorted list), so
+    append() is O(log w) search plus O(w) memmove and quantile() is O(1).
+    Appending one new quarter therefore reproduces rolling_quantiles for
+    that row without re-scanning history.
+    """
+
+    def __init__(self, window: int, min_periods: Optional[int] = None):
+        self.window = window
+        self.min_periods = min_periods if min_periods is not None else max(8, window // 4)
+        self.values: deque = deque()
+        self.sorted: list[float] = []
+
+    def append(self, x: float) -> None:
+        if len(self.values) == self.window:
+            old = self.values.popleft()
+            if not np.isnan(old):
+                del self.sorted[bisect.bisect_left(self.sorted, old)]
+        self.values.append(x)
+        if not np.isnan(x):
+            bisect.insort(self.sorted, x)
+
+    def quantile(self, thresholds: Sequence[float]) -> np.ndarray:
+        cnt = len(self.sorted)
+        if cnt < self.min_periods or cnt == 0:
+            return np.full(len(thresholds), np.nan)
+        srt = np.asarray(self.sorted)
+        return _interp_sorted(srt[None, :], np.array([cnt]), np.asarray(thresholds, dtype=float))[0]
+
+    def to_dict(self) -> dict:
+        return {
+            "window": self.window,
+            "min_periods": self.min_periods,
+            "values": [None if np.isnan(v) else float(v) for v in self.values],
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "SortedWindow":
+        w = cls(d["window"], d["min_periods"])
+        for v in d["values"]:
+            w.append(np.nan if v is None else v)
+        return w
+
+
+def _plain(v):
+    # JSON-safe group key component
+    return v.item() if hasattr(v, "item") else v
+
+
+class GroupedGate:
+    """
+    Incremental counterpart of rolling_quantiles for one metric.
+
+    Holds a SortedWindow per group key plus, per key, the last lag - 1
+    values that are not yet visible to the window. update() on rows in time
+    order gives the same lagged quantiles as rolling_quantiles over the
+    full history, so only newly arrived rows need to be processed.
+    """
+
+    def __init__(
+        self,
+        thresholds: Sequence[float],
+        *,
+        window: int = 40,
+        lag: int = 1,
+        min_periods: Optional[int] = None,
+    ):
+        self.thresholds = [float(t) for t in thresholds]
+        self.window = window
+        self.lag = lag
+        self.min_periods = min_periods if min_periods is not None else max(8, window // 4)
+        self.windows: dict[tuple, SortedWindow] = {}
+        self.pending: dict[tuple, deque] = {}
+
+    def update(self, key: tuple, x: float) -> np.ndarray:
+        key = tuple(_plain(k) for k in key)
+        if any(pd.isna(k) for k in key):
+            return np.full(len(self.thresholds), np.nan)
+
+        sw = self.windows.setdefault(key, SortedWindow(self.window, self.min_periods))
+        pend = self.pending.setdefault(key, deque())
+        if self.lag == 0:
+            sw.append(x)
+            return sw.quantile(self.thresholds)
+
+        while len(pend) > self.lag - 1:
+            sw.append(pend.popleft())
+        q = sw.quantile(self.thresholds)
+        pend.append(x)
+        return q
+
+    def update_frame(self, df: pd.DataFrame, metric: str, group_cols: Sequence[str]) -> np.ndarray:
+        """
+        (n_rows, len(thresholds)) for df's rows, taken in their current
+        order (which must be time order).
+        """
+        vals = pd.to_numeric(df[metric], errors="coerce").to_numpy(dtype=float)
+        keys = df[list(group_cols)].itertuples(index=False, name=None) if group_cols else [()] * len(df)
+        out = np.full((len(df), len(self.thresholds)), np.nan)
+        for i, (key, x) in enumerate(zip(keys, vals)):
+            out[i] = self.update(key, x)
+        return out
+
+    def to_dict(self) -> dict:
+        return {
+            "thresholds": self.thresholds,
+            "window": self.window,
+            "lag": self.lag,
+            "min_periods": self.min_periods,
+            "groups": [
+                {
+                    "key": list(k),
+                    "window": sw.to_dict(),
+                    "pending": [None if np.isnan(v) else float(v) for v in self.pending.get(k, ())],
+                }
+                for k, sw in self.windows.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "GroupedGate":
+        gate = cls(d["thresholds"], window=d["window"], lag=d["lag"], min_periods=d["min_periods"])
+        for g in d["groups"]:
+            key = tuple(g["key"])
+            gate.windows[key] = SortedWindow.from_dict(g["window"])
+            gate.pending[key] = deque(np.nan if v is None else v for v in g["pending"])
+        return gate
@@ -3,24 +3,63 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
+from src.core.incremental import (
+    append_partition,
+    check_state_config,
+    extend_forward,
+    frame_from_records,
+    frame_to_records,
+    load_state,
+    save_state,
+    split_tail,
+)
+from src.core.results_store import STORE_ROOT, ResultsStore, store_available
+from src.evaluation.backtest import block_rows, forward_return_block
+from src.loaders.housing_loader import read_panel
+from src.phase2_supply.gate import GroupedGate, rolling_quantiles
+from src.utils.logging import RunLog, stage
 
-def _load_csv(root: Path, rel: str) -> pd.DataFrame:
+
+FWD_H = 4
+SANITY_COLS = [
+    "date",
+    "dti",
+    "real_rate",
+    "regime",
+    "real_price_index",
+    "fwd_ret_4q",
+    "supply_metric_name",
+    "supply_high","supply_q","permits","supply_value",
+]
+
+
+def _load_csv(root: Path, rel: str, start: Optional[str] = None) -> pd.DataFrame:
     p = root / rel
     if not p.exists():
         raise FileNotFoundError(p)
-    return pd.read_csv(p, parse_dates=["date"]).sort_values("date")
+    return read_panel(p.resolve(), start=start, float_dtype="float64").sort_values("date")
 
 
-def _load_supply_optional(root: Path, rel: str) -> Optional[pd.DataFrame]:
+def _load_supply_optional(root: Path, rel: str, start: Optional[str] = None) -> Optional[pd.DataFrame]:
     p = root / rel
     if not p.exists():
         return None
-    df = pd.read_csv(p, parse_dates=["date"]).sort_values("date")
+    df = read_panel(p.resolve(), start=start, float_dtype="float64").sort_values("date")
     return df
 
 
+def _load(cfg: dict, root: Path, start: Optional[str] = None) -> pd.DataFrame:
+    master = _load_csv(root, cfg["master_csv"], start)
+    supply = _load_supply_optional(root, cfg["supply_csv"], start)
+
+    if supply is None:
+        return master.copy()
+    return master.merge(supply, on="date", how="left")
+
+
 def _pick_supply_metric(df: pd.DataFrame, candidates: list[str]) -> Optional[str]:
     for c in candidates:
         if c in df.columns:
@@ -30,73 +69,273 @@ def _pick_supply_metric(df: pd.DataFrame, candidates: list[str]) -> Optional[str
     return None
 
 
-def run(cfg: dict, root: Path) -> None:
-    master = _load_csv(root, cfg["master_csv"])
-    supply = _load_supply_optional(root, cfg["supply_csv"])
+def _gate_groups(df: pd.DataFrame) -> list[str]:
+    return [c for c in ("region", "regime") if c in df.columns]
 
-    if supply is None:
-        df = master.copy()
-    else:
-        df = master.merge(supply, on="date", how="left")
 
+def run(cfg: dict, root: Path, *, profile: Optional[bool] = None) -> None:
+    """
+    Phase 2 sanity run. Each stage is timed and logged (JSON lines) under
+    outputs/phase2/logs/; profile=True dumps cProfile stats of the slowest
+    stage there.
+    """
+    with RunLog("phase2", log_dir=root / "outputs" / "phase2" / "logs", profile=profile) as log:
+        _run(cfg, root)
+    print(f"[phase2] run log: {log.path}")
+
+
+def build_sanity(df: pd.DataFrame, cfg: dict) -> pd.DataFrame:
+    """
+    Forward 4Q returns (when missing) and the supply gate columns for the
+    merged master / supply frame; no I/O, so a caller holding the frame
+    (e.g. a study sharing one load across configs) can reuse it.
+    """
     # Ensure forward 4Q return exists (needed for any Phase 2 evaluation)
     if "fwd_ret_4q" not in df.columns:
         if "real_price_index" not in df.columns:
             raise ValueError("master.csv must contain real_price_index to compute fwd_ret_4q")
-        import numpy as np
-
-        df["log_price"] = np.log(df["real_price_index"].astype(float))
-        df["fwd_ret_4q"] = df["log_price"].shift(-4) - df["log_price"]
-        df.drop(columns=["log_price"], inplace=True)
-
-    metric = _pick_supply_metric(df, cfg["supply_candidates"])
-    if metric is None:
-        df["supply_metric_name"] = "NONE"
-        df["supply_high"] = 0
-    else:
-        s_raw = pd.to_numeric(df[metric], errors="coerce")
-        df["supply_value"] = s_raw
-
-        s = s_raw
-
-        method = str(cfg.get("gate", {}).get("method", "percentile"))
-        thr = float(cfg["gate"]["threshold"])
-
-        if method == "rolling_percentile":
-            win = int(cfg["gate"].get("window", 40))
-            lag = int(cfg["gate"].get("lag", 1))
-
-            q = pd.Series(index=df.index, dtype=float)
-            for r in df["regime"].dropna().unique():
-                mask = df["regime"] == r
-                s_r = s[mask]
-                q_r = s_r.rolling(win, min_periods=max(8, win//4)).quantile(thr).shift(lag)
-                q.loc[mask] = q_r
+        with stage("forward_returns", inputs=df) as st:
+            blk = forward_return_block(
+                df,
+                [4],
+                price_col="real_price_index",
+                group_col="region" if "region" in df.columns else None,
+                dtype=np.float64,
+            )
+            df["fwd_ret_4q"] = block_rows(blk, "log")
+            st.output(df)
+
+    with stage("supply_gate", inputs=df) as st:
+        metric = _pick_supply_metric(df, cfg["supply_candidates"])
+        st["metric"] = metric
+        if metric is None:
+            df["supply_metric_name"] = "NONE"
+            df["supply_high"] = 0
         else:
-            q = s.quantile(thr)
-
-        df["supply_metric_name"] = metric
-        df["supply_high"] = (s >= q).astype("Int64").fillna(0).astype(int)
-        df["supply_q"] = q
-
-    out = root / cfg["outputs"]["sanity_csv"]
-    out.parent.mkdir(parents=True, exist_ok=True)
-
-    cols = [
-        c
-        for c in [
-            "date",
-            "dti",
-            "real_rate",
-            "regime",
-            "real_price_index",
-            "fwd_ret_4q",
-            "supply_metric_name",
-            "supply_high","supply_q","permits","supply_value",
-        ]
-        if c in df.columns
-    ]
-    df[cols].to_csv(out, index=False)
-
-    print(f"[phase2] wrote: {out}")
+            s_raw = pd.to_numeric(df[metric], errors="coerce")
+            df["supply_value"] = s_raw
+
+            s = s_raw
+
+            method = str(cfg.get("gate", {}).get("method", "percentile"))
+            thr = float(cfg["gate"]["threshold"])
+
+            if method == "rolling_percentile":
+                win = int(cfg["gate"].get("window", 40))
+                lag = int(cfg["gate"].get("lag", 1))
+
+                groups = _gate_groups(df)
+                q_arr = rolling_quantiles(
+                    df.assign(_row=np.arange(len(df))),
+                    [metric],
+                    [thr],
+                    group_cols=groups,
+                    time_col="_row",
+                    window=win,
+                    lag=lag,
+                    dtype=np.float64,
+                )
+                q = pd.Series(q_arr[:, 0, 0], index=df.index)
+            else:
+                q = s.quantile(thr)
+
+            df["supply_metric_name"] = metric
+            df["supply_high"] = (s >= q).astype("Int64").fillna(0).astype(int)
+            df["supply_q"] = q
+        st.output(df)
+
+    return df
+
+
+def strategy_series(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Date-level phase 2 gate strategy: invested_p2 = 1 - supply_high
+    (averaged across regions) and strat_p2 = invested_p2 * fwd_ret_4q.
+    Study runs (run_spec) hand it to phase 4 runs that name a phase 2 run;
+    a plain phase 4 run reads outputs/phase2/phase2_strategy_series.csv
+    instead. Note strat_p2 here is a 4-quarter return.
+    """
+    out = df[["date"]].copy()
+    out["invested_p2"] = 1.0 - df["supply_high"].astype(float)
+    out["strat_p2"] = out["invested_p2"] * df["fwd_ret_4q"]
+    return out.groupby("date", as_index=False, sort=True).mean()
+
+
+def _run(cfg: dict, root: Path) -> pd.DataFrame:
+    with stage("load") as st:
+        df = st.output(_load(cfg, root))
+
+    df = build_sanity(df, cfg)
+
+    cols = [c for c in SANITY_COLS if c in df.columns]
+    with stage("write", inputs=df) as st:
+        # the CSV stays the contract; the results store is an extra copy
+        out = root / cfg["outputs"]["sanity_csv"]
+        out.parent.mkdir(parents=True, exist_ok=True)
+        st.output(df[cols]).to_csv(out, index=False)
+        print(f"[phase2] wrote: {out}")
+
+        if store_available():
+            store = ResultsStore(root / STORE_ROOT)
+            run_id = store.write("phase2", "sanity", df[_partition_cols(df)], meta={"cfg": cfg})
+            print(f"[phase2] wrote: {store.root}/phase2/sanity (run {run_id})")
+
     print(df[cols].tail(10).to_string(index=False))
+    return df
+
+
+# -----------------------------
+# Incremental refresh
+# -----------------------------
+def _incremental_dir(cfg: dict, root: Path) -> Path:
+    out = cfg["outputs"].get("sanity_dir")
+    if out is None:
+        out = Path(cfg["outputs"]["sanity_csv"]).with_suffix("")
+    return root / out
+
+
+def run_incremental(cfg: dict, root: Path, *, profile: Optional[bool] = None) -> None:
+    """
+    Quarterly refresh of the phase 2 sanity table.
+
+    The first call runs the full batch (run()), writes it as partition 0
+    under outputs.sanity_dir (default: sanity_csv without its suffix) and
+    persists the state needed to continue: the rolling-quantile gate
+    windows per (region, regime) and the last FWD_H rows per region.
+    Later calls read only rows dated after the last processed quarter,
+    compute fwd_ret_4q / gate columns for them, re-emit tail rows whose
+    fwd_ret_4q just became known, and append one new partition. Read the
+    table back with src.core.incremental.read_partitions(key=["date", ...]).
+
+    Only the rolling_percentile gate is incremental; a full-sample
+    percentile gate moves with every new row, so that method falls back to
+    a full run. The state records the config it was built with (gate,
+    supply_candidates, forward horizon); a refresh under a different one
+    raises instead of appending mismatched partitions.
+    """
+    method = str(cfg.get("gate", {}).get("method", "percentile"))
+    if method != "rolling_percentile":
+        print(f"[phase2] gate method '{method}' is not incremental; running full batch")
+        return run(cfg, root, profile=profile)
+
+    out_dir = _incremental_dir(cfg, root)
+    state_path = out_dir / "_state.json"
+    log_dir = root / "outputs" / "phase2" / "logs"
+
+    with RunLog("phase2", log_dir=log_dir, profile=profile, meta={"mode": "incremental"}) as log:
+        state = load_state(state_path)
+        if state is not None:
+            check_state_config(state, _state_config(cfg), state_path)
+        if state is None:
+            df = _run(cfg, root)
+            with stage("bootstrap_state", inputs=df):
+                state = _bootstrap_state(cfg, df)
+                append_partition(out_dir, df[_partition_cols(df)], tag="full")
+        else:
+            state = _refresh(cfg, root, state, out_dir)
+        if state is not None:
+            save_state(state_path, state)
+    print(f"[phase2] run log: {log.path}")
+
+
+def _partition_cols(df: pd.DataFrame) -> list[str]:
+    # partitions also carry region so multi-region rows stay keyed
+    return [c for c in ["region"] + SANITY_COLS if c in df.columns]
+
+
+def _gate_cfg(cfg: dict) -> dict:
+    g = cfg["gate"]
+    return {"thr": float(g["threshold"]), "window": int(g.get("window", 40)), "lag": int(g.get("lag", 1))}
+
+
+def _state_config(cfg: dict) -> dict:
+    # everything the persisted gate windows / tails depend on
+    return {
+        "gate": {"method": str(cfg["gate"].get("method", "percentile")), **_gate_cfg(cfg)},
+        "supply_candidates": list(cfg["supply_candidates"]),
+        "fwd_h": FWD_H,
+    }
+
+
+def _bootstrap_state(cfg: dict, df: pd.DataFrame) -> dict:
+    g = _gate_cfg(cfg)
+    metric = df["supply_metric_name"].iloc[0] if len(df) else "NONE"
+
+    gate = GroupedGate([g["thr"]], window=g["window"], lag=g["lag"])
+    if metric != "NONE":
+        # replay history once so the windows end where the batch left off
+        gate.update_frame(df, metric, _gate_groups(df))
+
+    tail = split_tail(df, FWD_H, group_col="region")
+
+    return {
+        "config": _state_config(cfg),
+        "last_date": str(df["date"].max().date()),
+        "metric": metric,
+        "gate": gate.to_dict(),
+        "tail": frame_to_records(tail),
+    }
+
+
+def _refresh(cfg: dict, root: Path, state: dict, out_dir: Path) -> Optional[dict]:
+    last = pd.Timestamp(state["last_date"])
+    with stage("load_new") as st:
+        new = st.output(_load(cfg, root, start=str((last + pd.Timedelta(days=1)).date())))
+    new = new[new["date"] > last]
+    if new.empty:
+        print(f"[phase2] no rows after {last.date()}; nothing to append")
+        return None
+
+    tail = frame_from_records(state["tail"])
+    metric = state["metric"]
+
+    with stage("forward_returns", inputs=new) as st:
+        if "fwd_ret_4q" in new.columns:
+            rows = pd.concat([tail, new], ignore_index=True)
+        else:
+            rows, _ = extend_forward(
+                tail.drop(columns=["fwd_ret_4q"], errors="ignore"),
+                new,
+                price_col="real_price_index",
+                horizons=[FWD_H],
+                group_col="region",
+            )
+            rows["fwd_ret_4q"] = rows.pop(f"fwd_log_h{FWD_H}")
+        st.output(rows)
+
+    with stage("supply_gate", inputs=new) as st:
+        is_new = (rows["date"] > last).to_numpy()
+        fresh = rows.loc[is_new].sort_values("date")
+        gate = GroupedGate.from_dict(state["gate"])
+        if metric == "NONE":
+            fresh["supply_metric_name"] = "NONE"
+            fresh["supply_high"] = 0
+        else:
+            s = pd.to_numeric(fresh[metric], errors="coerce")
+            q = pd.Series(gate.update_frame(fresh, metric, _gate_groups(fresh))[:, 0], index=fresh.index)
+            fresh["supply_value"] = s
+            fresh["supply_metric_name"] = metric
+            fresh["supply_high"] = (s >= q).astype("Int64").fillna(0).astype(int)
+            fresh["supply_q"] = q
+        st.output(fresh)
+
+    # the tail is the last FWD_H quarters per region, so its fwd_ret_4q was
+    # NaN when written; re-emit the rows where it is now known
+    old = rows.loc[~is_new]
+    patched = old[old["fwd_ret_4q"].notna()]
+
+    out = pd.concat([patched, fresh], ignore_index=True).sort_values("date")
+    with stage("append", inputs=out) as st:
+        path = append_partition(out_dir, st.output(out[_partition_cols(out)]), tag=f"{out['date'].max():%Y%m%d}")
+
+    print(f"[phase2] appended {len(fresh)} new / {len(patched)} backfilled rows: {path}")
+
+    full = pd.concat([old, fresh], ignore_index=True)
+    next_tail = split_tail(full, FWD_H, group_col="region")
+
+    return {
+        **state,
+        "last_date": str(full["date"].max().date()),
+        "gate": gate.to_dict(),
+        "tail": frame_to_records(next_tail),
+    }
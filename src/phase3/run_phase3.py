@@ -3,13 +3,18 @@ import sys
 import json
 import pandas as pd
 
+from src.utils.logging import RunLog, stage
+
 def main():
     # 先做个占位：确认脚本能跑、能写日志
     out_dir = "outputs/phase3/logs"
-    os.makedirs(out_dir, exist_ok=True)
-    with open(os.path.join(out_dir, "run_ok.json"), "w") as f:
-        json.dump({"status": "ok"}, f)
+    with RunLog("phase3", log_dir=out_dir) as log:
+        with stage("placeholder"):
+            os.makedirs(out_dir, exist_ok=True)
+            with open(os.path.join(out_dir, "run_ok.json"), "w") as f:
+                json.dump({"status": "ok", "run_id": log.run_id}, f)
     print("Phase 3 runner placeholder OK.")
+    print("run log:", log.path)
 
 if __name__ == "__main__":
     main()
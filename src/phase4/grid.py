@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.phase4.run_phase4 import (
+    DATE_COL,
+    DTI_COL,
+    MS_COL,
+    RET_COL,
+    attach_phase2_reference,
+    load_panel,
+    write_table,
+    zscore_series,
+)
+from src.evaluation.tail_risk import tail_metrics
+from src.utils.logging import RunLog, stage
+
+# -----------------------------
+# Config (edit if needed)
+# -----------------------------
+OUT_GRID = Path("outputs/phase4/tables/grid_summary.csv")
+
+GRID = {
+    "linear":   {"k": np.round(np.arange(0.05, 1.01, 0.05), 2).tolist()},
+    "logistic": {"a": [-0.5, 0.0, 0.5], "b": np.round(np.arange(0.2, 3.01, 0.2), 1).tolist()},
+    "clip_min": [0.0],
+    "clip_max": [1.0],
+}
+ROLL_WINS = [12, 16, 20, 28, 40]
+FIRST_TESTS = ["2007-03-31", "2011-03-31", "2015-03-31"]
+
+SUMMARY_COLS = ["n", "mean", "vol", "p05", "min"]
+TAIL_COLS = ["cvar5", "downside_dev", "max_drawdown"]
+
+# -----------------------------
+# Spec grid
+# -----------------------------
+def spec_name(spec: dict) -> str:
+    if spec["kind"] == "linear":
+        return f"linear_clip_k{spec['k']:.2f}"
+    if spec["kind"] == "logistic":
+        return f"logistic_a{spec['a']:g}_b{spec['b']:g}"
+    raise ValueError(f"Unknown kind: {spec['kind']}")
+
+def expand_specs(grid: dict) -> list[dict]:
+    """
+    Cartesian product of a parameter grid into SPECS-style dicts.
+
+    grid = {"linear": {"k": [...]}, "logistic": {"a": [...], "b": [...]},
+            "clip_min": [...], "clip_max": [...]}
+    """
+    clips = list(itertools.product(grid.get("clip_min", [0.0]), grid.get("clip_max", [1.0])))
+    specs = []
+    for kind in ("linear", "logistic"):
+        params = grid.get(kind)
+        if not params:
+            continue
+        keys = list(params)
+        for values in itertools.product(*(params[k] for k in keys)):
+            for lo, hi in clips:
+                spec = {"kind": kind, **dict(zip(keys, values)), "clip_min": lo, "clip_max": hi}
+                specs.append({"name": spec_name(spec), **spec})
+    return specs
+
+# -----------------------------
+# Vectorized kernels
+# -----------------------------
+def exposure_matrix(score: np.ndarray, specs: list[dict]) -> np.ndarray:
+    """
+    Evaluate every exposure spec against one score series.
+
+    Returns an (n_specs, T) array; same formulas as exposure_from_score.
+    """
+    score = np.asarray(score, dtype=float)
+    ex = np.empty((len(specs), len(score)))
+    kinds = np.array([s["kind"] for s in specs])
+
+    lin = np.flatnonzero(kinds == "linear")
+    if len(lin):
+        k = np.array([specs[i]["k"] for i in lin])
+        ex[lin] = 1.0 - k[:, None] * score[None, :]
+
+    logi = np.flatnonzero(kinds == "logistic")
+    if len(logi):
+        a = np.array([specs[i]["a"] for i in logi])
+        b = np.array([specs[i]["b"] for i in logi])
+        ex[logi] = 1.0 / (1.0 + np.exp(a[:, None] + b[:, None] * score[None, :]))
+
+    unknown = set(kinds) - {"linear", "logistic"}
+    if unknown:
+        raise ValueError(f"Unknown kind: {sorted(unknown)[0]}")
+
+    lo = np.array([s["clip_min"] for s in specs])[:, None]
+    hi = np.array([s["clip_max"] for s in specs])[:, None]
+    return np.clip(ex, lo, hi)
+
+def summarize_matrix(R: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Row-wise summarize_strategy over an (n_strategies, T) array (NaN = missing).
+    """
+    n = np.sum(~np.isnan(R), axis=1)
+    out = {k: np.full(R.shape[0], np.nan) for k in SUMMARY_COLS}
+    out["n"] = n
+    has = n > 0
+    if has.any():
+        Rh = R[has]
+        out["mean"][has] = np.nanmean(Rh, axis=1)
+        out["p05"][has] = np.nanpercentile(Rh, 5, axis=1)
+        out["min"][has] = np.nanmin(Rh, axis=1)
+        multi = n[has] > 1
+        vol = np.full(Rh.shape[0], np.nan)
+        if multi.any():
+            vol[multi] = np.nanstd(Rh[multi], axis=1, ddof=1)
+        out["vol"][has] = vol
+    return out
+
+# -----------------------------
+# Worker side
+# -----------------------------
+_SHARED: dict = {}
+
+def _init_worker(shared: dict) -> None:
+    _SHARED.clear()
+    _SHARED.update(shared)
+
+def _evaluate_window(roll_win: int) -> pd.DataFrame:
+    """
+    One rolling window: build the fragility score once, then evaluate every
+    spec x first_test combination against it.
+    """
+    sh = _SHARED
+    dti_z = zscore_series(pd.Series(sh["dti"]), roll_win).fillna(0).to_numpy()
+    ms_z = zscore_series(pd.Series(sh["ms"]), roll_win).fillna(0).to_numpy()
+    score = dti_z * ms_z
+
+    specs = sh["specs"]
+    ex = exposure_matrix(score, specs)
+    gate = sh["gate"]
+    if not np.isnan(gate).all():
+        ex = ex * np.where(np.isnan(gate), 1.0, gate)[None, :]
+    R = ex * sh["ret"][None, :]
+
+    frames = []
+    for first_test in sh["first_tests"]:
+        oos = sh["dates"] >= np.datetime64(pd.to_datetime(first_test))
+        summ = summarize_matrix(R[:, oos])
+        tail = tail_metrics(R[:, oos], quantiles=(), alphas=(0.05,))
+        summ.update({k: tail[k] for k in TAIL_COLS})
+        frames.append(pd.DataFrame({
+            "strategy": [s["name"] for s in specs],
+            "spec_id": np.arange(len(specs)),
+            "window": roll_win,
+            "first_test": first_test,
+            **summ,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+# -----------------------------
+# Driver
+# -----------------------------
+def run_grid(
+    df: pd.DataFrame,
+    specs: list[dict],
+    roll_wins: list[int],
+    first_tests: list[str],
+    *,
+    workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Evaluate specs x roll_wins x first_tests against one panel.
+
+    df must be the phase 4 panel after load_panel / attach_phase2_reference.
+    Rolling windows are fanned out over a process pool (workers=1 runs
+    in-process); every window shares the same input arrays, shipped to each
+    worker once. Returns a long table with one row per
+    (strategy, window, first_test) and columns n/mean/vol/p05/min plus
+    cvar5/downside_dev/max_drawdown (tail_risk.tail_metrics).
+    """
+    shared = {
+        "dti": df[DTI_COL].to_numpy(dtype=float),
+        "ms": df[MS_COL].to_numpy(dtype=float),
+        "ret": df[RET_COL].to_numpy(dtype=float),
+        "gate": df["invested_p2"].to_numpy(dtype=float),
+        "dates": df[DATE_COL].to_numpy(dtype="datetime64[ns]"),
+        "specs": specs,
+        "first_tests": list(first_tests),
+    }
+
+    if workers is None:
+        workers = min(len(roll_wins), os.cpu_count() or 1)
+
+    if workers <= 1:
+        _init_worker(shared)
+        frames = [_evaluate_window(w) for w in roll_wins]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(shared,),
+        ) as ex:
+            frames = list(ex.map(_evaluate_window, roll_wins))
+
+    out = pd.concat(frames, ignore_index=True)
+    params = pd.DataFrame(specs).drop(columns=["name"])
+    return out.join(params, on="spec_id").drop(columns=["spec_id"])
+
+def main(workers: Optional[int] = None, profile: Optional[bool] = None, *, root: Path | str = "."):
+    with RunLog("phase4", profile=profile, meta={"entry": "grid", "workers": workers}) as log:
+        with stage("load") as st:
+            df = st.output(attach_phase2_reference(load_panel(root=root), root=root))
+        specs = expand_specs(GRID)
+
+        with stage("grid", inputs=df, n_specs=len(specs)) as st:
+            out = st.output(run_grid(df, specs, ROLL_WINS, FIRST_TESTS, workers=workers))
+
+        with stage("write", inputs=out):
+            path = write_table("grid_summary", out, OUT_GRID, root=root)
+
+    print("wrote:", path)
+    print("run log:", log.path)
+    print(f"{len(specs)} specs x {len(ROLL_WINS)} windows x {len(FIRST_TESTS)} splits = {len(out)} rows")
+    print("\nBest p05 per window:\n", out.loc[out.groupby("window")["p05"].idxmax()])
+
+if __name__ == "__main__":
+    main()
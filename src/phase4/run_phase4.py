@@ -3,17 +3,31 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 from pathlib import Path
+from typing import Optional
+
+from src.loaders.housing_loader import read_panel
+from src.core.results_store import STORE_ROOT, ResultsStore, store_available
+from src.core.incremental import append_partition, check_state_config, load_state, read_partitions, save_state
+from src.signals.normalization import RunningZScore, zscore_panel
+from src.utils.logging import RunLog, stage
 
 # -----------------------------
 # Config (edit if needed)
 # -----------------------------
+# paths are relative to the project root (`root`, default the working
+# directory), the same root phase 2 writes under
 IN_PATH = Path("data/processed/phase3_panel_wret_regime_alt.csv")
 P2_PATH = Path("outputs/phase2/phase2_strategy_series.csv")  # for baseline strategies if needed
+P2_TABLE = "strategy_series"  # store mirror of P2_PATH, one run per CSV version
 
 OUT_SERIES = Path("outputs/phase4/series/oos_series.csv")
 OUT_SUMMARY = Path("outputs/phase4/tables/oos_summary.csv")
 OUT_SPECS = Path("outputs/phase4/tables/exposure_specs.csv")
 
+# incremental mode (run_incremental): appended partitions + persisted state
+OUT_SERIES_DIR = Path("outputs/phase4/series/oos_series")
+STATE_PATH = OUT_SERIES_DIR / "_state.json"
+
 DATE_COL = "date"
 RET_COL = "ret_1q_fwd"
 DTI_COL = "dti"
@@ -35,9 +49,9 @@ SPECS = [
 # Helpers
 # -----------------------------
 def zscore_series(s: pd.Series, win: int) -> pd.Series:
-    mu = s.rolling(win).mean()
-    sd = s.rolling(win).std()
-    return (s - mu) / sd
+    # rolling(win) z-score with sample std, via the shared normalization module
+    z = zscore_panel(s.to_frame("x"), ["x"], group_col=None, mode="rolling", window=win, ddof=1)
+    return pd.Series(z[:, 0], index=s.index)
 
 def clip01(x: np.ndarray | pd.Series, lo: float = 0.0, hi: float = 1.0):
     return np.clip(x, lo, hi)
@@ -70,84 +84,134 @@ def summarize_strategy(r: pd.Series) -> dict:
 # -----------------------------
 # Load + build score
 # -----------------------------
-def main():
-    assert IN_PATH.exists(), f"Missing {IN_PATH}"
-    df = pd.read_csv(IN_PATH)
-    df[DATE_COL] = pd.to_datetime(df[DATE_COL])
+def prepare_panel(df: pd.DataFrame) -> pd.DataFrame:
     df = df.sort_values(DATE_COL)
 
     # drop the last quarter with missing forward return
-    df = df.dropna(subset=[RET_COL]).copy()
+    return df.dropna(subset=[RET_COL]).copy()
+
+def load_panel(start: Optional[str] = None, *, root: Path | str = ".") -> pd.DataFrame:
+    path = Path(root) / IN_PATH
+    assert path.exists(), f"Missing {path}"
+    df = read_panel(path.resolve(), start=start, float_dtype="float64")
+    return prepare_panel(df)
 
+def attach_fragility_score(df: pd.DataFrame, win: int = ROLL_WIN) -> pd.DataFrame:
     # Build a continuous fragility score using rolling z-scores.
     # Simple, interpretable, and avoids re-fitting each step.
-    df["dti_z"] = zscore_series(df[DTI_COL], ROLL_WIN)
-    df["ms_z"]  = zscore_series(df[MS_COL],  ROLL_WIN)
+    df["dti_z"] = zscore_series(df[DTI_COL], win)
+    df["ms_z"]  = zscore_series(df[MS_COL],  win)
 
     # Fragility score: higher when affordability stress is high AND supply pressure is high.
     # This mirrors Phase 3 logic: interaction matters.
     # You can tune weights; start simple.
     df["fragility_score"] = (df["dti_z"].fillna(0) * df["ms_z"].fillna(0))
+    return df
+
+P2_COLS = ["date", "invested_p2", "strat_p2"]
+
+def merge_phase2_reference(df: pd.DataFrame, p2: Optional[pd.DataFrame]) -> pd.DataFrame:
+    # p2: (date, invested_p2, strat_p2) or None when there is no phase 2 reference
+    if p2 is None:
+        df["invested_p2"] = np.nan
+        df["strat_p2"] = np.nan
+        return df
+    return df.merge(p2[P2_COLS], on="date", how="left")
+
+def _read_p2_csv(path: Path) -> pd.DataFrame:
+    p2 = pd.read_csv(path, usecols=P2_COLS)
+    p2["date"] = pd.to_datetime(p2["date"])
+    return p2
+
+def load_phase2_reference(root: Path | str = ".") -> Optional[pd.DataFrame]:
+    # P2_PATH is the source of truth. With pyarrow its columns are mirrored
+    # into the results store once per CSV version (size + mtime), so later
+    # runs get a typed column read instead of a CSV parse.
+    path = Path(root) / P2_PATH
+    if not path.exists():
+        return None
+    if not store_available():
+        return _read_p2_csv(path)
+    st = path.stat()
+    run_id = f"csv-{st.st_size}-{st.st_mtime_ns}"
+    store = ResultsStore(Path(root) / STORE_ROOT)
+    if store.has_run("phase2", P2_TABLE, run_id):
+        return store.read("phase2", P2_TABLE, run=run_id, columns=P2_COLS)
+    p2 = _read_p2_csv(path)
+    try:
+        store.write("phase2", P2_TABLE, p2, run_id=run_id, meta={"source": str(P2_PATH)})
+    except FileExistsError:
+        pass  # another run mirrored the same version first
+    return p2
+
+def attach_phase2_reference(df: pd.DataFrame, *, root: Path | str = ".") -> pd.DataFrame:
+    # Phase2 reference (optional): merge invested_p2 if you want direct comparison.
+    return merge_phase2_reference(df, load_phase2_reference(root))
+
+def evaluate_specs(
+    df: pd.DataFrame,
+    *,
+    specs: list[dict] = SPECS,
+    roll_win: int = ROLL_WIN,
+    first_test: str = FIRST_TEST,
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Fragility score, baseline / phase 2 / per-spec strategies and their OOS
+    summaries for one (specs, roll_win, first_test) config. df is the
+    prepared panel with the phase 2 reference columns already merged.
+
+    Returns (df, series, summary, specs) where series is the clean time
+    series table written as oos_series.
+    """
+    with stage("fragility_score", inputs=df) as st:
+        df = st.output(attach_fragility_score(df, roll_win))
 
     # OOS split
-    first_test = pd.to_datetime(FIRST_TEST)
-    df["is_oos"] = df[DATE_COL] >= first_test
+    df["is_oos"] = df[DATE_COL] >= pd.to_datetime(first_test)
 
     # Baseline: fully invested
     df["exposure_baseline"] = 1.0
     df["strat_baseline"] = df["exposure_baseline"] * df[RET_COL]
 
-    # Phase2 reference (optional): merge invested_p2 if you want direct comparison
-    if P2_PATH.exists():
-        p2 = pd.read_csv(P2_PATH, usecols=["date","invested_p2","strat_p2"])
-        p2["date"] = pd.to_datetime(p2["date"])
-        df = df.merge(p2, on="date", how="left")
-    else:
-        df["invested_p2"] = np.nan
-        df["strat_p2"] = np.nan
-
     # Run each exposure spec
-    all_summ = []
-    specs_out = []
-
-    for spec in SPECS:
-        name = spec["name"]
-        ex = exposure_from_score(df["fragility_score"], spec)
-        # gate+scaling: only scale when Phase2 gate says invested
-        gate = df["invested_p2"]
-        if gate.notna().any():
-            ex2 = ex * gate.fillna(1.0)
-        else:
-            ex2 = ex
+    with stage("exposure_specs", inputs=df, n_specs=len(specs)) as st:
+        all_summ = []
+        specs_out = []
+
+        for spec in specs:
+            name = spec["name"]
+            ex = exposure_from_score(df["fragility_score"], spec)
+            # gate+scaling: only scale when Phase2 gate says invested
+            gate = df["invested_p2"]
+            if gate.notna().any():
+                ex2 = ex * gate.fillna(1.0)
+            else:
+                ex2 = ex
 
-        df[f"exposure_{name}"] = ex2
-        df[f"strat_{name}"] = ex2 * df[RET_COL]
+            df[f"exposure_{name}"] = ex2
+            df[f"strat_{name}"] = ex2 * df[RET_COL]
 
-        # summarize OOS only
-        oos = df.loc[df["is_oos"], f"strat_{name}"]
-        summ = summarize_strategy(oos)
-        summ.update({"strategy": name, "window": ROLL_WIN, "first_test": FIRST_TEST})
-        all_summ.append(summ)
+            # summarize OOS only
+            oos = df.loc[df["is_oos"], f"strat_{name}"]
+            summ = summarize_strategy(oos)
+            summ.update({"strategy": name, "window": roll_win, "first_test": first_test})
+            all_summ.append(summ)
 
-        specs_out.append({"strategy": name, **spec, "roll_win": ROLL_WIN, "first_test": FIRST_TEST})
+            specs_out.append({"strategy": name, **spec, "roll_win": roll_win, "first_test": first_test})
+        st.output(df)
 
     # Add baseline + phase2 summaries (OOS)
     base_oos = df.loc[df["is_oos"], "strat_baseline"]
     s0 = summarize_strategy(base_oos)
-    s0.update({"strategy":"baseline_full", "window": ROLL_WIN, "first_test": FIRST_TEST})
+    s0.update({"strategy":"baseline_full", "window": roll_win, "first_test": first_test})
     all_summ = [s0] + all_summ
 
     if df["strat_p2"].notna().any():
         p2_oos = df.loc[df["is_oos"], "strat_p2"]
         s2 = summarize_strategy(p2_oos)
-        s2.update({"strategy":"phase2_gate", "window": ROLL_WIN, "first_test": FIRST_TEST})
+        s2.update({"strategy":"phase2_gate", "window": roll_win, "first_test": first_test})
         all_summ = [s0, s2] + all_summ[1:]
 
-    # Save
-    OUT_SERIES.parent.mkdir(parents=True, exist_ok=True)
-    OUT_SUMMARY.parent.mkdir(parents=True, exist_ok=True)
-    OUT_SPECS.parent.mkdir(parents=True, exist_ok=True)
-
     # Keep only a clean time series set
     keep_cols = [DATE_COL, RET_COL, "is_oos", "fragility_score", "dti_z", "ms_z", "exposure_baseline", "strat_baseline"]
     if "invested_p2" in df.columns:
@@ -156,16 +220,156 @@ def main():
     keep_cols += [c for c in df.columns if c.startswith("exposure_") and c not in keep_cols]
     keep_cols += [c for c in df.columns if c.startswith("strat_") and c not in keep_cols]
 
-    df_out = df[keep_cols].copy()
-    df_out.to_csv(OUT_SERIES, index=False)
+    return df, df[keep_cols].copy(), pd.DataFrame(all_summ), pd.DataFrame(specs_out)
+
+def write_table(name: str, df: pd.DataFrame, csv_path: Path, *, root: Path | str = "."):
+    # always the CSV path; also the results store when pyarrow is available
+    csv_path = Path(root) / csv_path
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(csv_path, index=False)
+    if not store_available():
+        return csv_path
+    store = ResultsStore(Path(root) / STORE_ROOT)
+    run_id = store.write("phase4", name, df, meta={"roll_win": ROLL_WIN, "first_test": FIRST_TEST})
+    return f"{csv_path}, {store.root}/phase4/{name} (run {run_id})"
+
+def main(profile: Optional[bool] = None, *, root: Path | str = "."):
+    with RunLog("phase4", profile=profile, meta={"roll_win": ROLL_WIN, "first_test": FIRST_TEST}) as log:
+        _main(root)
+    print("run log:", log.path)
+
+
+def _main(root: Path | str = "."):
+    with stage("load") as st:
+        df = st.output(load_panel(root=root))
+    with stage("phase2_reference", inputs=df) as st:
+        df = st.output(attach_phase2_reference(df, root=root))
+
+    df, df_out, summary, specs_out = evaluate_specs(df)
 
-    pd.DataFrame(all_summ).to_csv(OUT_SUMMARY, index=False)
-    pd.DataFrame(specs_out).to_csv(OUT_SPECS, index=False)
+    with stage("write", inputs=df) as st:
+        st.output(df_out)
+        tables = {
+            "oos_series": (df_out, OUT_SERIES),
+            "oos_summary": (summary, OUT_SUMMARY),
+            "exposure_specs": (specs_out, OUT_SPECS),
+        }
+        for name, (tbl, csv_path) in tables.items():
+            print("wrote:", write_table(name, tbl, csv_path, root=root))
+    print("\nOOS summary preview:\n", summary.sort_values("p05"))
+    return df, df_out
 
-    print("wrote:", OUT_SERIES)
-    print("wrote:", OUT_SUMMARY)
-    print("wrote:", OUT_SPECS)
-    print("\nOOS summary preview:\n", pd.DataFrame(all_summ).sort_values("p05"))
+
+# -----------------------------
+# Incremental refresh
+# -----------------------------
+def run_incremental(profile: Optional[bool] = None, *, root: Path | str = "."):
+    """
+    Append newly arrived quarters to the OOS series instead of rebuilding it.
+
+    The first call runs main()'s batch, writes its series as partition 0 of
+    OUT_SERIES_DIR and persists the rolling z-score state (last ROLL_WIN
+    values of dti / months_supply). Later calls read only rows after the
+    last processed date, update the z-scores one quarter at a time, append
+    one partition, and refresh the (small) OOS summary table from the
+    partitions' strat_ columns. The state records ROLL_WIN, FIRST_TEST
+    and SPECS; a refresh after any of them changed raises instead of
+    appending partitions computed under the old ones.
+    """
+    with RunLog("phase4", profile=profile, meta={"mode": "incremental", "roll_win": ROLL_WIN}) as log:
+        root = Path(root)
+        state = load_state(root / STATE_PATH)
+        if state is not None:
+            check_state_config(state, _state_config(), root / STATE_PATH)
+        if state is None:
+            df, df_out = _main(root)
+            with stage("bootstrap_state", inputs=df_out):
+                append_partition(root / OUT_SERIES_DIR, df_out, tag="full")
+                state = _zscore_state(df)
+        else:
+            state = _refresh(state, root)
+        if state is not None:
+            save_state(root / STATE_PATH, state)
+    print("run log:", log.path)
+
+
+def _state_config() -> dict:
+    return {"roll_win": ROLL_WIN, "first_test": FIRST_TEST, "specs": SPECS}
+
+
+def _zscore_state(df: pd.DataFrame) -> dict:
+    df = df.sort_values(DATE_COL)
+    return {
+        "config": _state_config(),
+        "last_date": str(df[DATE_COL].max().date()),
+        "dti": RunningZScore.from_history(df[[DTI_COL]].to_numpy(), window=ROLL_WIN, ddof=1).to_dict(),
+        "ms": RunningZScore.from_history(df[[MS_COL]].to_numpy(), window=ROLL_WIN, ddof=1).to_dict(),
+    }
+
+
+def _refresh(state: dict, root: Path) -> Optional[dict]:
+    last = pd.Timestamp(state["last_date"])
+    with stage("load_new") as st:
+        new = load_panel(start=str((last + pd.Timedelta(days=1)).date()), root=root)
+        new = st.output(new[new[DATE_COL] > last].copy())
+    if new.empty:
+        print(f"no rows after {last.date()}; nothing to append")
+        return None
+
+    with stage("fragility_score", inputs=new) as st:
+        zd = RunningZScore.from_dict(state["dti"])
+        zm = RunningZScore.from_dict(state["ms"])
+        dti = new[DTI_COL].to_numpy(dtype=float)
+        ms = new[MS_COL].to_numpy(dtype=float)
+        new["dti_z"] = [zd.update([x])[0] for x in dti]
+        new["ms_z"] = [zm.update([x])[0] for x in ms]
+        new["fragility_score"] = new["dti_z"].fillna(0) * new["ms_z"].fillna(0)
+        st.output(new)
+
+    new["is_oos"] = new[DATE_COL] >= pd.to_datetime(FIRST_TEST)
+    new["exposure_baseline"] = 1.0
+    new["strat_baseline"] = new["exposure_baseline"] * new[RET_COL]
+    new = attach_phase2_reference(new, root=root)
+
+    with stage("exposure_specs", inputs=new, n_specs=len(SPECS)) as st:
+        gate = new["invested_p2"]
+        for spec in SPECS:
+            ex = exposure_from_score(new["fragility_score"], spec)
+            if gate.notna().any():
+                ex = ex * gate.fillna(1.0)
+            new[f"exposure_{spec['name']}"] = ex
+            new[f"strat_{spec['name']}"] = ex * new[RET_COL]
+        st.output(new)
+
+    keep_cols = [DATE_COL, RET_COL, "is_oos", "fragility_score", "dti_z", "ms_z", "exposure_baseline", "strat_baseline",
+                 "invested_p2", "strat_p2"]
+    keep_cols += [c for c in new.columns if c.startswith("exposure_") and c not in keep_cols]
+    keep_cols += [c for c in new.columns if c.startswith("strat_") and c not in keep_cols]
+
+    with stage("append", inputs=new) as st:
+        path = append_partition(root / OUT_SERIES_DIR, st.output(new[keep_cols]), tag=f"{new[DATE_COL].max():%Y%m%d}")
+    print("appended:", path)
+
+    with stage("summary") as st:
+        strat = ["strat_baseline", "strat_p2"] + [f"strat_{s['name']}" for s in SPECS]
+        series = st.output(read_partitions(root / OUT_SERIES_DIR, key=[DATE_COL], columns=[DATE_COL, "is_oos"] + strat))
+        oos = series[series["is_oos"].astype(bool)]
+        rows = []
+        for col, name in [("strat_baseline", "baseline_full"), ("strat_p2", "phase2_gate")] + \
+                         [(f"strat_{s['name']}", s["name"]) for s in SPECS]:
+            if col == "strat_p2" and not series[col].notna().any():
+                continue
+            summ = summarize_strategy(oos[col])
+            summ.update({"strategy": name, "window": ROLL_WIN, "first_test": FIRST_TEST})
+            rows.append(summ)
+        print("wrote:", write_table("oos_summary", pd.DataFrame(rows), OUT_SUMMARY, root=root))
+
+    return {
+        "config": state["config"],
+        "last_date": str(new[DATE_COL].max().date()),
+        "dti": zd.to_dict(),
+        "ms": zm.to_dict(),
+    }
 
 if __name__ == "__main__":
     main()
@@ -11,7 +11,7 @@ def build_master_df(
     seed: int = 42,
 ) -> pd.DataFrame:
     rng = np.random.default_rng(seed)
-    dates = pd.date_range(start=start, end=end, freq="Q")
+    dates = pd.date_range(start=start, end=end, freq="QE")
     n = len(dates)
 
     cycle = 1.5 * np.sin(np.linspace(0, 8 * np.pi, n))
@@ -42,3 +42,96 @@ def build_master_df(
             "real_price_index": real_price_index,
         }
     )
+
+
+def _correlated_shocks(rng, n: int, k: int, rho: float, scale: float) -> np.ndarray:
+    # (n, k): one common factor plus idiosyncratic noise, pairwise corr = rho
+    common = rng.normal(size=(n, 1))
+    idio = rng.normal(size=(n, k))
+    return scale * (np.sqrt(rho) * common + np.sqrt(1.0 - rho) * idio)
+
+
+def build_panel_df(
+    *,
+    n_regions: int = 10,
+    start: str = "1999-01-01",
+    end: str = "2024-12-31",
+    periods: int | None = None,
+    rho: float = 0.6,
+    seed: int = 42,
+) -> pd.DataFrame:
+    """
+    build_master_df generalized to n_regions x T quarters.
+
+    All regions share the rate cycle / regime and the crash window; price,
+    DTI and the affordability inputs get shocks with pairwise correlation
+    rho across regions. periods (if given) overrides end.
+
+    Long frame sorted by (region, date) with the build_master_df columns
+    plus region, price, pti, rent_burden, supply_pressure,
+    migration_pressure, months_supply, permits and ret_1q_fwd.
+    """
+    rng = np.random.default_rng(seed)
+    if periods is None:
+        dates = pd.date_range(start=start, end=end, freq="QE")
+    else:
+        dates = pd.date_range(start=start, periods=periods, freq="QE")
+    n, k = len(dates), n_regions
+
+    cycle = 1.5 * np.sin(np.linspace(0, 8 * np.pi, n))
+    real_rate = cycle + rng.normal(0, 0.6, size=n)
+    regime = (real_rate < 0).astype(int)
+
+    level = rng.normal(0, 8.0, size=k)
+    trend = np.linspace(85, 135, n)[:, None] + level[None, :]
+    dti = trend + regime[:, None] * 6 + _correlated_shocks(rng, n, k, rho, 2.0)
+    dti = np.clip(dti, 60, 180)
+
+    base_growth = 0.008 + regime * 0.004
+    crash = np.zeros(n)
+    crash[int(n * 0.30):int(n * 0.38)] = -0.04
+    beta = rng.uniform(0.5, 1.5, size=k)
+
+    returns = (
+        base_growth[:, None]
+        + _correlated_shocks(rng, n, k, rho, 0.01)
+        + crash[:, None] * beta[None, :]
+    )
+    real_price_index = 100 * np.exp(np.cumsum(returns, axis=0))
+    real_price_index = real_price_index / real_price_index[0] * 100
+
+    pti = 0.25 * dti / 100 + _correlated_shocks(rng, n, k, rho, 0.02)
+    rent_burden = 0.30 + _correlated_shocks(rng, n, k, rho, 0.03).cumsum(axis=0) * 0.1
+    supply_pressure = _correlated_shocks(rng, n, k, rho, 1.0)
+    migration_pressure = _correlated_shocks(rng, n, k, rho, 1.0)
+    months_supply = np.clip(6 + _correlated_shocks(rng, n, k, rho, 0.5).cumsum(axis=0) * 0.2, 1, 15)
+    permits = np.exp(_correlated_shocks(rng, n, k, rho, 0.2)) * 1000
+
+    ret_1q_fwd = np.full((n, k), np.nan)
+    ret_1q_fwd[:-1] = real_price_index[1:] / real_price_index[:-1] - 1.0
+
+    width = len(str(max(k - 1, 0)))
+    regions = np.array([f"r{i:0{width}d}" for i in range(k)])
+
+    def flat(a):
+        # (n, k) -> region-major long column
+        return np.asarray(a).T.reshape(-1)
+
+    return pd.DataFrame(
+        {
+            "date": np.tile(dates, k),
+            "region": np.repeat(regions, n),
+            "dti": flat(dti),
+            "real_rate": np.tile(real_rate, k),
+            "regime": np.tile(regime, k),
+            "real_price_index": flat(real_price_index),
+            "price": flat(real_price_index),
+            "pti": flat(pti),
+            "rent_burden": flat(rent_burden),
+            "supply_pressure": flat(supply_pressure),
+            "migration_pressure": flat(migration_pressure),
+            "months_supply": flat(months_supply),
+            "permits": flat(permits),
+            "ret_1q_fwd": flat(ret_1q_fwd),
+        }
+    )
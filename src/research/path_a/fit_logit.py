@@ -1,10 +1,17 @@
 from __future__ import annotations
 
+from typing import Optional
+
+import numpy as np
 import pandas as pd
-import statsmodels.api as sm
+
+
+TERMS = ["const", "dti", "regime", "dti_x_regime"]
 
 
 def fit_interaction_logit(df: pd.DataFrame):
+    import statsmodels.api as sm  # deferred: fit_logit_batched doesn't need it
+
     df = df.copy()
     df["dti_x_regime"] = df["dti"] * df["regime"]
 
@@ -16,3 +23,202 @@ def fit_interaction_logit(df: pd.DataFrame):
 
     df["pred_prob"] = res.predict(X)
     return res, df
+
+
+def interaction_design(df: pd.DataFrame) -> np.ndarray:
+    """
+    (n, 4) design matrix [const, dti, regime, dti_x_regime] as float64.
+    """
+    dti = df["dti"].to_numpy(dtype=float)
+    regime = df["regime"].to_numpy(dtype=float)
+    return np.column_stack([np.ones_like(dti), dti, regime, dti * regime])
+
+
+def fit_logit_batched(
+    X: np.ndarray,
+    y: np.ndarray,
+    w: Optional[np.ndarray] = None,
+    *,
+    max_iter: int = 35,
+    tol: float = 1e-8,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Fit B logistic regressions at once by Newton-Raphson / IRLS.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        (n, p) design shared by every problem, (B, n, p) stacked designs,
+        or (G, n, p) per-group designs shared by that group's replicates
+        (with (G, R, n) weights).
+    y : np.ndarray
+        (n,) or (B, n) 0/1 outcomes; (G, n) for per-group designs.
+    w : np.ndarray, optional
+        (B, n) non-negative row weights, or (G, R, n) for per-group
+        designs. Bootstrap replicates are expressed as resampling counts
+        and padded rows as zero weight, so no design matrix is ever copied
+        per replicate.
+    max_iter : int
+        Newton iterations.
+    tol : float
+        Convergence tolerance on the max absolute step.
+
+    Returns
+    -------
+    (params, converged)
+        params : (B, p) coefficients ((G, R, p) for per-group designs)
+        converged : (B,) bool ((G, R)); False for non-converged or
+        separated fits
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if w is not None and np.ndim(w) == 3:
+        return _fit_logit_grouped(X, y, np.asarray(w, dtype=float), max_iter=max_iter, tol=tol)
+    shared = X.ndim == 2
+
+    if w is None:
+        B = 1 if shared else X.shape[0]
+        n = X.shape[-2]
+        w = np.ones((B, n))
+    w = np.asarray(w, dtype=float)
+    B, p = w.shape[0], X.shape[-1]
+
+    beta = np.zeros((B, p))
+    converged = np.zeros(B, dtype=bool)
+    active = np.ones(B, dtype=bool)
+
+    eye = np.eye(p) * 1e-10
+    for _ in range(max_iter):
+        if shared:
+            eta = beta[active] @ X.T
+        else:
+            eta = np.einsum("bnp,bp->bn", X[active], beta[active])
+        mu = 1.0 / (1.0 + np.exp(-eta))
+        wa = w[active]
+        s = wa * mu * (1.0 - mu)
+        r = wa * ((y if y.ndim == 1 else y[active]) - mu)
+
+        if shared:
+            H = np.einsum("np,bn,nq->bpq", X, s, X)
+            g = r @ X
+        else:
+            Xa = X[active]
+            H = np.einsum("bnp,bn,bnq->bpq", Xa, s, Xa)
+            g = np.einsum("bnp,bn->bp", Xa, r)
+
+        try:
+            step = np.linalg.solve(H + eye, g[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            step = np.einsum("bpq,bq->bp", np.linalg.pinv(H), g)
+
+        idx = np.flatnonzero(active)
+        beta[idx] += step
+        done = np.max(np.abs(step), axis=1) < tol
+        converged[idx[done]] = True
+        active[idx[done]] = False
+        if not active.any():
+            break
+
+    bad = ~np.isfinite(beta).all(axis=1)
+    converged &= ~bad
+    return beta, converged
+
+
+def _fit_logit_grouped(
+    X: np.ndarray,
+    y: np.ndarray,
+    w: np.ndarray,
+    *,
+    max_iter: int,
+    tol: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    # G designs (G, n, p), R weight vectors each (G, R, n). Every product
+    # goes through the group's own design: eta = beta @ X.T, gradient
+    # r @ X and Hessian s @ (row outer products of X), so working arrays
+    # scale with G * R * n, never G * R * n * p.
+    G, n, p = X.shape
+    R = w.shape[1]
+    Xt = X.transpose(0, 2, 1)
+    XX = (X[:, :, :, None] * X[:, :, None, :]).reshape(G, n, p * p)
+    yy = y[:, None, :] if y.ndim == 2 else y
+
+    beta = np.zeros((G, R, p))
+    converged = np.zeros((G, R), dtype=bool)
+    active = np.ones((G, R), dtype=bool)
+
+    eye = np.eye(p) * 1e-10
+    for _ in range(max_iter):
+        eta = beta @ Xt
+        mu = 1.0 / (1.0 + np.exp(-eta))
+        s = w * mu * (1.0 - mu)
+        r = w * (yy - mu)
+
+        H = (s @ XX).reshape(G, R, p, p)
+        g = r @ X
+        try:
+            step = np.linalg.solve(H + eye, g[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            step = np.einsum("grpq,grq->grp", np.linalg.pinv(H), g)
+
+        # converged problems keep their estimate
+        step[~active] = 0.0
+        beta += step
+        done = active & (np.max(np.abs(step), axis=-1) < tol)
+        converged |= done
+        active &= ~done
+        if not active.any():
+            break
+
+    bad = ~np.isfinite(beta).all(axis=-1)
+    converged &= ~bad
+    return beta, converged
+
+
+def bootstrap_interaction_logit(
+    df: pd.DataFrame,
+    *,
+    n_boot: int = 500,
+    group_col: Optional[str] = None,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Bootstrap the interaction logit for every group in one batched solve.
+
+    Each group's rows are resampled with replacement (as multinomial count
+    weights) n_boot times; replicate 0 is the original sample. All groups
+    are padded to the longest group: one (groups, n_max, 4) design with
+    (groups, n_boot + 1, n_max) weights, so the design is never repeated
+    per replicate.
+
+    Returns a long frame with columns: [group_col], replicate, converged,
+    const, dti, regime, dti_x_regime.
+    """
+    d = df.dropna(subset=["dti", "regime", "y"])
+    rng = np.random.default_rng(seed)
+
+    if group_col is None:
+        groups = [(None, d)]
+    else:
+        groups = list(d.groupby(group_col, observed=True, sort=True))
+
+    n_max = max(len(g) for _, g in groups)
+    G, R = len(groups), n_boot + 1
+
+    X = np.zeros((G, n_max, len(TERMS)))
+    y = np.zeros((G, n_max))
+    w = np.zeros((G, R, n_max))
+    for i, (_, g) in enumerate(groups):
+        m = len(g)
+        X[i, :m] = interaction_design(g)
+        y[i, :m] = g["y"].to_numpy(dtype=float)
+        w[i, 0, :m] = 1.0
+        w[i, 1:, :m] = rng.multinomial(m, np.full(m, 1.0 / m), size=n_boot)
+
+    params, converged = fit_logit_batched(X, y, w)
+
+    out = pd.DataFrame(params.reshape(G * R, len(TERMS)), columns=TERMS)
+    out.insert(0, "converged", converged.reshape(G * R))
+    out.insert(0, "replicate", np.tile(np.arange(R), G))
+    if group_col is not None:
+        out.insert(0, group_col, np.repeat([k for k, _ in groups], R))
+    return out
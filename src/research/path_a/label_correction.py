@@ -1,8 +1,100 @@
 from __future__ import annotations
 
+from typing import Optional, Sequence
+
+import numpy as np
 import pandas as pd
 
 
+def forward_min(
+    prices: np.ndarray,
+    seg_end: np.ndarray,
+    horizon_max_q: int,
+) -> np.ndarray:
+    """
+    Forward running minimum for every horizon 1..horizon_max_q.
+
+    prices  : (n,) prices, each group contiguous and time-ordered
+    seg_end : (n,) exclusive end index of the row's group
+
+    Returns an (horizon_max_q, n) array whose row h-1 holds
+    min(prices[t+1 : t+h+1]), or NaN where that window runs past the end
+    of the group. NaN prices inside a window propagate, like ndarray.min().
+    The sweep is O(n * horizon_max_q) vectorized work with no Python loop
+    over t.
+    """
+    if horizon_max_q < 1:
+        raise ValueError(f"horizon_max_q must be >= 1, got {horizon_max_q}")
+    n = len(prices)
+    idx = np.arange(n)
+    out = np.full((horizon_max_q, n), np.nan)
+
+    running = np.full(n, np.inf)
+    for h in range(1, horizon_max_q + 1):
+        j = idx + h
+        inside = j < seg_end
+        nxt = np.where(inside, prices[np.minimum(j, n - 1)], np.inf) if n else running
+        running = np.minimum(running, nxt)
+        out[h - 1] = np.where(inside, running, np.nan)
+    return out
+
+
+def correction_labels(
+    df: pd.DataFrame,
+    *,
+    price_col: str = "real_price_index",
+    horizons: Sequence[int] = (20,),
+    thresholds: Sequence[float] = (0.90,),
+    group_col: Optional[str] = "region",
+    date_col: str = "date",
+) -> pd.DataFrame:
+    """
+    Label forward corrections for every group, horizon and threshold at once.
+
+    y = 1 if min(price[t+1 .. t+h]) / price[t] < threshold, else 0; NA where
+    the forward window is incomplete within the group.
+
+    Returns a frame on df's index with one nullable Int8 column per
+    (horizon, threshold), named y_h{h}_t{threshold:g}. Only key columns are
+    carried over; join back onto df if the full frame is needed. Horizons
+    must be >= 1.
+    """
+    horizons = list(horizons)
+    bad = [h for h in horizons if h < 1]
+    if not horizons or bad:
+        raise ValueError(f"horizons must be >= 1, got {horizons}")
+
+    if group_col is None:
+        keys = [date_col]
+        codes = np.zeros(len(df), dtype=np.int64)
+    else:
+        keys = [group_col, date_col]
+        codes, _ = pd.factorize(df[group_col])
+
+    order = np.lexsort((df[date_col].to_numpy(), codes))
+    sorted_codes = codes[order]
+    n = len(order)
+    starts = np.r_[0, np.flatnonzero(np.diff(sorted_codes)) + 1] if n else np.array([], dtype=np.int64)
+    ends = np.r_[starts[1:], n]
+    seg_end = np.repeat(ends, np.diff(np.r_[starts, n]))
+
+    prices = df[price_col].to_numpy(dtype=float)[order]
+    fmin = forward_min(prices, seg_end, max(horizons))
+
+    out = df[keys].copy()
+    for h in horizons:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ratio = fmin[h - 1] / prices
+        complete = (np.arange(n) + h < seg_end) & (sorted_codes >= 0)
+        for thr in thresholds:
+            y = np.where(ratio < thr, 1, 0).astype(float)
+            y[~complete] = np.nan
+            col = np.empty(n)
+            col[order] = y
+            out[f"y_h{h}_t{thr:g}"] = pd.array(col, dtype="Float64").astype("Int8")
+    return out
+
+
 def add_correction_label(
     df: pd.DataFrame,
     *,
@@ -11,15 +103,14 @@ def add_correction_label(
     threshold: float = 0.90,
 ) -> pd.DataFrame:
     df = df.sort_values("date").reset_index(drop=True).copy()
-    prices = df[price_col].to_numpy()
-    y = []
 
-    for t in range(len(prices)):
-        if t + horizon_max_q >= len(prices):
-            y.append(None)
-            continue
-        future_min = prices[t + 1 : t + horizon_max_q + 1].min()
-        y.append(1 if future_min / prices[t] < threshold else 0)
+    labels = correction_labels(
+        df,
+        price_col=price_col,
+        horizons=[horizon_max_q],
+        thresholds=[threshold],
+        group_col=None,
+    )
 
-    df["y"] = y
+    df["y"] = labels.iloc[:, -1]
     return df.dropna(subset=["y"]).assign(y=lambda x: x["y"].astype(int))
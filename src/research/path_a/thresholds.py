@@ -1,20 +1,86 @@
 from __future__ import annotations
 
+from typing import Optional
+
 import numpy as np
 import pandas as pd
 
 
+def dti_thresholds_array(
+    params: np.ndarray,
+    probs=(0.10, 0.20),
+    regimes=(0, 1),
+) -> np.ndarray:
+    """
+    Invert the interaction logit for DTI over many coefficient vectors.
+
+    params : (B, 4) rows of [const, dti, regime, dti_x_regime]
+
+    Returns a (B, len(regimes), len(probs)) array of dti* such that
+    P(y=1 | dti*, regime) = prob.
+    """
+    params = np.atleast_2d(np.asarray(params, dtype=float))
+    b0, b1, b2, b3 = (params[:, i, None, None] for i in range(4))
+    r = np.asarray(regimes, dtype=float)[None, :, None]
+    p = np.asarray(probs, dtype=float)[None, None, :]
+
+    logit = np.log(p / (1 - p))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (logit - b0 - b2 * r) / (b1 + b3 * r)
+
+
 def compute_dti_thresholds(params: pd.Series, probs=(0.10, 0.20)):
-    b0 = params["const"]
-    b1 = params["dti"]
-    b2 = params["regime"]
-    b3 = params["dti_x_regime"]
+    b = params[["const", "dti", "regime", "dti_x_regime"]].to_numpy(dtype=float)
+    dti_star = dti_thresholds_array(b, probs=probs)[0]
+
+    regimes = [0, 1]
+    return pd.DataFrame({
+        "regime": np.repeat(regimes, len(probs)),
+        "prob": np.tile(probs, len(regimes)),
+        "dti_threshold": dti_star.ravel(),
+    })
+
+
+def threshold_distribution(
+    boot: pd.DataFrame,
+    *,
+    probs=(0.10, 0.20),
+    quantiles=(0.05, 0.50, 0.95),
+    group_col: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Summarize bootstrap DTI thresholds from bootstrap_interaction_logit.
+
+    Replicate 0 (the original fit) gives the point estimate; replicates
+    1.. give the quantiles. Non-converged replicates are dropped.
+    Returns one row per ([group], regime, prob).
+    """
+    regimes = (0, 1)
+    keys = [group_col] if group_col is not None else []
+    boot = boot[boot["converged"]]
 
     rows = []
-    for r in [0, 1]:
-        for p in probs:
-            logit = np.log(p / (1 - p))
-            dti_star = (logit - b0 - b2 * r) / (b1 + b3 * r)
-            rows.append({"regime": r, "prob": p, "dti_threshold": dti_star})
+    for key, g in (boot.groupby(group_col, sort=True) if keys else [(None, boot)]):
+        stars = dti_thresholds_array(
+            g[["const", "dti", "regime", "dti_x_regime"]].to_numpy(),
+            probs=probs,
+            regimes=regimes,
+        )
+        is_point = (g["replicate"] == 0).to_numpy()
+        reps = stars[~is_point]
+        qs = np.nanquantile(reps, quantiles, axis=0) if len(reps) else None
+
+        for i, r in enumerate(regimes):
+            for j, p in enumerate(probs):
+                row = {group_col: key} if keys else {}
+                row.update({
+                    "regime": r,
+                    "prob": p,
+                    "dti_threshold": stars[is_point, i, j][0] if is_point.any() else np.nan,
+                    "n_boot": int(np.isfinite(reps[:, i, j]).sum()),
+                })
+                for k, q in enumerate(quantiles):
+                    row[f"q{q:g}"] = qs[k, i, j] if qs is not None else np.nan
+                rows.append(row)
 
     return pd.DataFrame(rows)
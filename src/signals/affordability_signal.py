@@ -1,26 +1,27 @@
+from __future__ import annotations
+
 import pandas as pd
 import numpy as np
 
+from src.signals.normalization import zscore_grid, zscore_panel
+from src.utils.panel_utils import Panel
 
-def build_affordability_signal(
-    df: pd.DataFrame,
-    weights: dict | None = None
-) -> pd.DataFrame:
-    """
-    Build cross-sectional affordability signal.
 
-    Higher score_xs = more affordable (expected higher future return)
+Z_COLS = {
+    "dti": "dti_z",
+    "pti": "pti_z",
+    "rent_burden": "rent_burden_z",
+    "supply_pressure": "supply_pressure_z",
+    "migration_pressure": "migration_pressure_z",
+}
 
-    Required columns:
-        dti
-        pti
-        rent_burden
-        supply_pressure
-        migration_pressure
-    """
-
-import pandas as pd
-import numpy as np
+DEFAULT_WEIGHTS = {
+    "dti_z": -0.30,
+    "pti_z": -0.25,
+    "rent_burden_z": -0.20,
+    "supply_pressure_z": +0.15,
+    "migration_pressure_z": -0.10,
+}
 
 
 def ts_zscore(s: pd.Series) -> pd.Series:
@@ -30,36 +31,96 @@ def ts_zscore(s: pd.Series) -> pd.Series:
     return (s - s.mean()) / std
 
 
+def composite_score(Z: np.ndarray, w: np.ndarray) -> np.ndarray:
+    """
+    Weighted sum of factor columns: Z (n, K) against w (K,).
+
+    Accumulates column by column in weight order, matching the original
+    `score_xs += w * z` loop exactly (a BLAS dot may reorder the sum).
+    """
+    score = np.zeros(Z.shape[0])
+    for k in range(Z.shape[1]):
+        score += w[k] * Z[:, k]
+    return score
+
+
 def build_affordability_signal(
-    df: pd.DataFrame,
-    weights: dict | None = None
+    df: pd.DataFrame | Panel,
+    weights: dict | None = None,
+    *,
+    copy: bool = True,
+    zscore_mode: str = "full",
+    window: int | None = None,
 ) -> pd.DataFrame:
     """
     Build time-series affordability signal (Phase 1).
+
+    Higher score_xs = more affordable (expected higher future return)
+
+    Required columns:
+        region
+        dti
+        pti
+        rent_burden
+        supply_pressure
+        migration_pressure
+
+    All five z-scores are computed per region in one grouped pass. With
+    copy=False the new columns are written into df itself instead of a copy.
+
+    zscore_mode="full" (default) uses full-sample moments like ts_zscore;
+    "expanding" / "rolling" (with window, in quarters) are point-in-time
+    and order rows by date within each region.
+
+    A Panel is updated in place (z-score and score_xs fields are added to
+    it) and returned; `copy` is ignored.
     """
 
-    out = df.copy()
+    if isinstance(df, Panel):
+        return _build_signal_panel(df, weights, zscore_mode, window)
 
-    assert "region" in out.columns, "region column missing before signal construction"
+    assert "region" in df.columns, "region column missing before signal construction"
 
-    out["dti_z"] = out.groupby("region")["dti"].transform(ts_zscore)
-    out["pti_z"] = out.groupby("region")["pti"].transform(ts_zscore)
-    out["rent_burden_z"] = out.groupby("region")["rent_burden"].transform(ts_zscore)
-    out["supply_pressure_z"] = out.groupby("region")["supply_pressure"].transform(ts_zscore)
-    out["migration_pressure_z"] = out.groupby("region")["migration_pressure"].transform(ts_zscore)
+    out = df.copy() if copy else df
+
+    Z = zscore_panel(
+        out,
+        list(Z_COLS),
+        group_col="region",
+        time_col="date" if zscore_mode != "full" else None,
+        mode=zscore_mode,
+        window=window,
+    )
+    for k, col in enumerate(Z_COLS.values()):
+        out[col] = Z[:, k]
 
     if weights is None:
-        weights = {
-            "dti_z": -0.30,
-            "pti_z": -0.25,
-            "rent_burden_z": -0.20,
-            "supply_pressure_z": +0.15,
-            "migration_pressure_z": -0.10,
-        }
-
-    out["score_xs"] = 0.0
-    for k, w in weights.items():
-        out["score_xs"] += w * out[k]
+        weights = DEFAULT_WEIGHTS
+
+    keys = list(weights)
+    W = out[keys].to_numpy(dtype=float)
+    out["score_xs"] = composite_score(W, np.array([weights[k] for k in keys], dtype=float))
 
     return out
 
+
+def _build_signal_panel(panel: Panel, weights, zscore_mode, window) -> Panel:
+    missing = set(Z_COLS) - set(panel.fields)
+    if missing:
+        raise KeyError(f"Missing required columns: {missing}")
+
+    # room for the z fields and score_xs up front: at most one reallocation
+    panel.reserve(len(Z_COLS) + 1)
+    Z = zscore_grid(panel.fields_view(list(Z_COLS)), mode=zscore_mode, window=window)
+    for k, col in enumerate(Z_COLS.values()):
+        panel.add_field(col, Z[:, :, k])
+
+    if weights is None:
+        weights = DEFAULT_WEIGHTS
+
+    keys = list(weights)
+    T, R, _ = panel.shape
+    W = np.stack([panel.field(k).reshape(-1) for k in keys], axis=1).astype(float)
+    score = composite_score(W, np.array([weights[k] for k in keys], dtype=float))
+    panel.add_field("score_xs", score.reshape(T, R))
+    return panel
@@ -0,0 +1,102 @@
+# src/signals/composite_signal.py
+
+from __future__ import annotations
+
+import importlib
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.core.composite_score import score_weight_sets
+from src.core.factor_builder import FactorBuilder
+from src.signals.affordability_signal import DEFAULT_WEIGHTS
+
+
+# modules whose import registers their factor kernels
+SIGNAL_MODULES = (
+    "src.signals.dti_signal",
+    "src.signals.supply_signal",
+    "src.signals.migration_signal",
+    "src.signals.policy_signal",
+    "src.signals.sentiment_signal",
+    "src.signals.election_signal",
+)
+
+# Named weight sets (single source of truth for composite scores).
+WEIGHT_SETS = {
+    # Phase 1 time-series affordability signal
+    "affordability": DEFAULT_WEIGHTS,
+    # final cross-sectional score of src/pipeline.py
+    "xs": {
+        "dti_z": 0.4,
+        "pti_z": 0.3,
+        "supply_pressure_z": 0.2,
+        "rent_burden_z": 0.1,
+    },
+}
+
+
+def load_signal_modules() -> None:
+    for m in SIGNAL_MODULES:
+        importlib.import_module(m)
+
+
+def _weights(weights) -> dict:
+    if isinstance(weights, str):
+        if weights not in WEIGHT_SETS:
+            raise ValueError(f"Unknown weight set: {weights}")
+        return WEIGHT_SETS[weights]
+    return weights
+
+
+def build_composite_signal(
+    df: pd.DataFrame,
+    weights: str | dict = "xs",
+    *,
+    col: str = "score_xs",
+    factors: Sequence[str] = (),
+    builder: Optional[FactorBuilder] = None,
+    copy: bool = True,
+    dtype=np.float64,
+) -> pd.DataFrame:
+    """
+    Composite score from registered factors.
+
+    weights is a WEIGHT_SETS name or a {factor: weight} dict. `factors`
+    are also attached as columns (e.g. the z-scores a report shows next to
+    the score). Pass a builder to reuse its factor cache across calls.
+
+    Scores are computed in dtype (float64 by default, so signal columns
+    keep the frame's precision); a passed builder's own dtype wins.
+    """
+    return build_composite_signals(
+        df, {col: _weights(weights)}, factors=factors, builder=builder, copy=copy, dtype=dtype,
+    )
+
+
+def build_composite_signals(
+    df: pd.DataFrame,
+    weight_sets: dict[str, str | dict],
+    *,
+    factors: Sequence[str] = (),
+    builder: Optional[FactorBuilder] = None,
+    copy: bool = True,
+    dtype=np.float64,
+) -> pd.DataFrame:
+    """
+    One column per named weight set ({column: WEIGHT_SETS name or weights}),
+    all scored in one matrix multiply over a shared factor matrix (in
+    dtype, as build_composite_signal).
+    """
+    load_signal_modules()
+    if builder is None:
+        builder = FactorBuilder(df, dtype=dtype)
+    out = df.copy() if copy else df
+
+    scores = score_weight_sets(builder, {c: _weights(w) for c, w in weight_sets.items()})
+    for c in factors:
+        out[c] = builder.values(c)
+    for c in scores.columns:
+        out[c] = scores[c].to_numpy()
+    return out
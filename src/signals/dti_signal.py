@@ -0,0 +1,28 @@
+# src/signals/dti_signal.py
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from src.core.factor_builder import grouped_zscore, register_factor
+
+
+# Household burden ratios, z-scored within region (same rules as the
+# affordability signal's z columns).
+ZSCORE_PARAMS = {"mode": "full", "window": None}
+
+
+@register_factor("dti_z", inputs=("region", "date", "dti"), params=ZSCORE_PARAMS)
+def dti_z(df: pd.DataFrame, *, mode: str, window) -> np.ndarray:
+    return grouped_zscore(df, df["dti"].to_numpy(dtype=float), mode=mode, window=window)
+
+
+@register_factor("pti_z", inputs=("region", "date", "pti"), params=ZSCORE_PARAMS)
+def pti_z(df: pd.DataFrame, *, mode: str, window) -> np.ndarray:
+    return grouped_zscore(df, df["pti"].to_numpy(dtype=float), mode=mode, window=window)
+
+
+@register_factor("rent_burden_z", inputs=("region", "date", "rent_burden"), params=ZSCORE_PARAMS)
+def rent_burden_z(df: pd.DataFrame, *, mode: str, window) -> np.ndarray:
+    return grouped_zscore(df, df["rent_burden"].to_numpy(dtype=float), mode=mode, window=window)
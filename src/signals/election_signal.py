@@ -0,0 +1,24 @@
+# src/signals/election_signal.py
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from src.core.factor_builder import register_factor
+
+
+@register_factor("election_year", inputs=("date",))
+def election_year(df: pd.DataFrame) -> np.ndarray:
+    # 1.0 in US presidential election years
+    year = pd.DatetimeIndex(df["date"]).year.to_numpy()
+    return (year % 4 == 0).astype(float)
+
+
+@register_factor("election_cycle", inputs=("date",))
+def election_cycle(df: pd.DataFrame) -> np.ndarray:
+    # position in the 4-year cycle: 0 in the quarter after an election,
+    # 1 in the election quarter (Q4 of an election year)
+    d = pd.DatetimeIndex(df["date"])
+    q = ((d.year.to_numpy() - 1) % 4) * 4 + (d.quarter.to_numpy() - 1)
+    return q / 15.0
@@ -0,0 +1,14 @@
+# src/signals/migration_signal.py
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from src.core.factor_builder import grouped_zscore, register_factor
+from src.signals.dti_signal import ZSCORE_PARAMS
+
+
+@register_factor("migration_pressure_z", inputs=("region", "date", "migration_pressure"), params=ZSCORE_PARAMS)
+def migration_pressure_z(df: pd.DataFrame, *, mode: str, window) -> np.ndarray:
+    return grouped_zscore(df, df["migration_pressure"].to_numpy(dtype=float), mode=mode, window=window)
@@ -0,0 +1,327 @@
+# src/signals/normalization.py
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+MODES = ("full", "expanding", "rolling")
+
+
+def _segments(df: pd.DataFrame, group_col: Optional[str], time_col: Optional[str]):
+    """
+    Row order that makes every group a contiguous, time-ordered segment.
+
+    Returns (order, sorted_codes, starts). Rows with a missing group key get
+    code -1 and sort first.
+    """
+    n = len(df)
+    if group_col is None:
+        codes = np.zeros(n, dtype=np.int64)
+    else:
+        codes, _ = pd.factorize(df[group_col])
+
+    if time_col is None:
+        order = np.argsort(codes, kind="stable")
+    else:
+        order = np.lexsort((df[time_col].to_numpy(), codes))
+
+    sorted_codes = codes[order]
+    starts = np.r_[0, np.flatnonzero(np.diff(sorted_codes)) + 1] if n else np.array([], dtype=np.int64)
+    return order, sorted_codes, starts
+
+
+def _full_zscore(V: np.ndarray, sorted_codes: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    # Each segment is reduced as a contiguous slice, the same way Series.mean /
+    # Series.std(ddof=0) reduce, so results match ts_zscore bit-for-bit.
+    Z = np.full_like(V, np.nan)
+    ends = np.r_[starts[1:], V.shape[1]]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for a, b in zip(starts, ends):
+            if sorted_codes[a] < 0:
+                continue
+            seg = V[:, a:b]
+            valid = ~np.isnan(seg)
+            cnt = valid.sum(axis=1)
+            filled = np.where(valid, seg, 0.0)
+            mean = filled.sum(axis=1) / cnt
+            sqr = np.where(valid, (mean[:, None] - seg) ** 2, 0.0)
+            std = np.sqrt(sqr.sum(axis=1) / cnt)
+
+            flat = (std == 0) | np.isnan(std)
+            Z[:, a:b] = np.where(
+                flat[:, None],
+                seg * 0.0,
+                (seg - mean[:, None]) / std[:, None],
+            )
+    return Z
+
+
+def _window_zscore(
+    V: np.ndarray,
+    sorted_codes: np.ndarray,
+    starts: np.ndarray,
+    window: Optional[int],
+    min_periods: int,
+    ddof: int,
+) -> np.ndarray:
+    # Expanding / rolling moments from grouped cumulative sums. Values are
+    # shifted by each group's first valid observation before accumulating,
+    # which keeps the sum-of-squares well conditioned and uses no future data.
+    K, n = V.shape
+    seg_id = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, n]))
+    g0 = starts[seg_id]
+
+    idx = np.arange(n)
+    lo = g0 if window is None else np.maximum(g0, idx - window + 1)
+
+    valid = ~np.isnan(V)
+    first_pos = np.where(valid, idx, n)
+    first_pos = np.minimum.reduceat(first_pos, starts, axis=1) if n else first_pos
+    anchor = np.take_along_axis(
+        np.where(valid, V, 0.0),
+        np.minimum(first_pos, n - 1),
+        axis=1,
+    ) if n else first_pos.astype(float)
+    C = np.where(valid, V - anchor[:, seg_id], 0.0)
+
+    def _csum(x):
+        return np.concatenate([np.zeros((K, 1)), np.cumsum(x, axis=1)], axis=1)
+
+    cs_n = _csum(valid.astype(float))
+    cs_1 = _csum(C)
+    cs_2 = _csum(C * C)
+
+    cnt = cs_n[:, idx + 1] - cs_n[:, lo]
+    s1 = cs_1[:, idx + 1] - cs_1[:, lo]
+    s2 = cs_2[:, idx + 1] - cs_2[:, lo]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = s1 / cnt
+        var = np.maximum(s2 - s1 * mean, 0.0) / (cnt - ddof)
+        std = np.sqrt(var)
+        Z = np.where(std > 0, (C - mean) / std, 0.0)
+
+    Z[~valid | (cnt < min_periods) | (cnt - ddof <= 0)] = np.nan
+    Z[:, sorted_codes < 0] = np.nan
+    return Z
+
+
+def zscore_panel(
+    df: pd.DataFrame,
+    cols: list[str],
+    *,
+    group_col: Optional[str] = "region",
+    time_col: Optional[str] = None,
+    mode: str = "full",
+    window: Optional[int] = None,
+    min_periods: Optional[int] = None,
+    ddof: int = 0,
+) -> np.ndarray:
+    """
+    Z-score several columns within each group in one vectorized pass.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Long panel.
+    cols : list[str]
+        Columns to normalize.
+    group_col : str, optional
+        Group key (None = treat the frame as one series).
+    time_col : str, optional
+        Sort key within each group. None keeps the existing row order.
+    mode : str
+        "full"      : full-sample mean/std (ddof=0), identical to ts_zscore.
+        "expanding" : point-in-time, uses rows up to and including t.
+        "rolling"   : point-in-time, uses the last `window` rows.
+    window : int, optional
+        Rolling window length (rows), required for mode="rolling".
+    min_periods : int, optional
+        Minimum non-NaN observations for a value (default: window for
+        rolling, 1 for expanding).
+    ddof : int
+        Delta degrees of freedom for expanding/rolling std.
+
+    Returns
+    -------
+    np.ndarray
+        (n_rows, len(cols)) float64 array in the original row order.
+        Zero-std windows give 0.0.
+    """
+    _check_mode(mode, window)
+
+    order, sorted_codes, starts = _segments(df, group_col, time_col)
+
+    # (K, n) so that every column segment is a contiguous slice
+    V = df[cols].to_numpy(dtype=float).T[:, order].copy()
+    Z = _zscore_segments(V, sorted_codes, starts, mode, window, min_periods, ddof)
+
+    out = np.empty_like(Z)
+    out[:, order] = Z
+    return out.T
+
+
+def zscore_grid(
+    X: np.ndarray,
+    *,
+    mode: str = "full",
+    window: Optional[int] = None,
+    min_periods: Optional[int] = None,
+    ddof: int = 0,
+) -> np.ndarray:
+    """
+    zscore_panel for dense (time x region) or (time x region x K) arrays,
+    e.g. Panel fields. Each region is normalized along the time axis;
+    NaN cells (missing quarters) are skipped, and rolling windows count
+    periods rather than rows.
+
+    Returns a float64 array of the same shape.
+    """
+    _check_mode(mode, window)
+
+    X = np.asarray(X, dtype=float)
+    squeeze = X.ndim == 2
+    if squeeze:
+        X = X[:, :, None]
+    T, R, K = X.shape
+
+    # (K, R * T): region-major, so every region is one contiguous segment
+    V = np.ascontiguousarray(X.transpose(2, 1, 0)).reshape(K, R * T)
+    starts = np.arange(R, dtype=np.int64) * T
+    Z = _zscore_segments(V, np.zeros(R * T, dtype=np.int64), starts, mode, window, min_periods, ddof)
+
+    Z = Z.reshape(K, R, T).transpose(2, 1, 0)
+    return Z[:, :, 0] if squeeze else Z
+
+
+def _check_mode(mode: str, window: Optional[int]):
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode: {mode}")
+    if mode == "rolling" and not window:
+        raise ValueError("mode='rolling' requires window")
+
+
+def _zscore_segments(V, sorted_codes, starts, mode, window, min_periods, ddof):
+    if mode == "full":
+        return _full_zscore(V, sorted_codes, starts)
+    if min_periods is None:
+        min_periods = window if mode == "rolling" else 1
+    return _window_zscore(
+        V,
+        sorted_codes,
+        starts,
+        window if mode == "rolling" else None,
+        min_periods,
+        ddof,
+    )
+
+
+class RunningZScore:
+    """
+    O(1)-per-step z-score state for S parallel series (e.g. regions).
+
+    Expanding mode keeps Welford (n, mean, M2) per series. Rolling mode also
+    keeps a ring buffer of the last `window` values and removes the value
+    that drops out of the window. update() applies one new observation per
+    series and returns its z-score, consistent with zscore_panel on the
+    full history (the current value is included in its own window).
+    NaNs are skipped and yield NaN.
+    """
+
+    def __init__(
+        self,
+        n_series: int,
+        *,
+        window: Optional[int] = None,
+        min_periods: Optional[int] = None,
+        ddof: int = 0,
+    ):
+        self.window = window
+        self.ddof = ddof
+        self.min_periods = min_periods if min_periods is not None else (window or 1)
+        self.n = np.zeros(n_series)
+        self.mean = np.zeros(n_series)
+        self.m2 = np.zeros(n_series)
+        self.steps = 0
+        self.buffer = None if window is None else np.full((window, n_series), np.nan)
+
+    def _add(self, x: np.ndarray):
+        ok = ~np.isnan(x)
+        self.n[ok] += 1
+        d = x[ok] - self.mean[ok]
+        self.mean[ok] += d / self.n[ok]
+        self.m2[ok] += d * (x[ok] - self.mean[ok])
+
+    def _remove(self, x: np.ndarray):
+        ok = ~np.isnan(x)
+        left = self.n[ok] - 1
+        d = x[ok] - self.mean[ok]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            new_mean = np.where(left > 0, self.mean[ok] - d / left, 0.0)
+        self.m2[ok] = np.where(left > 0, self.m2[ok] - d * (x[ok] - new_mean), 0.0)
+        self.mean[ok] = new_mean
+        self.n[ok] = left
+
+    def update(self, x) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        if self.buffer is not None:
+            slot = self.steps % self.window
+            if self.steps >= self.window:
+                self._remove(self.buffer[slot])
+            self.buffer[slot] = x
+        self._add(x)
+        self.steps += 1
+        return self.zscore(x)
+
+    def zscore(self, x) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = np.maximum(self.m2, 0.0) / (self.n - self.ddof)
+            std = np.sqrt(var)
+            z = np.where(std > 0, (x - self.mean) / std, 0.0)
+        z[np.isnan(x) | (self.n < self.min_periods) | (self.n - self.ddof <= 0)] = np.nan
+        return z
+
+    @classmethod
+    def from_history(cls, values: np.ndarray, **kwargs) -> "RunningZScore":
+        """
+        Build state from a (T, S) history array, oldest row first.
+        """
+        values = np.asarray(values, dtype=float)
+        state = cls(values.shape[1], **kwargs)
+        for row in values:
+            state.update(row)
+        return state
+
+    def to_dict(self) -> dict:
+        return {
+            "window": self.window,
+            "ddof": self.ddof,
+            "min_periods": self.min_periods,
+            "steps": self.steps,
+            "n": self.n.tolist(),
+            "mean": self.mean.tolist(),
+            "m2": self.m2.tolist(),
+            "buffer": None if self.buffer is None else self.buffer.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "RunningZScore":
+        state = cls(
+            len(d["n"]),
+            window=d["window"],
+            min_periods=d["min_periods"],
+            ddof=d["ddof"],
+        )
+        state.steps = d["steps"]
+        state.n = np.asarray(d["n"], dtype=float)
+        state.mean = np.asarray(d["mean"], dtype=float)
+        state.m2 = np.asarray(d["m2"], dtype=float)
+        if d["buffer"] is not None:
+            state.buffer = np.asarray(d["buffer"], dtype=float)
+        return state
@@ -0,0 +1,21 @@
+# src/signals/policy_signal.py
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from src.core.factor_builder import grouped_shift, grouped_zscore, register_factor
+from src.signals.dti_signal import ZSCORE_PARAMS
+
+
+@register_factor("real_rate_z", inputs=("region", "date", "real_rate"), params=ZSCORE_PARAMS)
+def real_rate_z(df: pd.DataFrame, *, mode: str, window) -> np.ndarray:
+    return grouped_zscore(df, df["real_rate"].to_numpy(dtype=float), mode=mode, window=window)
+
+
+@register_factor("rate_change", inputs=("region", "date", "real_rate"), params={"periods": 4})
+def rate_change(df: pd.DataFrame, *, periods: int) -> np.ndarray:
+    # tightening (+) / easing (-) over the last `periods` quarters
+    r = df["real_rate"].to_numpy(dtype=float)
+    return r - grouped_shift(df, r, periods)
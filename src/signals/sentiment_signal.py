@@ -0,0 +1,22 @@
+# src/signals/sentiment_signal.py
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from src.core.factor_builder import grouped_shift, grouped_zscore, register_factor
+from src.signals.dti_signal import ZSCORE_PARAMS
+
+
+# No survey data in the public snapshot: trailing price momentum stands in
+# for buyer sentiment.
+@register_factor("price_momentum", inputs=("region", "date", "real_price_index"), params={"periods": 4})
+def price_momentum(df: pd.DataFrame, *, periods: int) -> np.ndarray:
+    logp = np.log(df["real_price_index"].to_numpy(dtype=float))
+    return logp - grouped_shift(df, logp, periods)
+
+
+@register_factor("price_momentum_z", inputs=("region", "date"), deps=("price_momentum",), params=ZSCORE_PARAMS)
+def price_momentum_z(df: pd.DataFrame, mom: np.ndarray, *, mode: str, window) -> np.ndarray:
+    return grouped_zscore(df, mom, mode=mode, window=window)
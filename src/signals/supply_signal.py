@@ -0,0 +1,20 @@
+# src/signals/supply_signal.py
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from src.core.factor_builder import grouped_zscore, register_factor
+from src.signals.dti_signal import ZSCORE_PARAMS
+
+
+@register_factor("supply_pressure_z", inputs=("region", "date", "supply_pressure"), params=ZSCORE_PARAMS)
+def supply_pressure_z(df: pd.DataFrame, *, mode: str, window) -> np.ndarray:
+    return grouped_zscore(df, df["supply_pressure"].to_numpy(dtype=float), mode=mode, window=window)
+
+
+@register_factor("dti_x_supply", deps=("dti_z", "supply_pressure_z"))
+def dti_x_supply(df: pd.DataFrame, dti: np.ndarray, supply: np.ndarray) -> np.ndarray:
+    # affordability stress x supply pressure: the Phase 3 interaction term
+    return dti * supply
@@ -0,0 +1,276 @@
+# src/utils/logging.py
+
+from __future__ import annotations
+
+import cProfile
+import functools
+import json
+import os
+import platform
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+LOG_ROOT = Path("outputs")
+
+# opt-in cProfile dump of the slowest stage without touching code
+PROFILE_ENV = "LEVIATHAN_PROFILE"
+
+
+def shape_of(obj: Any) -> Optional[dict]:
+    """
+    Row / column counts for DataFrames, Series, arrays and Panels
+    (rows = time x region cells, cols = fields). None for anything else.
+    """
+    if obj is None:
+        return None
+    if hasattr(obj, "fields") and hasattr(obj, "observed"):  # Panel
+        T, R, F = obj.shape
+        return {"rows": int(T * R), "cols": int(F)}
+    shape = getattr(obj, "shape", None)
+    if shape is None or not isinstance(shape, tuple):
+        return None
+    if len(shape) == 0:
+        return {"rows": 1, "cols": 1}
+    return {"rows": int(shape[0]), "cols": int(shape[1]) if len(shape) > 1 else 1}
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return peak / (1024 ** 2) if sys.platform == "darwin" else peak / 1024
+
+
+class StageRecord(dict):
+    """
+    One JSON-lines entry. Call .output(obj) (or .input(obj)) inside the
+    stage to record row / column counts; extra keys can be set directly.
+    """
+
+    def input(self, obj: Any) -> Any:
+        self["input"] = shape_of(obj)
+        return obj
+
+    def output(self, obj: Any) -> Any:
+        self["output"] = shape_of(obj)
+        return obj
+
+
+class RunLog:
+    """
+    Per-run instrumentation.
+
+    Every `with log.stage(name):` block records wall time, CPU time, peak
+    RSS and input / output shapes, and is appended as one line to
+    outputs/<phase>/logs/<run_id>.jsonl. A final "run" line summarizes the
+    whole run and names the slowest stage.
+
+    memory=True adds the tracemalloc peak / net allocation per stage.
+    tracemalloc slows allocation-heavy pandas code considerably, so it is
+    off unless asked for; memory=None (default) follows profile.
+
+    With profile=True (or LEVIATHAN_PROFILE=1) each stage runs under
+    cProfile and the stats of the slowest one are dumped next to the log
+    as <run_id>.<stage>.prof (plus a .txt top-30 by cumulative time).
+    Only the outermost profiled stage per thread gets a profiler; stages
+    nested inside it (in this or another RunLog) show up in its stats.
+    """
+
+    def __init__(
+        self,
+        phase: str,
+        *,
+        log_dir: Optional[Path] = None,
+        run_id: Optional[str] = None,
+        memory: Optional[bool] = None,
+        profile: Optional[bool] = None,
+        meta: Optional[dict] = None,
+    ):
+        self.phase = phase
+        self.log_dir = Path(log_dir) if log_dir is not None else LOG_ROOT / phase / "logs"
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        self.profile = os.environ.get(PROFILE_ENV) == "1" if profile is None else profile
+        self.memory = self.profile if memory is None else memory
+        self.meta = dict(meta or {})
+        self.records: list[dict] = []
+        self._slowest: Optional[tuple[float, str, cProfile.Profile]] = None
+        self._started_tracing = False
+        self._t0 = self._c0 = self._started = None
+        self._thread: Optional[int] = None
+
+    @property
+    def path(self) -> Path:
+        return self.log_dir / f"{self.run_id}.jsonl"
+
+    # -----------------------------
+    # run scope
+    # -----------------------------
+    def __enter__(self) -> "RunLog":
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._started = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self._t0, self._c0 = time.perf_counter(), time.process_time()
+        self._thread = threading.get_ident()
+        _ACTIVE.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _ACTIVE.remove(self)
+        status = "ok" if exc_type is None else "error"
+        slowest = max(self.records, key=lambda r: r["wall_s"], default=None)
+
+        rec = {
+            "kind": "run",
+            "phase": self.phase,
+            "run_id": self.run_id,
+            "status": status,
+            "error": None if exc is None else f"{exc_type.__name__}: {exc}",
+            "started": self._started,
+            "finished": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "wall_s": round(time.perf_counter() - self._t0, 6),
+            "cpu_s": round(time.process_time() - self._c0, 6),
+            "peak_rss_mb": _peak_rss_mb(),
+            "n_stages": len(self.records),
+            "slowest_stage": slowest["stage"] if slowest else None,
+            "python": platform.python_version(),
+            "pid": os.getpid(),
+            **self.meta,
+        }
+        if self._slowest is not None:
+            rec["profile"] = str(self._dump_profile())
+        self._write(rec)
+
+        if self._started_tracing:
+            tracemalloc.stop()
+        return False
+
+    # -----------------------------
+    # stage scope
+    # -----------------------------
+    @contextmanager
+    def stage(self, name: str, *, inputs: Any = None, **extra):
+        rec = StageRecord(kind="stage", phase=self.phase, run_id=self.run_id, stage=name, **extra)
+        if inputs is not None:
+            rec.input(inputs)
+
+        mem0 = None
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            mem0 = tracemalloc.get_traced_memory()[0]
+        # one profiler per thread: a nested one would clobber (3.11) or be
+        # refused by (3.12+) the outer stage's
+        prof = None
+        if self.profile and not getattr(_PROFILING, "on", False):
+            prof = cProfile.Profile()
+            _PROFILING.on = True
+
+        t0, c0 = time.perf_counter(), time.process_time()
+        if prof is not None:
+            prof.enable()
+        try:
+            yield rec
+            rec["status"] = "ok"
+        except BaseException as e:
+            rec["status"] = "error"
+            rec["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            if prof is not None:
+                prof.disable()
+                _PROFILING.on = False
+            rec["wall_s"] = round(time.perf_counter() - t0, 6)
+            rec["cpu_s"] = round(time.process_time() - c0, 6)
+            rec["peak_rss_mb"] = _peak_rss_mb()
+            if mem0 is not None and tracemalloc.is_tracing():
+                cur, peak = tracemalloc.get_traced_memory()
+                rec["py_alloc_mb"] = round((cur - mem0) / 1e6, 3)
+                rec["py_peak_mb"] = round((peak - mem0) / 1e6, 3)
+
+            if prof is not None and (self._slowest is None or rec["wall_s"] > self._slowest[0]):
+                self._slowest = (rec["wall_s"], name, prof)
+
+            self.records.append(dict(rec))
+            self._write(rec)
+
+    def _write(self, rec: dict):
+        with open(self.path, "a") as f:
+            f.write(json.dumps(rec, default=str) + "\n")
+
+    def _dump_profile(self) -> Path:
+        _, name, prof = self._slowest
+        safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+        out = self.log_dir / f"{self.run_id}.{safe}.prof"
+        prof.dump_stats(out)
+        with open(out.with_suffix(".txt"), "w") as f:
+            pstats.Stats(prof, stream=f).sort_stats("cumulative").print_stats(30)
+        return out
+
+
+_ACTIVE: list[RunLog] = []
+_PROFILING = threading.local()
+
+
+def current_run() -> Optional[RunLog]:
+    # a run belongs to the thread that opened it; worker threads (e.g. a
+    # study running branches concurrently) see no active run, so their
+    # stage() calls don't interleave timings / tracemalloc peaks
+    me = threading.get_ident()
+    for log in reversed(_ACTIVE):
+        if log._thread == me:
+            return log
+    return None
+
+
+@contextmanager
+def stage(name: str, *, inputs: Any = None, **extra):
+    """
+    Stage scope on the innermost active RunLog; a no-op record when no run
+    is active, so instrumented code also runs standalone.
+    """
+    log = current_run()
+    if log is None:
+        yield StageRecord(stage=name)
+        return
+    with log.stage(name, inputs=inputs, **extra) as rec:
+        yield rec
+
+
+def instrument(name: Optional[str] = None):
+    """
+    Decorator form of stage(): the first positional argument is recorded
+    as the input and the return value as the output.
+    """
+    def deco(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(label, inputs=args[0] if args else None) as rec:
+                return rec.output(func(*args, **kwargs))
+        return wrapper
+    return deco
+
+
+def read_run_log(path) -> list[dict]:
+    """
+    Parse a JSON-lines run log back into a list of records.
+    """
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -0,0 +1,214 @@
+# src/utils/panel_utils.py
+
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class Panel:
+    """
+    Dense (time x region x field) panel backed by one contiguous NumPy block.
+
+    - dates   : sorted pd.Index of periods (axis 0)
+    - regions : pd.Index of region labels, stored once; rows refer to them
+                by integer code (axis 1)
+    - fields  : field names (axis 2), float32 by default
+    - categories : labels for coded fields (e.g. regime), which are stored
+                   as float codes with NaN for missing
+    - observed   : (T, R) bool mask of cells that exist in the source data
+
+    field(name) returns a (T, R) view into the block, never a copy, so
+    stages can read and write fields in place. add_field() writes into
+    spare capacity when there is some and grows the block geometrically
+    otherwise, so appending a handful of derived fields does not copy the
+    whole panel each time.
+
+    Growing replaces the block: views from field() / fields_view() taken
+    before an add_field() that grows it keep pointing at the old block and
+    no longer see later writes. Re-fetch views after adding fields, or
+    call reserve(n) first so the next n additions happen in place.
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        dates: Iterable,
+        regions: Iterable,
+        fields: Iterable[str],
+        *,
+        capacity: Optional[int] = None,
+    ):
+        values = np.asarray(values)
+        T, R, F = values.shape
+        capacity = max(capacity or F, F)
+        self._block = np.full((T, R, capacity), np.nan, dtype=values.dtype)
+        self._block[:, :, :F] = values
+        self.dates = pd.Index(dates)
+        self.regions = pd.Index(regions)
+        self.fields: list[str] = list(fields)
+        self._pos = {f: i for i, f in enumerate(self.fields)}
+        self.categories: dict[str, pd.Index] = {}
+        self.observed = ~np.isnan(values).all(axis=2) if F else np.ones((T, R), dtype=bool)
+
+    # -----------------------------
+    # construction / conversion
+    # -----------------------------
+    @classmethod
+    def from_long(
+        cls,
+        df: pd.DataFrame,
+        fields: Optional[list[str]] = None,
+        *,
+        time_col: str = "date",
+        region_col: str = "region",
+        dtype=np.float32,
+        spare: int = 8,
+    ) -> "Panel":
+        """
+        Build from a long (date, region, ...) frame. Only `fields` (default:
+        every numeric column) are read; `spare` extra field slots are
+        pre-allocated for derived fields. Non-numeric fields are stored as
+        codes with their labels kept in `categories`.
+        """
+        if fields is None:
+            fields = [
+                c for c in df.select_dtypes(include="number").columns
+                if c not in (time_col, region_col)
+            ]
+        t_idx, dates = pd.factorize(df[time_col], sort=True)
+        r_idx, regions = pd.factorize(df[region_col], sort=True)
+        if (t_idx < 0).any() or (r_idx < 0).any():
+            raise ValueError(f"missing '{time_col}' or '{region_col}' values")
+
+        T, R, F = len(dates), len(regions), len(fields)
+        if len(np.unique(t_idx * R + r_idx)) != len(df):
+            raise ValueError(f"duplicate ({time_col}, {region_col}) rows")
+
+        panel = cls(np.empty((T, R, 0), dtype=dtype), dates, regions, [], capacity=F + spare)
+        for f in fields:
+            col = np.full((T, R), np.nan, dtype=dtype)
+            categories = None
+            if pd.api.types.is_numeric_dtype(df[f]):
+                col[t_idx, r_idx] = df[f].to_numpy(dtype=float)
+            else:
+                codes, categories = pd.factorize(df[f], sort=True)
+                col[t_idx, r_idx] = np.where(codes < 0, np.nan, codes)
+            panel.add_field(f, col, categories=categories)
+        panel.observed = np.zeros((T, R), dtype=bool)
+        panel.observed[t_idx, r_idx] = True
+        panel.dates.name = time_col
+        panel.regions.name = region_col
+        return panel
+
+    def to_long(
+        self,
+        fields: Optional[list[str]] = None,
+        *,
+        dropna: bool = True,
+    ) -> pd.DataFrame:
+        """
+        Long frame with date, categorical region and the requested fields.
+        dropna keeps only observed (date, region) cells.
+        """
+        fields = self.fields if fields is None else list(fields)
+        T, R = self.shape[:2]
+        vals = np.stack([self.field(f).reshape(-1) for f in fields], axis=1) if fields else np.empty((T * R, 0))
+        keep = self.observed.reshape(-1) if dropna else np.ones(T * R, dtype=bool)
+
+        t = np.repeat(np.arange(T), R)[keep]
+        r = np.tile(np.arange(R), T)[keep]
+        out = pd.DataFrame({
+            self.dates.name or "date": self.dates[t],
+            self.regions.name or "region": pd.Categorical.from_codes(r, categories=self.regions),
+        })
+        for k, f in enumerate(fields):
+            v = vals[keep, k]
+            if f in self.categories:
+                codes = np.where(np.isnan(v), -1, v).astype(np.int64)
+                out[f] = pd.Categorical.from_codes(codes, categories=self.categories[f])
+            else:
+                out[f] = v
+        return out
+
+    # -----------------------------
+    # field access
+    # -----------------------------
+    @property
+    def values(self) -> np.ndarray:
+        return self._block[:, :, :len(self.fields)]
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        return self.values.shape
+
+    @property
+    def dtype(self):
+        return self._block.dtype
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._pos
+
+    def field(self, name: str) -> np.ndarray:
+        if name not in self._pos:
+            raise KeyError(f"'{name}' not found in Panel")
+        return self._block[:, :, self._pos[name]]
+
+    def fields_view(self, names: list[str]) -> np.ndarray:
+        """
+        (T, R, k) array of several fields; a view when they are adjacent.
+        """
+        pos = [self._pos[n] for n in names]
+        if pos == list(range(pos[0], pos[0] + len(pos))):
+            return self._block[:, :, pos[0]:pos[0] + len(pos)]
+        return self._block[:, :, pos]
+
+    def _grow(self, capacity: int) -> None:
+        F = len(self.fields)
+        grown = np.full(self._block.shape[:2] + (capacity,), np.nan, dtype=self._block.dtype)
+        grown[:, :, :F] = self._block[:, :, :F]
+        self._block = grown
+
+    def reserve(self, n: int) -> "Panel":
+        """
+        Make room for n more fields now (growing the block at most once),
+        so views taken afterwards stay valid while they are added.
+        """
+        need = len(self.fields) + n
+        if need > self._block.shape[2]:
+            self._grow(max(need, 2 * len(self.fields)))
+        return self
+
+    def add_field(self, name: str, values, *, categories=None) -> np.ndarray:
+        """
+        Set (or overwrite) a field in place and return its view.
+        With categories, values are codes into that list of labels.
+
+        Adding a new field beyond the spare capacity reallocates the block,
+        which invalidates every view taken earlier (see the class notes).
+        """
+        if categories is not None:
+            self.categories[name] = pd.Index(categories)
+        else:
+            self.categories.pop(name, None)
+
+        if name in self._pos:
+            view = self.field(name)
+            view[...] = values
+            return view
+
+        F = len(self.fields)
+        if F == self._block.shape[2]:
+            self._grow(max(2 * F, F + 4))
+
+        self._pos[name] = F
+        self.fields.append(name)
+        view = self._block[:, :, F]
+        view[...] = values
+        return view
+
+    def __repr__(self) -> str:
+        T, R, F = self.shape
+        return f"Panel(T={T}, R={R}, fields={self.fields}, dtype={self.dtype})"
@@ -0,0 +1,15 @@
+# tests/conftest.py
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _tmp_caches(tmp_path_factory, monkeypatch):
+    # panel / stage caches default to data/cache/ under the project root;
+    # keep every test's entries out of it
+    from src.core import stage_cache
+    from src.loaders import housing_loader
+
+    root = tmp_path_factory.mktemp("cache")
+    monkeypatch.setattr(housing_loader, "CACHE_DIR", root / "panels")
+    monkeypatch.setattr(stage_cache, "CACHE_DIR", root / "stages")
@@ -0,0 +1,88 @@
+# tests/test_backtest.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.evaluation.backtest import block_rows, compute_forward_return, forward_return_block
+
+
+def _series(n=8, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "date": pd.date_range("2020-03-31", periods=n, freq="QE"),
+        "price": 100.0 * np.exp(np.cumsum(rng.normal(0.01, 0.02, n))),
+    })
+
+
+def _panel(n=12, regions=("a", "b", "c"), seed=0):
+    return pd.concat(
+        [_series(n, seed + i).assign(region=r) for i, r in enumerate(regions)],
+        ignore_index=True,
+    )
+
+
+def _grouped_shift(df, h):
+    fut = df.groupby("region", sort=False)["price"].shift(-h)
+    return (fut / df["price"] - 1.0).to_numpy()
+
+
+def test_matches_grouped_shift_on_balanced_panel():
+    df = _panel()
+    blk = forward_return_block(df, [1, 4], dtype=np.float64)
+    for i, h in enumerate((1, 4)):
+        np.testing.assert_allclose(block_rows(blk, "simple", i), _grouped_shift(df, h), rtol=1e-12)
+
+
+def test_nat_dates_are_left_off_the_grid():
+    df = _series()
+    bad = pd.concat([df, pd.DataFrame({"date": [pd.NaT], "price": [1.0]})], ignore_index=True)
+
+    clean = block_rows(forward_return_block(df, [1], group_col=None, dtype=np.float64), "simple")
+    blk = forward_return_block(bad, [1], group_col=None, dtype=np.float64)
+    got = block_rows(blk, "simple")
+
+    assert blk["t_idx"][-1] == -1
+    assert np.isnan(got[-1])
+    np.testing.assert_array_equal(got[:-1], clean)
+
+
+def test_missing_region_rows_are_left_off_the_grid():
+    df = _panel()
+    bad = df.copy()
+    bad.loc[5, "region"] = None
+
+    got = block_rows(forward_return_block(bad, [1], dtype=np.float64), "simple")
+    want = _grouped_shift(df, 1)
+    assert np.isnan(got[5])
+    # region "a" lost its row 5, so the return from row 4 spans a hole
+    assert np.isnan(got[4])
+    keep = np.ones(len(df), dtype=bool)
+    keep[[4, 5]] = False
+    np.testing.assert_allclose(got[keep], want[keep], rtol=1e-12)
+
+
+def test_missing_quarter_gives_nan_not_a_longer_return():
+    df = _panel().drop(index=[14]).reset_index(drop=True)   # region "b", third quarter
+    out = compute_forward_return(df, horizon=1)
+    b = out[out["region"] == "b"].set_index("date")["fwd_return"]
+    dates = sorted(df["date"].unique())
+    assert np.isnan(b[dates[1]])
+    assert np.isfinite(b[dates[0]]) and np.isfinite(b[dates[3]])
+
+    blk = forward_return_block(df, [1], dtype=np.float64)
+    np.testing.assert_array_equal(out["fwd_return"].to_numpy(), block_rows(blk, "simple"))
+
+
+def test_compute_forward_return_single_series_unchanged():
+    df = _series(20)
+    out = compute_forward_return(df, horizon=4)
+    want = df["price"].pct_change(4).shift(-4)
+    np.testing.assert_allclose(out["fwd_return"].to_numpy(), want.to_numpy(), rtol=1e-12)
+    assert "fwd_return" not in df.columns
+
+
+def test_duplicate_keys_raise():
+    df = _series()
+    with pytest.raises(ValueError, match="duplicate"):
+        forward_return_block(pd.concat([df, df]), [1], group_col=None)
@@ -0,0 +1,60 @@
+# tests/test_core_pipeline.py
+
+import importlib
+
+import pandas as pd
+import pytest
+
+from src.research.path_a.build_dataset import build_panel_df
+
+
+@pytest.fixture
+def panel_csv(tmp_path):
+    df = build_panel_df(n_regions=3, periods=40, seed=1).drop(columns=["regime"])
+    path = tmp_path / "panel.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def test_module_imports():
+    mod = importlib.import_module("src.core.pipeline")
+    assert callable(mod.run_pipeline) and callable(mod.run_pipeline_many)
+
+
+def test_run_pipeline_on_synthetic_panel(panel_csv, tmp_path):
+    from src.core.pipeline import run_pipeline
+    from src.core.stage_cache import StageCache
+
+    cache = StageCache(tmp_path / "stages")
+    out = run_pipeline("r0", horizon=4, src=panel_csv, cache=cache)
+
+    assert set(out["region"].astype(str)) == {"r0"}
+    for col in ("score_xs", "fwd_return", "regime", "affordability_active"):
+        assert col in out.columns
+    assert out["score_xs"].notna().all()
+    assert out["fwd_return"].isna().sum() == 4
+
+    again = run_pipeline("r0", horizon=4, src=panel_csv, cache=cache)
+    pd.testing.assert_frame_equal(out, again)
+
+
+def test_run_pipeline_many_in_process(panel_csv, tmp_path):
+    from src.core.pipeline import run_pipeline_many
+
+    out = run_pipeline_many(["r0", "r2"], workers=1, horizon=4, src=panel_csv, use_cache=False)
+    assert list(out["region"].cat.categories) == ["r0", "r2"]
+    assert out.attrs["failures"] == {}
+    assert len(out) == 2 * 40
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_pipeline_many_unknown_region_is_a_failure(panel_csv, workers):
+    from src.core.pipeline import run_pipeline_many
+
+    out = run_pipeline_many(["r0", "nope"], workers=workers, horizon=4, src=panel_csv, use_cache=False)
+    assert list(out["region"].cat.categories) == ["r0"]
+    assert list(out.attrs["failures"]) == ["nope"]
+
+    with pytest.raises(RuntimeError, match="nope"):
+        run_pipeline_many(["r0", "nope"], workers=workers, errors="raise", horizon=4,
+                          src=panel_csv, use_cache=False)
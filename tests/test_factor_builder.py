@@ -0,0 +1,92 @@
+# tests/test_factor_builder.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.core.composite_score import composite_scores, score_weight_sets, weight_matrix
+from src.core.factor_builder import Factor, FactorBuilder, resolve_order
+from src.research.path_a.build_dataset import build_panel_df
+from src.signals.affordability_signal import build_affordability_signal
+from src.signals.composite_signal import WEIGHT_SETS, build_composite_signal, load_signal_modules
+
+
+def _registry():
+    def scaled(df, *, k):
+        return df["x"].to_numpy() * k
+
+    def plus(df, a):
+        return a + df["y"].to_numpy()
+
+    return {
+        "a": Factor("a", scaled, inputs=("x",), params={"k": 2.0}),
+        "b": Factor("b", plus, inputs=("y",), deps=("a",)),
+        "c": Factor("c", lambda df: df["y"].to_numpy(), inputs=("y",)),
+    }
+
+
+def _frame(n=50, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"x": rng.normal(size=n), "y": rng.normal(size=n)})
+
+
+def test_resolve_order_and_cycles():
+    reg = _registry()
+    assert resolve_order(["b"], reg) == ["a", "b"]
+
+    reg["a"] = Factor("a", reg["a"].kernel, inputs=("x",), deps=("b",), params={"k": 1.0})
+    with pytest.raises(ValueError, match="cycle: b -> a -> b"):
+        resolve_order(["b"], reg)
+    with pytest.raises(ValueError, match="Unknown factor"):
+        resolve_order(["zzz"], reg)
+
+
+def test_set_params_recomputes_only_dependents():
+    df = _frame()
+    fb = FactorBuilder(df, registry=_registry())
+    fb.matrix(["a", "b", "c"])
+    assert fb.n_computed == 3
+
+    fb.matrix(["a", "b", "c"])
+    assert fb.n_computed == 3
+
+    fb.set_params("a", k=3.0)
+    F = fb.matrix(["a", "b", "c"])
+    assert fb.n_computed == 5          # a and b, not c
+    np.testing.assert_allclose(F[:, 1], 3.0 * df["x"] + df["y"], rtol=1e-6)
+
+    fb.set_data(df.assign(y=df["y"] + 1.0))
+    fb.matrix(["a", "b", "c"])
+    assert fb.n_computed == 7          # b and c, not a
+
+
+def test_composite_nan_only_hits_sets_using_factor():
+    F = np.array([[1.0, 2.0], [np.nan, 1.0], [3.0, np.nan]])
+    W, _, names = weight_matrix({"s1": {"f0": 1.0, "f1": 1.0}, "s2": {"f1": 2.0}}, ["f0", "f1"], dtype=np.float64)
+    S = composite_scores(F, W)
+    assert names == ["s1", "s2"]
+    np.testing.assert_array_equal(S[0], [3.0, 4.0])
+    assert np.isnan(S[1, 0]) and S[1, 1] == 2.0
+    assert np.isnan(S[2]).all()
+
+
+def test_weight_matrix_rejects_unknown_factors():
+    with pytest.raises(KeyError, match="Missing required columns"):
+        weight_matrix({"f9": 1.0}, ["f0"])
+
+
+def test_score_weight_sets_matches_affordability_signal():
+    load_signal_modules()
+    df = build_panel_df(n_regions=4, periods=40, seed=2)
+    ref = build_affordability_signal(df)["score_xs"]
+    got = score_weight_sets(FactorBuilder(df, dtype=np.float64), {"s": WEIGHT_SETS["affordability"]})["s"]
+    np.testing.assert_allclose(got, ref, rtol=1e-12, atol=1e-12)
+
+
+def test_composite_signal_is_float64():
+    df = build_panel_df(n_regions=3, periods=30, seed=3)
+    out = build_composite_signal(df, "xs", factors=["dti_z"])
+    assert out["score_xs"].dtype == np.float64
+    z = build_affordability_signal(df)
+    expect = sum(w * z[f] for f, w in WEIGHT_SETS["xs"].items())
+    np.testing.assert_allclose(out["score_xs"], expect, rtol=1e-12, atol=1e-12)
@@ -0,0 +1,51 @@
+# tests/test_fit_logit.py
+
+import numpy as np
+import pytest
+
+from src.research.path_a.fit_logit import TERMS, bootstrap_interaction_logit, fit_logit_batched
+
+
+def _data(seed=0, n=300):
+    rng = np.random.default_rng(seed)
+    dti = rng.normal(110, 15, size=n)
+    regime = (rng.random(n) < 0.4).astype(float)
+    eta = -0.5 + 0.04 * (dti - 110) + 0.8 * regime + 0.02 * (dti - 110) * regime
+    y = (rng.random(n) < 1 / (1 + np.exp(-eta))).astype(float)
+    X = np.column_stack([np.ones(n), (dti - 110) / 15, regime, (dti - 110) / 15 * regime])
+    return X, y
+
+
+def test_grouped_matches_stacked():
+    rng = np.random.default_rng(1)
+    (X1, y1), (X2, y2) = _data(1), _data(2, n=250)
+    n = 300
+    X = np.zeros((2, n, 4))
+    y = np.zeros((2, n))
+    X[0], y[0] = X1, y1
+    X[1, :250], y[1, :250] = X2, y2
+    w = np.zeros((2, 5, n))
+    w[0] = rng.multinomial(300, np.full(300, 1 / 300), size=5)
+    w[1, :, :250] = rng.multinomial(250, np.full(250, 1 / 250), size=5)
+
+    params, conv = fit_logit_batched(X, y, w)
+    assert params.shape == (2, 5, 4) and conv.shape == (2, 5)
+
+    Xs = np.repeat(X, 5, axis=0)
+    ys = np.repeat(y, 5, axis=0)
+    ref, ref_conv = fit_logit_batched(Xs, ys, w.reshape(10, n))
+    np.testing.assert_array_equal(conv.reshape(10), ref_conv)
+    np.testing.assert_allclose(params.reshape(10, 4), ref, rtol=1e-9, atol=1e-12)
+
+
+def test_bootstrap_replicate_zero_matches_statsmodels():
+    sm = pytest.importorskip("statsmodels.api")
+    import pandas as pd
+
+    X, y = _data(3)
+    df = pd.DataFrame({"dti": X[:, 1], "regime": X[:, 2], "y": y})
+    boot = bootstrap_interaction_logit(df, n_boot=20, seed=0)
+    assert len(boot) == 21 and boot["converged"].all()
+
+    res = sm.Logit(y, X).fit(disp=False)
+    np.testing.assert_allclose(boot.loc[0, TERMS].to_numpy(dtype=float), res.params, rtol=1e-6, atol=1e-8)
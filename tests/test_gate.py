@@ -0,0 +1,47 @@
+# tests/test_gate.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.phase2_supply.gate import GroupedGate, rolling_quantiles
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    n = 3000
+    df = pd.DataFrame({
+        "date": np.tile(np.arange(n // 30), 30),
+        "regime": rng.integers(0, 3, n).astype(float),
+        "a": rng.normal(size=n),
+    })
+    df.loc[rng.random(n) < 0.05, "a"] = np.nan
+    df.loc[rng.random(n) < 0.01, "regime"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("window,lag", [(12, 1), (40, 2), (5, 0)])
+def test_matches_pandas_rolling(frame, window, lag):
+    qs = [0.2, 0.8]
+    out = rolling_quantiles(frame, ["a"], qs, window=window, lag=lag, min_periods=3, dtype=np.float64, chunk_rows=700)
+    for r in (0.0, 1.0, 2.0):
+        sub = frame[frame["regime"] == r].sort_values("date", kind="stable")
+        for j, q in enumerate(qs):
+            ref = sub["a"].rolling(window, min_periods=3).quantile(q).shift(lag)
+            got = out[sub.index.to_numpy(), 0, j]
+            np.testing.assert_allclose(got, ref.to_numpy(), rtol=1e-12, equal_nan=True)
+    assert np.isnan(out[frame["regime"].isna().to_numpy()]).all()
+
+
+def test_incremental_gate_matches_batch(frame):
+    df = frame.sort_values("date", kind="stable")
+    batch = rolling_quantiles(df, ["a"], [0.8], window=20, lag=1, dtype=np.float64)[:, 0, :]
+    gate = GroupedGate([0.8], window=20, lag=1)
+    inc = gate.update_frame(df, "a", ["regime"])
+    np.testing.assert_allclose(inc, batch, rtol=1e-12, equal_nan=True)
+
+
+def test_empty_frame():
+    df = pd.DataFrame({"date": [], "regime": [], "a": []})
+    assert rolling_quantiles(df, ["a"], [0.5]).shape == (0, 1, 1)
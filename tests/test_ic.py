@@ -0,0 +1,100 @@
+# tests/test_ic.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.evaluation.ic import grouped_ic, rolling_ic
+from src.evaluation.regime import ic_by_regime
+
+
+def _old_ic_by_regime(df, *, signal_col, return_col="fwd_return", min_obs=12):
+    # the per-regime loop ic_by_regime used before the grouped engine
+    d = df[[signal_col, return_col, "regime"]].dropna()
+    rows = []
+    for regime, g in d.groupby("regime"):
+        if len(g) < min_obs:
+            continue
+        rows.append({
+            "regime": regime,
+            "ic": g[signal_col].corr(g[return_col]),
+            "positive_ratio": (g[signal_col] * g[return_col] > 0).mean(),
+            "n_obs": len(g),
+        })
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).set_index("regime")
+
+
+def _panel(n_dates=40, n_regions=25, seed=0):
+    rng = np.random.default_rng(seed)
+    n = n_dates * n_regions
+    df = pd.DataFrame({
+        "date": np.repeat(pd.date_range("2010-03-31", periods=n_dates, freq="QE"), n_regions),
+        "region": np.tile([f"r{i}" for i in range(n_regions)], n_dates),
+        "regime": rng.choice(["expansion", "stress", "crash"], n, p=[0.6, 0.35, 0.05]),
+        "s1": rng.normal(size=n),
+        "s2": rng.normal(size=n),
+    })
+    df["fwd_return"] = 0.3 * df["s1"] + rng.normal(size=n)
+    df["fwd_return_4q"] = 0.1 * df["s2"] + rng.normal(size=n)
+    for col in ("s1", "s2", "fwd_return"):
+        df.loc[rng.choice(n, n // 20, replace=False), col] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("min_obs", [12, 80])
+def test_ic_by_regime_matches_old_loop(min_obs):
+    df = _panel()
+    got = ic_by_regime(df, signal_col="s1", min_obs=min_obs)
+    want = _old_ic_by_regime(df, signal_col="s1", min_obs=min_obs)
+    pd.testing.assert_frame_equal(got, want, check_exact=False, rtol=1e-12, atol=1e-14)
+
+
+def test_grouped_ic_matches_old_loop_for_every_pair():
+    df = _panel(seed=1)
+    out = grouped_ic(df, ["s1", "s2"], ["fwd_return", "fwd_return_4q"], by="regime").set_index(
+        ["regime", "signal", "return"])
+    for s in ("s1", "s2"):
+        for r in ("fwd_return", "fwd_return_4q"):
+            want = _old_ic_by_regime(df, signal_col=s, return_col=r)
+            got = out.xs((s, r), level=("signal", "return"))[want.columns].loc[want.index]
+            pd.testing.assert_frame_equal(got, want, check_exact=False, rtol=1e-12, atol=1e-14)
+
+
+def test_grouped_ic_many_cells_matches_pandas():
+    df = _panel(seed=2)
+    out = grouped_ic(df, ["s1"], ["fwd_return"], by=["regime", "date"], min_obs=3)
+    d = df.dropna(subset=["s1", "fwd_return"])
+    d = d[d.groupby(["regime", "date"])["s1"].transform("size") >= 3]
+    g = d.groupby(["regime", "date"])
+    want = pd.DataFrame({"ic": g["s1"].corr(d["fwd_return"]), "n_obs": g.size()})
+    got = out.set_index(["regime", "date"]).loc[want.index]
+    np.testing.assert_allclose(got["ic"], want["ic"], rtol=1e-10, atol=1e-12)
+    np.testing.assert_array_equal(got["n_obs"], want["n_obs"])
+
+
+def test_grouped_ic_spearman_matches_pandas():
+    df = _panel(seed=3).dropna(subset=["s1", "fwd_return"])
+    out = grouped_ic(df, ["s1"], ["fwd_return"], by="regime", method="spearman").set_index("regime")
+    for regime, g in df.groupby("regime"):
+        want = g["s1"].corr(g["fwd_return"], method="spearman")
+        assert out.loc[regime, "ic"] == pytest.approx(want, rel=1e-12)
+
+
+def test_rolling_ic_windows_by_date():
+    df = _panel(n_dates=20, seed=4)
+    # region r0 loses a stretch of dates: its window must not reach further back
+    dates = sorted(df["date"].unique())
+    df = df[~((df["region"] == "r0") & df["date"].isin(dates[5:9]))]
+
+    window = 4
+    out = rolling_ic(df, ["s1"], ["fwd_return"], window=window, by="region", min_obs=1)
+    got = out.set_index(["region", "date"])
+    for (region, t) in [("r0", dates[10]), ("r0", dates[9]), ("r3", dates[12])]:
+        lo = dates[dates.index(t) - window + 1]
+        g = df[(df["region"] == region) & (df["date"] >= lo) & (df["date"] <= t)]
+        g = g.dropna(subset=["s1", "fwd_return"])
+        assert got.loc[(region, t), "n_obs"] == len(g)
+        if len(g) > 2:
+            assert got.loc[(region, t), "ic"] == pytest.approx(g["s1"].corr(g["fwd_return"]), rel=1e-10)
@@ -0,0 +1,74 @@
+# tests/test_incremental.py
+
+import pandas as pd
+import pytest
+
+from src.core.incremental import check_state_config, load_state, read_partitions
+from src.research.path_a.build_dataset import build_panel_df
+
+
+def test_check_state_config():
+    cfg = {"window": 40, "specs": [{"k": 0.3}], "first_test": pd.Timestamp("2011-03-31")}
+    state = {"config": {"window": 40, "specs": [{"k": 0.3}], "first_test": "2011-03-31 00:00:00"}}
+    check_state_config(state, cfg, "x/_state.json")
+
+    with pytest.raises(ValueError, match="changed: window"):
+        check_state_config(state, {**cfg, "window": 20}, "x/_state.json")
+    with pytest.raises(ValueError, match="records no config"):
+        check_state_config({}, cfg, "x/_state.json")
+
+
+@pytest.fixture
+def phase2_root(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    df = build_panel_df(n_regions=2, periods=48, seed=4)
+    cut = sorted(df["date"].unique())[40]
+    df[df["date"] < cut].to_csv(tmp_path / "master.csv", index=False)
+    return tmp_path, df
+
+
+def _phase2_cfg(**gate):
+    return {
+        "master_csv": "master.csv",
+        "supply_csv": "supply.csv",
+        "supply_candidates": ["permits"],
+        "gate": {"method": "rolling_percentile", "threshold": 0.8, "window": 12, "lag": 1, **gate},
+        "outputs": {"sanity_csv": "outputs/phase2/sanity.csv"},
+    }
+
+
+def test_phase2_refresh_under_changed_config_raises(phase2_root):
+    from src.phase2_supply.pipeline import run_incremental
+
+    root, df = phase2_root
+    run_incremental(_phase2_cfg(), root)
+    state_path = root / "outputs/phase2/sanity/_state.json"
+    assert load_state(state_path)["config"]["gate"]["window"] == 12
+
+    df.to_csv(root / "master.csv", index=False)
+    with pytest.raises(ValueError, match="changed: gate"):
+        run_incremental(_phase2_cfg(window=20), root)
+    with pytest.raises(ValueError, match="changed: supply_candidates"):
+        run_incremental({**_phase2_cfg(), "supply_candidates": ["months_supply"]}, root)
+
+    run_incremental(_phase2_cfg(), root)
+    out = read_partitions(root / "outputs/phase2/sanity", key=["date", "region"])
+    assert len(out) == len(df)
+
+
+def test_phase4_refresh_under_changed_config_raises(tmp_path, monkeypatch):
+    from src.phase4 import run_phase4
+
+    monkeypatch.chdir(tmp_path)
+    df = build_panel_df(n_regions=1, periods=60, seed=5).drop(columns=["region"])
+    in_path = tmp_path / run_phase4.IN_PATH
+    in_path.parent.mkdir(parents=True)
+    df.iloc[:50].to_csv(in_path, index=False)
+
+    run_phase4.run_incremental(root=tmp_path)
+    assert load_state(tmp_path / run_phase4.STATE_PATH)["config"]["roll_win"] == run_phase4.ROLL_WIN
+
+    df.to_csv(in_path, index=False)
+    monkeypatch.setattr(run_phase4, "ROLL_WIN", run_phase4.ROLL_WIN + 4)
+    with pytest.raises(ValueError, match="changed: roll_win"):
+        run_phase4.run_incremental(root=tmp_path)
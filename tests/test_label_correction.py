@@ -0,0 +1,55 @@
+# tests/test_label_correction.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.research.path_a.build_dataset import build_master_df, build_panel_df
+from src.research.path_a.label_correction import add_correction_label, correction_labels, forward_min
+
+
+def _old_add_correction_label(df, *, price_col="real_price_index", horizon_max_q=20, threshold=0.90):
+    # the per-row loop add_correction_label used before it was vectorized
+    df = df.sort_values("date").reset_index(drop=True).copy()
+    prices = df[price_col].to_numpy()
+    y = []
+    for t in range(len(prices)):
+        if t + horizon_max_q >= len(prices):
+            y.append(None)
+            continue
+        future_min = prices[t + 1 : t + horizon_max_q + 1].min()
+        y.append(1 if future_min / prices[t] < threshold else 0)
+    df["y"] = y
+    return df.dropna(subset=["y"]).assign(y=lambda x: x["y"].astype(int))
+
+
+@pytest.mark.parametrize("h,thr", [(1, 0.99), (4, 0.95), (20, 0.90), (40, 0.80)])
+def test_add_correction_label_matches_old_loop(h, thr):
+    df = build_master_df()
+    got = add_correction_label(df, horizon_max_q=h, threshold=thr)
+    want = _old_add_correction_label(df, horizon_max_q=h, threshold=thr)
+    pd.testing.assert_frame_equal(got, want)
+
+
+def test_grouped_labels_match_old_loop_per_region():
+    df = build_panel_df(n_regions=4, periods=40, seed=2).sample(frac=1.0, random_state=0)
+    labels = correction_labels(df, horizons=[4, 12], thresholds=[0.95, 0.9])
+
+    for region, g in df.groupby("region"):
+        lab = labels.loc[g.index].sort_values("date")
+        for h in (4, 12):
+            for thr in (0.95, 0.9):
+                want = _old_add_correction_label(g, horizon_max_q=h, threshold=thr)["y"].to_numpy()
+                got = lab[f"y_h{h}_t{thr:g}"].dropna().to_numpy(dtype=int)
+                np.testing.assert_array_equal(got, want, err_msg=f"{region} h={h} thr={thr}")
+
+
+@pytest.mark.parametrize("h", [0, -1])
+def test_non_positive_horizons_raise(h):
+    df = build_master_df()
+    with pytest.raises(ValueError, match="horizons"):
+        correction_labels(df, horizons=[4, h], group_col=None)
+    with pytest.raises(ValueError, match="horizon_max_q"):
+        forward_min(np.arange(5.0), np.full(5, 5), h)
+    with pytest.raises(ValueError):
+        add_correction_label(df, horizon_max_q=h)
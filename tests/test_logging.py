@@ -0,0 +1,39 @@
+# tests/test_logging.py
+
+import pstats
+import time
+
+from src.utils.logging import RunLog, read_run_log, stage
+
+
+def _busy():
+    time.sleep(0.02)
+    return sum(range(10_000))
+
+
+def test_nested_stages_profile_only_the_outermost(tmp_path):
+    with RunLog("t", log_dir=tmp_path, profile=True, memory=False) as log:
+        with stage("outer"):
+            with stage("inner"):
+                _busy()
+            with stage("inner2"):
+                _busy()
+        with stage("after"):
+            pass
+
+    recs = read_run_log(log.path)
+    assert [r["stage"] for r in recs if r["kind"] == "stage"] == ["inner", "inner2", "outer", "after"]
+    assert all(r["status"] == "ok" for r in recs)
+
+    run = recs[-1]
+    assert run["profile"].endswith(".outer.prof")
+    funcs = {f[2] for f in pstats.Stats(run["profile"]).stats}
+    assert "_busy" in funcs
+
+
+def test_profile_off_writes_no_dump(tmp_path):
+    with RunLog("t", log_dir=tmp_path, profile=False) as log:
+        with stage("a"):
+            _busy()
+    assert "profile" not in read_run_log(log.path)[-1]
+    assert not list(tmp_path.glob("*.prof"))
@@ -0,0 +1,70 @@
+# tests/test_ols.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.ols import fit_factor_sets, run_cross_sectional_ols
+
+pytest.importorskip("statsmodels")
+
+
+def _panel(seed=0, n_dates=5, n_regions=30):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2020-03-31", periods=n_dates, freq="QE")
+    df = pd.DataFrame({
+        "date": np.repeat(dates, n_regions),
+        "x1": rng.normal(size=n_dates * n_regions),
+        "x2": rng.normal(size=n_dates * n_regions),
+    })
+    df["y"] = 2.0 * df["x1"] - 0.5 * df["x2"] + rng.normal(scale=0.5, size=len(df))
+    return df
+
+
+def _assert_engines_match(df, x_cols):
+    a = run_cross_sectional_ols(df, "y", x_cols, engine="batched")
+    b = run_cross_sectional_ols(df, "y", x_cols, engine="statsmodels")
+    b = b.reset_index(drop=True)[a.columns]
+    pd.testing.assert_frame_equal(a, b, check_exact=False, rtol=1e-8, atol=1e-10)
+
+
+def test_engines_match():
+    _assert_engines_match(_panel(), ["x1", "x2"])
+
+
+def test_engines_match_with_nan_values():
+    df = _panel(1)
+    rng = np.random.default_rng(1)
+    for col in ("y", "x1", "x2"):
+        df.loc[rng.choice(len(df), 10, replace=False), col] = np.nan
+    _assert_engines_match(df, ["x1", "x2"])
+
+
+def test_engines_match_with_nan_dates():
+    df = _panel(2)
+    rng = np.random.default_rng(2)
+    junk = pd.DataFrame({
+        "date": pd.NaT,
+        "x1": rng.normal(size=10),
+        "x2": rng.normal(size=10),
+        "y": rng.normal(scale=10.0, size=10),
+    })
+    df = pd.concat([df, junk], ignore_index=True)
+    _assert_engines_match(df, ["x1", "x2"])
+    _assert_engines_match(df, ["x1"])
+
+
+def test_thin_dates_skipped():
+    df = _panel(3)
+    last = df["date"].max()
+    df.loc[df.index[df["date"] == last][3:], "y"] = np.nan
+    a = run_cross_sectional_ols(df, "y", ["x1", "x2"])
+    assert last not in set(a["date"])
+    _assert_engines_match(df, ["x1", "x2"])
+
+
+def test_factor_sets_match_single_fits():
+    df = _panel(4)
+    sets = [["x1"], ["x2"], ["x1", "x2"]]
+    for xs, out in zip(sets, fit_factor_sets(df, "y", sets)):
+        pd.testing.assert_frame_equal(out, run_cross_sectional_ols(df, "y", xs))
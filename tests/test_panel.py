@@ -0,0 +1,50 @@
+# tests/test_panel.py
+
+import numpy as np
+
+from src.research.path_a.build_dataset import build_panel_df
+from src.signals.affordability_signal import Z_COLS, build_affordability_signal
+from src.utils.panel_utils import Panel
+
+
+def _panel(spare=0):
+    df = build_panel_df(n_regions=3, periods=20, seed=0)
+    return df, Panel.from_long(df, ["price"] + list(Z_COLS), dtype=np.float64, spare=spare)
+
+
+def test_growth_invalidates_earlier_views():
+    _, p = _panel(spare=0)
+    view = p.field("price")
+    p.add_field("extra", np.zeros(p.shape[:2]))    # no spare slot: block grows
+    p.field("price")[0, 0] = -1.0
+    assert view[0, 0] != -1.0
+    assert p.field("price")[0, 0] == -1.0
+
+
+def test_reserve_keeps_views_valid():
+    _, p = _panel(spare=0)
+    p.reserve(3)
+    view = p.field("price")
+    many = p.fields_view(["price", "dti"])
+    for k in range(3):
+        p.add_field(f"f{k}", np.full(p.shape[:2], k))
+    p.field("price")[0, 0] = -1.0
+    assert view[0, 0] == -1.0 and many[0, 0, 0] == -1.0
+    np.testing.assert_array_equal(p.field("f2"), 2.0)
+
+
+def test_overwrite_keeps_view():
+    _, p = _panel(spare=2)
+    view = p.add_field("x", np.ones(p.shape[:2]))
+    p.add_field("x", np.zeros(p.shape[:2]))
+    assert (view == 0).all()
+
+
+def test_signal_on_panel_matches_frame():
+    df, p = _panel(spare=0)
+    build_affordability_signal(p)
+    ref = build_affordability_signal(df)
+    got = p.to_long(["score_xs"] + list(Z_COLS.values()))
+    ref = ref.sort_values(["date", "region"]).reset_index(drop=True)
+    for col in ["score_xs"] + list(Z_COLS.values()):
+        np.testing.assert_allclose(got[col].to_numpy(), ref[col].to_numpy(), rtol=1e-10, atol=1e-12)
@@ -0,0 +1,103 @@
+# tests/test_path_models.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.evaluation.splits import walk_forward_splits
+from src.evaluation.walk_forward import run_walk_forward
+from src.models.ensemble import average_path_models
+from src.models.lasso import lasso_alpha_max, lasso_path
+from src.models.ridge import predict_path, ridge_path
+
+
+def _design(n=60, p=4, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, p)) * [1.0, 3.0, 0.5, 2.0][:p] + 1.0
+    y = 0.3 + X @ np.array([1.0, -0.5, 0.0, 0.2][:p]) + rng.normal(scale=0.5, size=n)
+    return X, y
+
+
+def _panel(n_periods=40, n_regions=5, seed=0):
+    rng = np.random.default_rng(seed)
+    n = n_periods * n_regions
+    df = pd.DataFrame({
+        "date": np.tile(pd.date_range("2000-03-31", periods=n_periods, freq="QE"), n_regions),
+        "x1": rng.normal(size=n),
+        "x2": rng.normal(size=n),
+    })
+    # signal drifts over time, so each fold has a different alpha_max
+    df["y"] = (1.0 + np.arange(n) % n_periods / 10) * df["x1"] - 0.2 * df["x2"] + rng.normal(size=n)
+    return df
+
+
+def test_ridge_matches_closed_form():
+    X, y = _design()
+    n, p = X.shape
+    alphas = np.array([10.0, 0.5, 1e-3])
+    m = ridge_path(X, y, alphas)
+
+    xs = X.std(axis=0)
+    Xs = (X - X.mean(axis=0)) / xs
+    yc = y - y.mean()
+    for i, a in enumerate(alphas):
+        b = np.linalg.solve(Xs.T @ Xs + n * a * np.eye(p), Xs.T @ yc) / xs
+        np.testing.assert_allclose(m["coef"][i], b, rtol=1e-10, atol=1e-12)
+        np.testing.assert_allclose(m["intercept"][i], y.mean() - X.mean(axis=0) @ b, rtol=1e-10)
+
+
+def test_lasso_orthonormal_design_is_soft_threshold():
+    # centered columns with Xs^T Xs / n = I: coef = soft(Xs^T y / n, alpha)
+    n, p = 40, 3
+    rng = np.random.default_rng(1)
+    Q, _ = np.linalg.qr(rng.normal(size=(n, p)) - rng.normal(size=(n, p)).mean(axis=0))
+    Q -= Q.mean(axis=0)
+    Q, _ = np.linalg.qr(Q)
+    X = Q * np.sqrt(n)
+    y = X @ np.array([0.8, -0.3, 0.05]) + rng.normal(scale=0.1, size=n)
+
+    c = X.T @ (y - y.mean()) / n
+    alphas = np.array([0.5, 0.2, 0.01])
+    m = lasso_path(X, y, alphas, standardize=False, tol=1e-12)
+    for i, a in enumerate(alphas):
+        want = np.sign(c) * np.maximum(np.abs(c) - a, 0.0)
+        np.testing.assert_allclose(m["coef"][i], want, atol=1e-10)
+
+
+def test_lasso_alpha_max_zeroes_every_coefficient():
+    X, y = _design(seed=2)
+    a_max = lasso_alpha_max(X, y)
+    m = lasso_path(X, y, [a_max, a_max * 0.99])
+    assert np.all(m["coef"][0] == 0.0)
+    assert np.any(m["coef"][1] != 0.0)
+    np.testing.assert_allclose(m["intercept"][0], y.mean())
+    np.testing.assert_allclose(lasso_path(X, y)["alphas"][0], a_max)
+
+
+def test_walk_forward_lasso_folds_share_one_grid():
+    df = _panel(seed=3)
+    folds = list(walk_forward_splits(df["date"], test_size=4, min_train=12, purge=4))
+    pred, summary, models = run_walk_forward(
+        df, folds, y_col="y", x_cols=["x1", "x2"], model="lasso",
+        model_params={"n_alphas": 20}, workers=1, return_models=True,
+    )
+
+    assert len(models) == len(folds) and len(models[0]["alphas"]) == 20
+    for m in models[1:]:
+        np.testing.assert_array_equal(m["alphas"], models[0]["alphas"])
+    # the shared grid starts where the largest fold's path is all-zero
+    assert np.all(np.concatenate([m["coef"][0] for m in models]) == 0.0)
+    assert (summary.groupby("fold")["path"].count() == 20).all()
+
+    avg = average_path_models(models)
+    X = df[["x1", "x2"]].dropna().to_numpy()
+    want = np.mean([predict_path(m, X) for m in models], axis=0)
+    np.testing.assert_allclose(predict_path(avg, X), want, rtol=1e-12)
+
+
+def test_average_rejects_mismatched_grids():
+    X, y = _design()
+    a = lasso_path(X[:30], y[:30])
+    b = lasso_path(X[30:], y[30:])
+    with pytest.raises(ValueError, match="different alpha grids"):
+        average_path_models([a, b])
@@ -0,0 +1,85 @@
+# tests/test_phase10_decision_surface.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sm = pytest.importorskip("statsmodels.api")
+
+from src.evaluation.phase10_decision_surface import (
+    SURFACE_TERMS,
+    _boot_weights,
+    bootstrap_surface_models,
+    evaluate_surface,
+    surface_design,
+    surface_grid,
+    term_values,
+)
+
+
+def _frame(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "dti": rng.normal(4.0, 1.0, n),
+        "supply_pressure": rng.normal(size=n),
+        "regime": rng.integers(0, 2, n).astype(float),
+    })
+    eta = -6.0 + 1.2 * df["dti"] + 0.4 * df["supply_pressure"] + 0.5 * df["regime"]
+    df["y"] = (rng.random(n) < 1.0 / (1.0 + np.exp(-eta))).astype(float)
+    df["ret"] = 0.02 - 0.01 * df["dti"] + 0.005 * df["supply_pressure"] + rng.normal(scale=0.03, size=n)
+    return df
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    df = _frame()
+    return df, bootstrap_surface_models(df, ret_col="ret", n_boot=20, seed=3)
+
+
+def test_row0_matches_statsmodels(fitted):
+    df, m = fitted
+    X = surface_design(df)
+    assert m["converged"][0]
+
+    logit = sm.Logit(df["y"].to_numpy(), X).fit(disp=0, tol=1e-12)
+    np.testing.assert_allclose(m["logit"][0], logit.params, rtol=1e-6, atol=1e-8)
+
+    wls = sm.WLS(df["ret"].to_numpy(), X, weights=np.ones(len(df))).fit()
+    np.testing.assert_allclose(m["ret"][0], wls.params, rtol=1e-8, atol=1e-12)
+    np.testing.assert_allclose(m["ret_sigma"][0], np.sqrt(wls.scale), rtol=1e-8)
+
+
+def test_replicates_are_count_weighted_fits(fitted):
+    df, m = fitted
+    X = surface_design(df)
+    w = _boot_weights(len(df), 20, np.random.default_rng(3))[1]
+
+    glm = sm.GLM(df["y"].to_numpy(), X, family=sm.families.Binomial(), freq_weights=w).fit(tol=1e-12)
+    np.testing.assert_allclose(m["logit"][1], glm.params, rtol=1e-6, atol=1e-8)
+
+    wls = sm.WLS(df["ret"].to_numpy(), X, weights=w).fit()
+    np.testing.assert_allclose(m["ret"][1], wls.params, rtol=1e-8, atol=1e-12)
+
+
+def test_grid_terms_match_full_meshgrid():
+    grid = surface_grid(np.linspace(2, 7, 5), supply=[-1.0, 0.0, 2.0])
+    params = np.random.default_rng(0).normal(size=(4, len(SURFACE_TERMS)))
+    got = evaluate_surface(params, SURFACE_TERMS, grid, max_mb=1e-4)
+
+    mesh = np.meshgrid(grid["dti"], grid["supply"], grid["regime"], indexing="ij")
+    T = term_values(SURFACE_TERMS, {"dti": mesh[0].ravel(), "supply": mesh[1].ravel(), "regime": mesh[2].ravel()})
+    want = 1.0 / (1.0 + np.exp(-(params[0] @ T)))
+    np.testing.assert_allclose(got["point"].ravel(), want, rtol=1e-12)
+
+
+@pytest.mark.parametrize("link", ["logit", "identity"])
+def test_quantiles_do_not_depend_on_chunk_size(fitted, link):
+    _, m = fitted
+    params = m["logit"] if link == "logit" else m["ret"]
+    grid = surface_grid(np.linspace(2, 7, 23), supply=np.linspace(-2, 2, 7))
+
+    whole = evaluate_surface(params, SURFACE_TERMS, grid, link=link)
+    for max_mb in (1e-3, 0.01):   # one cell, then ~17 cells per chunk
+        part = evaluate_surface(params, SURFACE_TERMS, grid, link=link, max_mb=max_mb)
+        for k in ("point", "mean", "q"):
+            np.testing.assert_allclose(part[k], whole[k], rtol=1e-12, atol=1e-15)
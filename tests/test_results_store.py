@@ -0,0 +1,83 @@
+# tests/test_results_store.py
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from src.core.results_store import STORE_ROOT, ResultsStore
+from src.phase4.run_phase4 import P2_COLS, P2_PATH, P2_TABLE, attach_phase2_reference, load_phase2_reference
+
+
+def _p2(n=12, seed=0):
+    rng = np.random.default_rng(seed)
+    inv = rng.integers(0, 2, n).astype(float)
+    return pd.DataFrame({
+        "date": pd.date_range("2010-03-31", periods=n, freq="QE"),
+        "invested_p2": inv,
+        "strat_p2": inv * rng.normal(0.01, 0.02, n),
+    })
+
+
+def _write_p2(root, df, mtime=None):
+    path = root / P2_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(path, index=False)
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+    return path
+
+
+def test_write_leaves_no_tmp_files(tmp_path):
+    store = ResultsStore(tmp_path)
+    rid = store.write("phase4", "t", _p2(), run_id="r1")
+    store.write("phase4", "t", _p2(seed=1), run_id="r1", append=True)
+
+    tdir = tmp_path / "phase4" / "t"
+    assert not list(tdir.rglob("*.tmp"))
+    assert store.latest_run("phase4", "t") == rid
+    assert store.runs("phase4", "t").loc[0, "rows"] == 24
+
+
+def test_phase2_reference_is_the_csv(tmp_path):
+    assert load_phase2_reference(tmp_path) is None
+
+    want = _p2()
+    _write_p2(tmp_path, want)
+    first = load_phase2_reference(tmp_path)
+    pd.testing.assert_frame_equal(first, want)
+
+    store = ResultsStore(tmp_path / STORE_ROOT)
+    assert store.exists("phase2", P2_TABLE)
+    again = load_phase2_reference(tmp_path)
+    pd.testing.assert_frame_equal(again, want)
+
+
+def test_phase2_reference_ignores_other_store_runs(tmp_path):
+    want = _p2()
+    _write_p2(tmp_path, want)
+    load_phase2_reference(tmp_path)
+
+    # e.g. a study's phase 2 run writing its own series under the same table
+    store = ResultsStore(tmp_path / STORE_ROOT)
+    store.write("phase2", P2_TABLE, _p2(seed=5), run_id="study.p2")
+    got = load_phase2_reference(tmp_path)
+    np.testing.assert_allclose(got["strat_p2"], want["strat_p2"])
+
+
+def test_changed_csv_is_mirrored_again(tmp_path):
+    _write_p2(tmp_path, _p2(), mtime=1_000_000_000_000_000_000)
+    load_phase2_reference(tmp_path)
+
+    new = _p2(seed=3)
+    _write_p2(tmp_path, new, mtime=2_000_000_000_000_000_000)
+    got = load_phase2_reference(tmp_path)
+    np.testing.assert_allclose(got["strat_p2"], new["strat_p2"])
+
+    df = pd.DataFrame({"date": new["date"], "ret_1q_fwd": 0.01})
+    merged = attach_phase2_reference(df, root=tmp_path)
+    assert list(merged.columns) == ["date", "ret_1q_fwd"] + P2_COLS[1:]
+    np.testing.assert_allclose(merged["invested_p2"], new["invested_p2"])
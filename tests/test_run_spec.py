@@ -0,0 +1,121 @@
+# tests/test_run_spec.py
+
+import pandas as pd
+import pytest
+
+from src.core.run_spec import compile_plan, execute_plan, spec_errors, validate_spec
+from src.research.path_a.build_dataset import build_panel_df
+
+
+GATE = {"method": "percentile", "threshold": 0.8}
+
+
+@pytest.fixture
+def study_root(tmp_path):
+    df = build_panel_df(n_regions=1, periods=60, seed=3).drop(columns=["region"])
+    df.to_csv(tmp_path / "master.csv", index=False)
+    df.to_csv(tmp_path / "panel.csv", index=False)
+    return tmp_path
+
+
+def _spec(**extra):
+    spec = {
+        "study": "tiny",
+        "workers": 2,
+        "inputs": {"master": "master.csv", "panel": "panel.csv"},
+        "runs": [
+            {"name": "g80", "phase": 2, "master": "master", "supply_candidates": ["permits"], "gate": GATE},
+            {"name": "p3", "phase": 3, "panel": "panel"},
+            {"name": "w8", "phase": 4, "panel": "p3", "phase2": "g80", "roll_win": 8, "first_test": "2005-03-31"},
+            {"name": "w12", "phase": 4, "panel": "p3", "phase2": "g80", "roll_win": 12, "first_test": "2005-03-31"},
+            {"name": "raw", "phase": 4, "panel": "panel", "roll_win": 8, "first_test": "2005-03-31"},
+        ],
+    }
+    spec.update(extra)
+    return spec
+
+
+def test_valid_spec_has_no_errors():
+    assert spec_errors(_spec()) == []
+
+
+def test_spec_errors_reports_every_problem():
+    spec = _spec()
+    spec["runs"] = spec["runs"] + [
+        {"name": "w8", "phase": 4, "panel": "nope"},
+        {"name": "bad", "phase": 5},
+        {"name": "g2", "phase": 2, "master": "master", "supply_candidates": [], "gate": {"threshold": 1.5}},
+    ]
+    spec["extra"] = 1
+    errs = spec_errors(spec)
+    text = "\n".join(errs)
+    assert "spec: unknown keys ['extra']" in text
+    assert "duplicate run name 'w8'" in text
+    assert "panel: 'nope' is not an input or a phase 3 run" in text
+    assert "runs[6] (bad).phase" in text
+    assert "supply_candidates: must be a non-empty list" in text
+    assert "gate.threshold" in text
+    with pytest.raises(ValueError, match="Invalid study spec"):
+        validate_spec(spec)
+
+
+def test_compile_plan_shares_inputs(study_root):
+    plan = compile_plan(_spec(), root=study_root)
+    kinds = pd.Series([n.kind for n in plan.nodes.values()]).value_counts()
+
+    # master / panel loaded once, one prepared panel for p3, w8, w12 and raw
+    assert kinds["load"] == 2
+    assert kinds["panel"] == 1
+    assert kinds["phase4"] == 3
+    assert plan.run_nodes["p3"] == plan.nodes[plan.run_nodes["w8"]].deps[0]
+    assert plan.nodes[plan.run_nodes["raw"]].deps == [plan.run_nodes["p3"]]
+
+    levels = plan.levels()
+    depth = {k: i for i, keys in enumerate(levels) for k in keys}
+    for key, node in plan.nodes.items():
+        assert all(depth[d] < depth[key] for d in node.deps)
+
+
+def test_compile_plan_reports_missing_inputs(study_root):
+    spec = _spec(inputs={"master": "master.csv", "panel": "missing.csv"})
+    with pytest.raises(ValueError, match="missing.csv does not exist"):
+        compile_plan(spec, root=study_root)
+
+
+def test_execute_plan_matches_direct_runs(study_root):
+    from src.phase2_supply.pipeline import build_sanity, strategy_series
+    from src.phase4.run_phase4 import evaluate_specs, merge_phase2_reference, prepare_panel
+
+    plan = compile_plan(_spec(), root=study_root)
+    res = execute_plan(plan, workers=4, write=False)
+
+    df = pd.read_csv(study_root / "master.csv", parse_dates=["date"])
+    sanity = build_sanity(df.copy(), {"supply_candidates": ["permits"], "gate": GATE})
+    p2 = strategy_series(sanity)
+    pd.testing.assert_frame_equal(res["g80"]["strategy_series"], p2)
+
+    panel = prepare_panel(df)
+    _, series, summary, _ = evaluate_specs(
+        merge_phase2_reference(panel.copy(), p2), roll_win=12, first_test="2005-03-31",
+    )
+    pd.testing.assert_frame_equal(res["w12"]["oos_summary"], summary)
+    pd.testing.assert_frame_equal(res["w12"]["oos_series"].reset_index(drop=True), series.reset_index(drop=True))
+    assert res["raw"]["oos_series"]["strat_p2"].isna().all()
+
+
+def test_execute_plan_writes_in_plan_order(study_root, capsys):
+    pytest.importorskip("pyarrow")
+    from src.core.results_store import STORE_ROOT, ResultsStore
+
+    plan = compile_plan(_spec(), root=study_root)
+    execute_plan(plan, workers=4, run_id="t")
+
+    lines = [ln for ln in capsys.readouterr().out.splitlines() if ln]
+    assert all(ln.startswith("[study] ") and ln.count("[study]") == 1 for ln in lines)
+    names = [ln.split()[1].rstrip(":") for ln in lines]
+    # level by level (raw needs no phase 2 run, so it is a level ahead of w8 / w12)
+    assert names == ["g80"] * 2 + ["raw"] * 3 + ["w8"] * 3 + ["w12"] * 3
+
+    store = ResultsStore(study_root / STORE_ROOT)
+    assert store.latest_run("phase4", "oos_summary") == "t.w12"
+    assert store.latest_run("phase2", "strategy_series") == "t.g80"
@@ -0,0 +1,82 @@
+# tests/test_splits.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.evaluation.splits import walk_forward_splits
+
+
+def _dates(n_periods=40, n_regions=3):
+    d = pd.date_range("2000-03-31", periods=n_periods, freq="QE")
+    # panel order: region-major, so a period's rows are not contiguous
+    return pd.Series(np.tile(d, n_regions)), d
+
+
+def _periods_of(dates, rows):
+    return np.unique(dates.to_numpy()[rows])
+
+
+def _check_walk_forward(dates, periods, folds, *, purge):
+    assert folds
+    for f in folds:
+        tr, te = _periods_of(dates, f["train"]), _periods_of(dates, f["test"])
+        assert not set(f["train"]) & set(f["test"])
+        # whole periods on each side: every row of a test period is in test
+        assert len(f["test"]) == dates.isin(te).sum()
+        assert len(f["train"]) == dates.isin(tr).sum()
+        # train ends exactly `purge` periods before the test block
+        gap = periods.get_loc(te[0]) - periods.get_loc(tr[-1]) - 1
+        assert gap == purge
+        assert f["train_end"] == tr[-1] and f["test_start"] == te[0]
+
+
+@pytest.mark.parametrize("purge", [0, 4, 12])
+def test_expanding_no_overlap_and_purge_gap(purge):
+    dates, periods = _dates()
+    folds = list(walk_forward_splits(dates, scheme="expanding", test_size=4, min_train=8, purge=purge))
+    _check_walk_forward(dates, periods, folds, purge=purge)
+    for f in folds:
+        assert f["train_start"] == periods[0]
+    # test blocks tile the tail of the sample
+    tests = np.concatenate([_periods_of(dates, f["test"]) for f in folds])
+    assert list(tests) == list(periods[8 + purge:])
+
+
+def test_rolling_window_length():
+    dates, periods = _dates()
+    folds = list(walk_forward_splits(dates, scheme="rolling", test_size=2, train_size=10, min_train=10, purge=3))
+    _check_walk_forward(dates, periods, folds, purge=3)
+    assert all(len(_periods_of(dates, f["train"])) == 10 for f in folds)
+
+
+def test_first_test_overrides_min_train():
+    dates, periods = _dates()
+    folds = list(walk_forward_splits(dates, test_size=4, first_test="2005-03-31", purge=2))
+    assert folds[0]["test_start"] == pd.Timestamp("2005-03-31")
+    _check_walk_forward(dates, periods, folds, purge=2)
+
+
+@pytest.mark.parametrize("purge,embargo", [(0, 0), (2, 3)])
+def test_purged_kfold_gaps(purge, embargo):
+    dates, periods = _dates()
+    folds = list(walk_forward_splits(dates, scheme="purged_kfold", n_folds=5, purge=purge, embargo=embargo))
+    assert len(folds) == 5
+
+    tests = np.concatenate([_periods_of(dates, f["test"]) for f in folds])
+    assert list(tests) == list(periods)
+    for f in folds:
+        assert not set(f["train"]) & set(f["test"])
+        t0, t1 = periods.get_loc(f["test_start"]), periods.get_loc(f["test_end"])
+        pos = periods.get_indexer(_periods_of(dates, f["train"]))
+        banned = set(range(max(t0 - purge, 0), min(t1 + 1 + embargo, len(periods))))
+        assert not banned & set(pos)
+        assert set(pos) | banned == set(range(len(periods)))
+
+
+def test_bad_arguments():
+    dates, _ = _dates()
+    with pytest.raises(ValueError, match="train_size"):
+        list(walk_forward_splits(dates, scheme="rolling"))
+    with pytest.raises(ValueError, match="Unknown scheme"):
+        list(walk_forward_splits(dates, scheme="nope"))
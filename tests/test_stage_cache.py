@@ -0,0 +1,78 @@
+# tests/test_stage_cache.py
+
+import importlib
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.core.stage_cache import Stage, StageCache, code_dependencies, run_stages
+
+
+@pytest.fixture
+def stage_pkg(tmp_path, monkeypatch):
+    pkg = tmp_path / "stagepkg"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("")
+    (pkg / "helper.py").write_text("def scale(x):\n    return 2 * x\n")
+    (pkg / "stages.py").write_text(
+        "from stagepkg.helper import scale\n\n\ndef double(x):\n    return scale(x)\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield pkg
+    for name in [m for m in sys.modules if m == "stagepkg" or m.startswith("stagepkg.")]:
+        del sys.modules[name]
+
+
+def test_key_tracks_helper_modules(stage_pkg):
+    stages = importlib.import_module("stagepkg.stages")
+    assert set(code_dependencies(stages.double)) == {"stagepkg.helper", "stagepkg.stages"}
+
+    st = Stage("double", stages.double, params={"x": 3})
+    before = st.key([])
+    assert st.key([]) == before
+
+    helper = stage_pkg / "helper.py"
+    helper.write_text("def scale(x):\n    return 3 * x\n")
+    stat = helper.stat()
+    os.utime(helper, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert st.key([]) != before
+
+
+def test_version_changes_key():
+    f = lambda x: x  # noqa: E731
+    assert Stage("s", f, version="1").key([]) != Stage("s", f, version="2").key([])
+
+
+def test_run_stages_hits_cache(tmp_path):
+    calls = []
+
+    def load():
+        calls.append("load")
+        return 3
+
+    stages = [Stage("load", load), Stage("inc", lambda x: x + 1, inputs=("load",))]
+    cache = StageCache(tmp_path)
+    out, report = run_stages(stages, cache)
+    assert out["inc"] == 4 and list(report["status"]) == ["miss", "miss"]
+
+    out, report = run_stages(stages, cache)
+    assert out["inc"] == 4 and list(report["status"]) == ["skipped", "hit"]
+    assert calls == ["load"]
+
+
+def test_evict_ignores_files_removed_concurrently(tmp_path, monkeypatch):
+    cache = StageCache(tmp_path, max_bytes=0)
+    cache.put("a", "k1", list(range(100)))
+
+    real_glob = Path.glob
+
+    def glob_with_ghost(self, pattern):
+        # a file another process unlinks between our glob and stat/unlink
+        return list(real_glob(self, pattern)) + [self / "gone.k0.pkl"]
+
+    monkeypatch.setattr(Path, "glob", glob_with_ghost)
+    cache.evict()
+    cache.clear()
+    assert cache.get("a", "k1") == (False, None)
@@ -0,0 +1,15 @@
+# tests/test_startup.py
+
+import pytest
+
+from benchmarks.suite import STARTUP_CHECKS, startup_check
+
+
+@pytest.mark.parametrize("name", list(STARTUP_CHECKS))
+def test_startup_within_budget(name):
+    row = startup_check(name, repeat=3)
+    assert not row["leaked"], f"{name} imported deferred modules: {row['leaked']}"
+    assert row["net_s"] <= row["budget_s"], (
+        f"{name} took {row['net_s'] * 1e3:.0f} ms over a bare interpreter "
+        f"(budget {row['budget_s'] * 1e3:.0f} ms)"
+    )
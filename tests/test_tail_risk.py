@@ -0,0 +1,106 @@
+# tests/test_tail_risk.py
+
+import warnings
+
+import numpy as np
+import pytest
+
+from src.evaluation.tail_risk import QuantileSketch, chain_drawdown, drawdown_state, tail_metrics
+
+
+def _returns(seed=0, shape=(6, 200), nan_frac=0.1):
+    rng = np.random.default_rng(seed)
+    R = rng.standard_t(4, size=shape) * 0.02
+    R[rng.random(shape) < nan_frac] = np.nan
+    return R
+
+
+def _sorted_cvar(x, alpha):
+    x = np.sort(x[~np.isnan(x)])
+    k = max(int(np.ceil(alpha * len(x))), 1)
+    return x[:k].mean()
+
+
+@pytest.mark.parametrize("shape", [(4, 0), (2, 3, 0)])
+def test_empty_time_axis(shape):
+    m = tail_metrics(np.empty(shape))
+    assert m["n"].shape == shape[:-1]
+    assert (m["n"] == 0).all()
+    for key in ("mean", "vol", "min", "q5", "cvar5", "downside_dev", "max_drawdown"):
+        assert np.isnan(m[key]).all()
+
+
+def test_all_nan_rows():
+    R = _returns(1)
+    R[2] = np.nan
+    m = tail_metrics(R)
+    assert m["n"][2] == 0 and np.isnan(m["q5"][2]) and np.isnan(m["cvar5"][2])
+    assert np.isfinite(m["q5"][[0, 1, 3]]).all()
+
+
+def test_matches_nanquantile_and_sorted_cvar():
+    R = _returns(2)
+    qs, alphas = (0.01, 0.05, 0.1, 0.5, 0.9), (0.05, 0.10, 0.25)
+    m = tail_metrics(R, quantiles=qs, alphas=alphas)
+    for q in qs:
+        np.testing.assert_allclose(m[f"q{q * 100:g}"], np.nanquantile(R, q, axis=1), rtol=1e-12)
+    for a in alphas:
+        expect = [_sorted_cvar(r, a) for r in R]
+        np.testing.assert_allclose(m[f"cvar{a * 100:g}"], expect, rtol=1e-12)
+    np.testing.assert_allclose(m["min"], np.nanmin(R, axis=1))
+    np.testing.assert_allclose(m["vol"], np.nanstd(R, axis=1, ddof=1), rtol=1e-12)
+
+
+def test_many_quantiles_use_full_sort():
+    R = _returns(3)
+    qs = tuple(np.linspace(0.01, 0.99, 80))
+    m = tail_metrics(R, quantiles=qs, alphas=())
+    got = np.stack([m[f"q{q * 100:g}"] for q in qs], axis=1)
+    np.testing.assert_allclose(got, np.nanquantile(R, qs, axis=1).T, rtol=1e-12)
+
+
+def test_max_drawdown_matches_loop():
+    R = _returns(4, nan_frac=0.0)
+    m = tail_metrics(R)
+    for v, r in enumerate(R):
+        equity = np.cumprod(1.0 + r)
+        peak = np.maximum.accumulate(np.maximum(equity, 1.0))
+        assert m["max_drawdown"][v] == pytest.approx((equity / peak - 1.0).min())
+
+
+def test_merged_sketch_close_to_exact():
+    R = _returns(5, shape=(5, 3000), nan_frac=0.05)
+    exact = tail_metrics(R, quantiles=(0.05, 0.5), alphas=(0.05,))
+
+    parts = np.array_split(R, 4, axis=1)
+    sk = QuantileSketch.from_array(parts[0])
+    for p in parts[1:]:
+        sk.merge(QuantileSketch.from_array(p))
+    approx = sk.metrics(quantiles=(0.05, 0.5), alphas=(0.05,))
+
+    np.testing.assert_array_equal(approx["n"], exact["n"])
+    for key in ("mean", "vol", "downside_dev", "min"):
+        np.testing.assert_allclose(approx[key], exact[key], rtol=1e-9, atol=1e-12)
+    for key in ("q5", "q50", "cvar5"):
+        tol = sk.rel_acc * np.abs(exact[key]) + sk.min_value
+        assert (np.abs(approx[key] - exact[key]) <= tol).all(), key
+
+
+def test_chained_drawdown_exact():
+    R = _returns(6, nan_frac=0.0)
+    state = drawdown_state(R[:, :70])
+    for a, b in ((70, 130), (130, 200)):
+        state = chain_drawdown(state, drawdown_state(R[:, a:b]))
+    np.testing.assert_allclose(state["max_drawdown"], tail_metrics(R)["max_drawdown"], rtol=1e-12)
+
+
+def test_sketch_empty_variant_is_nan_without_warnings():
+    R = _returns(7, shape=(3, 50), nan_frac=0.0)
+    R[1] = np.nan
+    sk = QuantileSketch.from_array(R)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        q = sk.quantile([0.05, 0.5])
+        m = sk.metrics(quantiles=(0.05,), alphas=(0.05,))
+    assert np.isnan(q[1]).all() and np.isfinite(q[[0, 2]]).all()
+    assert np.isnan(m["q5"][1]) and m["n"][1] == 0
@@ -0,0 +1,67 @@
+# tests/test_walk_forward.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.evaluation.splits import walk_forward_splits
+from src.evaluation.walk_forward import run_walk_forward
+
+
+def _panel(n_periods=40, n_regions=6, seed=0):
+    rng = np.random.default_rng(seed)
+    n = n_periods * n_regions
+    df = pd.DataFrame({
+        "date": np.tile(pd.date_range("2000-03-31", periods=n_periods, freq="QE"), n_regions),
+        "x1": rng.normal(size=n),
+        "x2": rng.normal(size=n),
+    })
+    df["y"] = 0.5 + 1.5 * df["x1"] - 0.7 * df["x2"] + rng.normal(scale=0.3, size=n)
+    df.loc[rng.choice(n, 12, replace=False), "y"] = np.nan
+    df.loc[rng.choice(n, 6, replace=False), "x2"] = np.nan
+    return df
+
+
+def _in_memory(df, folds):
+    # plain per-fold OLS on the frame itself, no design cache
+    X = df[["x1", "x2"]].to_numpy()
+    y = df["y"].to_numpy()
+    pred = np.full(len(df), np.nan)
+    coefs = []
+    for f in folds:
+        tr = f["train"][~np.isnan(y[f["train"]]) & ~np.isnan(X[f["train"]]).any(axis=1)]
+        te = f["test"][~np.isnan(X[f["test"]]).any(axis=1)]
+        beta, *_ = np.linalg.lstsq(np.column_stack([np.ones(len(tr)), X[tr]]), y[tr], rcond=None)
+        pred[te] = beta[0] + X[te] @ beta[1:]
+        coefs.append(beta)
+    return pred, np.array(coefs)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_cached_design_matches_in_memory(tmp_path, workers):
+    df = _panel()
+    folds = list(walk_forward_splits(df["date"], test_size=4, min_train=12, purge=4))
+    want_pred, want_coef = _in_memory(df, folds)
+
+    for _ in range(2):   # second pass reuses the cached fold files
+        pred, summary = run_walk_forward(df, folds, y_col="y", x_cols=["x1", "x2"],
+                                         workers=workers, cache_dir=tmp_path)
+        np.testing.assert_allclose(pred.to_numpy(), want_pred, rtol=1e-10, equal_nan=True)
+        got_coef = summary[["coef_const", "coef_x1", "coef_x2"]].to_numpy()
+        np.testing.assert_allclose(got_coef, want_coef, rtol=1e-10)
+
+    assert len(list(tmp_path.glob("fold_*_X_train.npy"))) == len(folds)
+    assert list(summary["fold"]) == list(range(len(folds)))
+
+
+def test_predictions_only_on_test_rows():
+    df = _panel(seed=1)
+    folds = list(walk_forward_splits(df["date"], test_size=4, first_test="2005-03-31", purge=2))
+    pred, summary = run_walk_forward(df, folds, y_col="y", x_cols=["x1", "x2"], workers=1)
+
+    tested = np.zeros(len(df), dtype=bool)
+    for f in folds:
+        tested[f["test"]] = True
+    assert pred[~tested].isna().all()
+    assert pred[tested & df["x2"].notna().to_numpy()].notna().all()
+    assert (summary["train_end"] < summary["test_start"]).all()